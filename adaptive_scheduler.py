@@ -0,0 +1,300 @@
+"""
+Adaptive question scheduling for the AWS Icon Game
+
+Instead of asking about every service equally often, each player gets a
+spaced-repetition style weighting: services they miss or answer slowly come
+up more often, and services they keep getting right fade into the
+background. Weights live in a Fenwick (binary indexed) tree per player, so
+both a weighted draw and the update after an answer take O(log n) for a
+catalog of n services. The last few services asked are held out for a
+few turns so a missed icon comes back soon, but not immediately.
+
+Per-player, per-service stats are kept in a small SQLite table
+(player_stats.db) and loaded again the next time the same name plays.
+
+Every game gets its own random stream, seeded from a per-session sequence,
+so a recorded session (see session_recorder.py) can be replayed exactly.
+"""
+import random
+import sqlite3
+from array import array
+from collections import deque
+
+PLAYER_STATS_DB = "player_stats.db"
+
+NEW_WEIGHT = 1.0  # Services the player has never been asked about
+# Leitner boxes: a wrong answer sends a service back to box 0, each right
+# answer moves it up one box and makes it less likely to be asked
+BOX_WEIGHTS = (4.0, 0.5, 0.25, 0.125, 0.0625)
+FAST_RESPONSE_MS = 2000.0  # Answers slower than this raise the weight...
+SLOW_RESPONSE_MS = 6000.0  # ...up to double at this response time
+RESPONSE_SMOOTHING = 0.3  # Weight of the newest response in the moving average
+COOLDOWN = 3  # Recently asked services held out of the draw
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS service_stats (
+    player TEXT NOT NULL,
+    service TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    box INTEGER NOT NULL,
+    response_ms REAL NOT NULL,
+    PRIMARY KEY (player, service)
+) WITHOUT ROWID;
+"""
+
+
+class SumTree:
+    """Fenwick tree over non-negative weights with prefix-sum sampling"""
+
+    def __init__(self, weights):
+        self.size = len(weights)
+        self.weights = list(weights)
+        self.top_step = 1 << (self.size.bit_length() - 1) if self.size else 0
+        self.rebuild()
+
+    def rebuild(self):
+        """Recompute the tree from the raw weights in O(n)"""
+        tree = [0.0] * (self.size + 1)
+        for i, weight in enumerate(self.weights, 1):
+            tree[i] += weight
+            parent = i + (i & -i)
+            if parent <= self.size:
+                tree[parent] += tree[i]
+        self.tree = tree
+        # Floating point drift from incremental updates is cleared by
+        # rebuilding once every n updates, which keeps updates O(1) amortized
+        self.updates = 0
+
+    def update(self, index, weight):
+        """Set the weight at an index in O(log n)"""
+        delta = weight - self.weights[index]
+        self.weights[index] = weight
+        tree = self.tree
+        i = index + 1
+        while i <= self.size:
+            tree[i] += delta
+            i += i & -i
+        self.updates += 1
+        if self.updates >= self.size:
+            self.rebuild()
+
+    def total(self):
+        """Sum of all weights in O(log n)"""
+        tree = self.tree
+        total = 0.0
+        i = self.size
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, target):
+        """Return the index whose weight interval contains target, 0 <= target < total()"""
+        tree = self.tree
+        position = 0
+        step = self.top_step
+        while step:
+            nxt = position + step
+            if nxt <= self.size and tree[nxt] <= target:
+                position = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return min(position, self.size - 1)
+
+    def sample(self, rng):
+        """Draw an index with probability proportional to its weight"""
+        index = self.find(rng.random() * self.total())
+        if self.weights[index] <= 0:
+            # Only reachable through rounding drift; rebuild and draw again
+            self.rebuild()
+            index = self.find(rng.random() * self.total())
+        return index
+
+
+class PlayerProfile:
+    """One player's answer history for every service, indexed by service id"""
+
+    def __init__(self, name, services):
+        self.name = name
+        self.services = services
+        n = len(services)
+        self.attempts = array("I", [0]) * n
+        self.correct = array("I", [0]) * n
+        self.box = array("B", [0]) * n
+        self.response_ms = array("f", [0.0]) * n
+        self.dirty = set()  # Service ids changed since the last save
+
+    def weight(self, service_id):
+        """Selection weight for a service, higher for weaker services"""
+        if not self.attempts[service_id]:
+            return NEW_WEIGHT
+        weight = BOX_WEIGHTS[self.box[service_id]]
+        slowness = (self.response_ms[service_id] - FAST_RESPONSE_MS) / (SLOW_RESPONSE_MS - FAST_RESPONSE_MS)
+        return weight * (1.0 + min(max(slowness, 0.0), 1.0))
+
+    def record(self, service_id, correct, response_ms):
+        """Update a service's stats after an answer"""
+        if self.attempts[service_id]:
+            previous = self.response_ms[service_id]
+            response_ms = previous + RESPONSE_SMOOTHING * (response_ms - previous)
+        self.attempts[service_id] += 1
+        self.response_ms[service_id] = response_ms
+        if correct:
+            self.correct[service_id] += 1
+            self.box[service_id] = min(self.box[service_id] + 1, len(BOX_WEIGHTS) - 1)
+        else:
+            self.box[service_id] = 0
+        self.dirty.add(service_id)
+
+    def snapshot(self):
+        """Stats of every service the player has been asked about, as rows"""
+        return [[i, self.attempts[i], self.correct[i], self.box[i], self.response_ms[i]]
+                for i, attempts in enumerate(self.attempts) if attempts]
+
+    def restore(self, rows):
+        """Load rows taken by snapshot(), e.g. to replay a recorded game"""
+        for service_id, attempts, correct, box, response_ms in rows:
+            self.attempts[service_id] = attempts
+            self.correct[service_id] = correct
+            self.box[service_id] = box
+            self.response_ms[service_id] = response_ms
+
+
+class PlayerStatsStore:
+    """SQLite table of per-player, per-service stats, keyed by service name"""
+
+    def __init__(self, path=PLAYER_STATS_DB):
+        self.conn = sqlite3.connect(path)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def load(self, name, services):
+        """Return a player's profile over the given services (new players start empty)"""
+        profile = PlayerProfile(name, services)
+        ids = {service["name"]: i for i, service in enumerate(services)}
+        rows = self.conn.execute(
+            "SELECT service, attempts, correct, box, response_ms FROM service_stats WHERE player = ?",
+            (name,)
+        )
+        for service, attempts, correct, box, response_ms in rows:
+            service_id = ids.get(service)
+            if service_id is None:
+                continue  # No longer in the catalog, or outside this game's categories
+            profile.attempts[service_id] = attempts
+            profile.correct[service_id] = correct
+            profile.box[service_id] = min(box, len(BOX_WEIGHTS) - 1)
+            profile.response_ms[service_id] = response_ms
+        return profile
+
+    def save(self, profile):
+        """Write the services a profile has changed since it was loaded or last saved"""
+        rows = [
+            (profile.name, profile.services[i]["name"], profile.attempts[i],
+             profile.correct[i], profile.box[i], profile.response_ms[i])
+            for i in sorted(profile.dirty)
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO service_stats "
+                "(player, service, attempts, correct, box, response_ms) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        profile.dirty.clear()
+
+    def close(self):
+        self.conn.close()
+
+
+class AdaptiveScheduler:
+    """Draws questions weighted towards each player's weak services
+
+    Wraps a QuestionEngine and can stand in for it, e.g. in QuestionPipeline.
+    Distractors are still drawn uniformly by the engine. Until start_game()
+    is called questions are uniform.
+    """
+
+    def __init__(self, engine, store=None, seed=None):
+        self.engine = engine
+        self.services = engine.services
+        self.store = store
+        self.seeds = random.Random(seed)  # Per-game seeds; a fixed seed repeats the whole session
+        self.recorder = None  # Optional SessionRecorder, told about every game and question
+        self.profiles = []
+        self.trees = []
+        self.cooldowns = []
+        self.cooldown = min(COOLDOWN, len(self.services) - 1)
+        # Returns the index of the player the next question is drawn for
+        self.next_player = lambda: 0
+
+    def start_game(self, player_names, seed=None, profiles=None):
+        """Load (or create) a profile and weight tree for every player
+
+        The engine is reseeded with seed, or the next seed of the session.
+        profiles replaces the stored stats with snapshot() rows per player.
+        """
+        if profiles is not None:
+            self.profiles = [PlayerProfile(name, self.services) for name in player_names]
+            for profile, rows in zip(self.profiles, profiles):
+                profile.restore(rows)
+        elif self.store is not None:
+            self.profiles = [self.store.load(name, self.services) for name in player_names]
+        else:
+            self.profiles = [PlayerProfile(name, self.services) for name in player_names]
+        self.trees = [SumTree([p.weight(i) for i in range(len(self.services))]) for p in self.profiles]
+        self.cooldowns = [deque() for _ in self.profiles]
+
+        if seed is None:
+            seed = self.seeds.getrandbits(63)
+        self.engine.reseed(seed)
+        if self.recorder is not None:
+            self.recorder.start_game(self, player_names, seed)
+
+    def service(self, service_id):
+        return self.engine.service(service_id)
+
+    def option_names(self, question):
+        return self.engine.option_names(question)
+
+    def next_question(self):
+        """Draw a question for the next player in O(log n)"""
+        if not self.profiles:
+            return self.engine.next_question()
+        player = self.next_player()
+        tree = self.trees[player]
+        if tree.total() <= 0:
+            question = self.engine.next_question()
+        else:
+            service_id = tree.sample(self.engine.rng)
+
+            # Hold the service out for a few draws, releasing the oldest one
+            cooldown = self.cooldowns[player]
+            cooldown.append(service_id)
+            tree.update(service_id, 0.0)
+            if len(cooldown) > self.cooldown:
+                released = cooldown.popleft()
+                tree.update(released, self.profiles[player].weight(released))
+            question = self.engine.question_for(service_id)
+
+        if self.recorder is not None:
+            self.recorder.question(player, question)
+        return question
+
+    def record(self, player, service_id, correct, response_seconds):
+        """Update a player's stats and weights after an answer in O(log n)"""
+        if not self.profiles:
+            return
+        profile = self.profiles[player]
+        profile.record(service_id, correct, response_seconds * 1000)
+        if service_id not in self.cooldowns[player]:
+            self.trees[player].update(service_id, profile.weight(service_id))
+
+    def save(self):
+        """Persist every player's changed stats"""
+        if self.store is None:
+            return
+        for profile in self.profiles:
+            if profile.dirty:
+                self.store.save(profile)
@@ -0,0 +1,89 @@
+"""
+Non-blocking answer feedback for the AWS Icon Game
+
+Instead of a modal messagebox after every answer, the games show a banner
+inside the window and dismiss it with Tk's after() once a short delay has
+passed. The next question is drawn behind the banner straight away, and the
+time from click to next question on screen is recorded.
+"""
+import logging
+import time
+import tkinter as tk
+
+FEEDBACK_DELAY_MS = 1200
+CORRECT_COLOR = "#1D8102"
+INCORRECT_COLOR = "#D13212"
+
+logger = logging.getLogger(__name__)
+
+
+class FeedbackBanner:
+    """An in-window label that shows a message and clears itself after a delay"""
+
+    def __init__(self, parent, delay_ms=FEEDBACK_DELAY_MS):
+        self.delay_ms = delay_ms
+        self.after_id = None
+        self.on_done = None
+        # Always packed so showing a message never shifts the layout
+        self.label = tk.Label(
+            parent,
+            text="",
+            font=("Arial", 14, "bold"),
+            fg="white",
+            bg=parent["bg"],
+            height=1
+        )
+        self.label.pack(pady=5, fill=tk.X)
+
+    @property
+    def active(self):
+        return self.after_id is not None
+
+    def show(self, text, color, on_done=None):
+        """Show a message, calling on_done once it has been dismissed"""
+        self.cancel()
+        self.on_done = on_done
+        self.label.config(text=text, bg=color)
+        self.after_id = self.label.after(self.delay_ms, self.dismiss)
+
+    def dismiss(self):
+        """Clear the message and run the completion callback"""
+        self.after_id = None
+        self.label.config(text="", bg=self.label.master["bg"])
+        on_done, self.on_done = self.on_done, None
+        if on_done:
+            on_done()
+
+    def cancel(self):
+        """Drop a pending dismissal without running its callback"""
+        if self.after_id is not None:
+            self.label.after_cancel(self.after_id)
+            self.after_id = None
+        self.on_done = None
+
+
+class AnswerLatency:
+    """Records the time from an answer click to the next question on screen"""
+
+    def __init__(self):
+        self.samples = []
+
+    def start(self):
+        """Return a timestamp to pass to finish() once the question is drawn"""
+        return time.perf_counter()
+
+    def finish(self, started):
+        """Record one answer-to-next-question interval"""
+        elapsed = time.perf_counter() - started
+        self.samples.append(elapsed)
+        logger.info("Answer to next question: %.1f ms", elapsed * 1000)
+
+    def summary(self):
+        """Return count, mean and max latency in milliseconds"""
+        if not self.samples:
+            return {"count": 0, "mean_ms": 0.0, "max_ms": 0.0}
+        return {
+            "count": len(self.samples),
+            "mean_ms": sum(self.samples) / len(self.samples) * 1000,
+            "max_ms": max(self.samples) * 1000,
+        }
@@ -1,115 +1,54 @@
 #!/usr/bin/env python3
 import tkinter as tk
-from tkinter import messagebox
-import random
-import os
-import requests
-from PIL import Image, ImageTk
-from io import BytesIO
+import argparse
+import logging
+import time
+from catalog import load_catalog
+from game_state import GameState
+from game_profiler import Profiler, add_profile_arguments
+from session_recorder import SessionRecorder, add_recording_arguments
+from question_engine import QuestionEngine
+from answer_feedback import (
+    FeedbackBanner, AnswerLatency, FEEDBACK_DELAY_MS, CORRECT_COLOR, INCORRECT_COLOR
+)
 
 class AWSIconGame:
-    def __init__(self, root):
+    def __init__(self, root, feedback_delay_ms=FEEDBACK_DELAY_MS, categories=None, hard_mode=False,
+                 seed=None, recorder=None):
         self.root = root
         self.root.title("AWS Service Icon Game")
-        self.root.geometry("600x500")
+        self.root.geometry("600x540")
         self.root.configure(bg="#232F3E")  # AWS dark blue background
         
         # Game state
-        self.score = 0
-        self.lives = 3
-        self.aws_services = self.load_aws_services()
+        self.game_state = GameState(["Player 1"])
+        self.aws_services = self.load_aws_services(categories)
         self.current_service = None
-        self.icon_cache = {}  # Cache for downloaded icons
+        self.correct_index = None  # No question until the first paint
+        self.current_service_id = None
+        self.question_engine = QuestionEngine(self.aws_services)
+        # Icon loading pulls in Pillow, so it is set up after the first paint
+        self.icon_cache = None
+        self.question_pipeline = None
+        self.scheduler = None  # Adaptive question order, also set up after the first paint
+        self.question_shown_at = None
+        self.feedback_delay_ms = feedback_delay_ms
+        self.answer_latency = AnswerLatency()
+        self.hard_mode = hard_mode  # Look-alike wrong answers from the similarity index
+        self.seed = seed  # Session seed; each game's questions are seeded from it
+        self.recorder = recorder  # SessionRecorder with --record, otherwise None
         
         # UI elements
         self.setup_ui()
         
-        # Start the game
-        self.next_question()
+        # Start the game once the window is on screen
+        self.after_first_paint(self.next_question)
     
-    def load_aws_services(self):
+    @staticmethod
+    def load_aws_services(categories=None):
         """Load AWS services data with their icons and names"""
-        # Comprehensive list of AWS services
-        services = [
-            # Compute
-            {"name": "Amazon EC2", "icon": "ec2.png"},
-            {"name": "AWS Lambda", "icon": "lambda.png"},
-            {"name": "Amazon ECS", "icon": "ecs.png"},
-            {"name": "Amazon EKS", "icon": "eks.png"},
-            {"name": "AWS Fargate", "icon": "fargate.png"},
-            {"name": "AWS Batch", "icon": "batch.png"},
-            {"name": "Amazon Lightsail", "icon": "lightsail.png"},
-            {"name": "AWS Elastic Beanstalk", "icon": "elasticbeanstalk.png"},
-            
-            # Storage
-            {"name": "Amazon S3", "icon": "s3.png"},
-            {"name": "Amazon EBS", "icon": "ebs.png"},
-            {"name": "Amazon EFS", "icon": "efs.png"},
-            {"name": "Amazon S3 Glacier", "icon": "glacier.png"},
-            {"name": "AWS Storage Gateway", "icon": "storagegateway.png"},
-            
-            # Database
-            {"name": "Amazon RDS", "icon": "rds.png"},
-            {"name": "Amazon DynamoDB", "icon": "dynamodb.png"},
-            {"name": "Amazon Aurora", "icon": "aurora.png"},
-            {"name": "Amazon Redshift", "icon": "redshift.png"},
-            {"name": "Amazon ElastiCache", "icon": "elasticache.png"},
-            {"name": "Amazon Neptune", "icon": "neptune.png"},
-            {"name": "Amazon DocumentDB", "icon": "documentdb.png"},
-            
-            # Networking & Content Delivery
-            {"name": "Amazon VPC", "icon": "vpc.png"},
-            {"name": "Amazon CloudFront", "icon": "cloudfront.png"},
-            {"name": "Amazon Route 53", "icon": "route53.png"},
-            {"name": "AWS Direct Connect", "icon": "directconnect.png"},
-            {"name": "Elastic Load Balancing", "icon": "elb.png"},
-            {"name": "AWS Global Accelerator", "icon": "globalaccelerator.png"},
-            
-            # Security, Identity & Compliance
-            {"name": "AWS IAM", "icon": "iam.png"},
-            {"name": "Amazon Cognito", "icon": "cognito.png"},
-            {"name": "AWS Shield", "icon": "shield.png"},
-            {"name": "AWS WAF", "icon": "waf.png"},
-            {"name": "AWS KMS", "icon": "kms.png"},
-            {"name": "AWS Secrets Manager", "icon": "secretsmanager.png"},
-            
-            # Management & Governance
-            {"name": "Amazon CloudWatch", "icon": "cloudwatch.png"},
-            {"name": "AWS CloudTrail", "icon": "cloudtrail.png"},
-            {"name": "AWS Config", "icon": "config.png"},
-            {"name": "AWS CloudFormation", "icon": "cloudformation.png"},
-            {"name": "AWS Systems Manager", "icon": "systemsmanager.png"},
-            {"name": "AWS Organizations", "icon": "organizations.png"},
-            
-            # Application Integration
-            {"name": "Amazon SNS", "icon": "sns.png"},
-            {"name": "Amazon SQS", "icon": "sqs.png"},
-            {"name": "AWS Step Functions", "icon": "stepfunctions.png"},
-            {"name": "Amazon EventBridge", "icon": "eventbridge.png"},
-            {"name": "Amazon MQ", "icon": "mq.png"},
-            
-            # Developer Tools
-            {"name": "AWS CodePipeline", "icon": "codepipeline.png"},
-            {"name": "AWS CodeBuild", "icon": "codebuild.png"},
-            {"name": "AWS CodeDeploy", "icon": "codedeploy.png"},
-            {"name": "AWS CodeCommit", "icon": "codecommit.png"},
-            
-            # Analytics
-            {"name": "Amazon Athena", "icon": "athena.png"},
-            {"name": "Amazon EMR", "icon": "emr.png"},
-            {"name": "Amazon Kinesis", "icon": "kinesis.png"},
-            {"name": "AWS Glue", "icon": "glue.png"},
-            
-            # Machine Learning
-            {"name": "Amazon SageMaker", "icon": "sagemaker.png"},
-            {"name": "Amazon Rekognition", "icon": "rekognition.png"},
-            {"name": "Amazon Comprehend", "icon": "comprehend.png"},
-            
-            # API Services
-            {"name": "Amazon API Gateway", "icon": "apigateway.png"},
-            {"name": "Amazon AppSync", "icon": "appsync.png"}
-        ]
-        return services
+        # Shared catalog from aws_services.json, optionally limited to some categories
+        return load_catalog().question_pool(categories)
     
     def setup_ui(self):
         """Set up the game UI"""
@@ -127,12 +66,13 @@ class AWSIconGame:
         self.title_label.pack()
         
         # Score and lives
+        player = self.game_state.current_player
         stats_frame = tk.Frame(self.root, bg="#232F3E")
         stats_frame.pack(pady=10)
         
         self.score_label = tk.Label(
             stats_frame,
-            text=f"Score: {self.score}",
+            text=f"Score: {player['score']}",
             font=("Arial", 14),
             fg="white",
             bg="#232F3E"
@@ -141,7 +81,7 @@ class AWSIconGame:
         
         self.lives_label = tk.Label(
             stats_frame,
-            text=f"Lives: {'❤️' * self.lives}",
+            text=f"Lives: {'❤️' * player['lives']}",
             font=("Arial", 14),
             fg="white",
             bg="#232F3E"
@@ -155,6 +95,9 @@ class AWSIconGame:
         self.icon_label = tk.Label(self.icon_frame, bg="#232F3E")
         self.icon_label.pack()
         
+        # Answer feedback, shown without blocking the event loop
+        self.feedback_banner = FeedbackBanner(self.root, self.feedback_delay_ms)
+        
         # Answer options
         self.options_frame = tk.Frame(self.root, bg="#232F3E")
         self.options_frame.pack(pady=20)
@@ -174,78 +117,149 @@ class AWSIconGame:
             btn.pack(pady=5)
             self.option_buttons.append(btn)
     
-    def load_image(self, icon_name):
-        """Load an image from the images directory"""
+    def set_options_state(self, state):
+        """Enable or disable all answer buttons"""
+        for btn in self.option_buttons:
+            btn.config(state=state)
+        if state == tk.NORMAL:
+            self.question_shown_at = time.perf_counter()
+    
+    def load_icons(self):
+        """Set up icon loading and prefetching, the first time it is needed"""
+        if self.icon_cache is not None:
+            return
+        
+        # Imported here so that Pillow is not loaded before the first screen is drawn
+        from icon_atlas import IconAtlas
+        from icon_bundle import IconBundle
+        from icon_cache import IconCache
+        from icon_derivatives import DerivativeCache
+        from question_pipeline import QuestionPipeline
+        from adaptive_scheduler import AdaptiveScheduler
+        
+        if self.hard_mode:
+            from icon_similarity import load_similar_services
+            self.question_engine.similar = load_similar_services(self.aws_services)
+            if self.question_engine.similar is None:
+                print("No similarity index found (run icon_similarity.py); using random answers")
+        
+        # Questions are weighted towards the services this player gets wrong
+        self.scheduler = AdaptiveScheduler(self.question_engine, self.open_player_stats(), self.seed)
+        self.scheduler.recorder = self.recorder
+        self.scheduler.start_game([self.game_state.current_player["name"]])
+        
+        # Shared LRU icon cache. The bundle and atlas are None until icon_bundle.py
+        # or icon_atlas.py has been run; with a bundle there is no atlas to decode
+        bundle = IconBundle.load()
+        atlas = IconAtlas.load() if bundle is None else None
+        self.icon_cache = IconCache(atlas, derivatives=DerivativeCache(), bundle=bundle)
+        self.question_pipeline = QuestionPipeline(
+            self.scheduler,
+            self.icon_cache.load_pixels,
+            is_cached=self.icon_cache.__contains__
+        )
+    
+    def open_player_stats(self):
+        """Open the per-player answer stats, or return None to keep them for this session only"""
+        import sqlite3
+        from adaptive_scheduler import PlayerStatsStore
         try:
-            # Check if image is in cache
-            if icon_name in self.icon_cache:
-                return self.icon_cache[icon_name]
-            
-            # Try to load from local directory
-            image_path = os.path.join("images", icon_name)
-            if os.path.exists(image_path):
-                img = Image.open(image_path)
-            else:
-                # Create a placeholder image
-                img = Image.new('RGB', (100, 100), color='#FF9900')
-            
-            img = img.resize((100, 100), Image.LANCZOS)
-            photo_img = ImageTk.PhotoImage(img)
-            
-            # Cache the image
-            self.icon_cache[icon_name] = photo_img
-            return photo_img
-        except Exception as e:
-            print(f"Error loading image: {e}")
-            # Return a placeholder if image can't be loaded
-            placeholder = Image.new('RGB', (100, 100), color='#FF9900')
-            return ImageTk.PhotoImage(placeholder)
+            return PlayerStatsStore()
+        except sqlite3.Error as e:
+            print(f"Could not open player stats database: {e}")
+            return None
+    
+    def after_first_paint(self, callback, fallback_ms=1000):
+        """Run callback once the window has first been drawn
+
+        Falls back to a timer in case the window is never exposed (e.g. it
+        starts minimised).
+        """
+        def run_once():
+            if pending:
+                pending.clear()
+                self.root.after_cancel(timer)
+                callback()
+        
+        def on_expose(event):
+            self.root.unbind("<Expose>", binding)
+            # Redraws triggered by the expose are idle tasks queued ahead of this one
+            self.root.after_idle(run_once)
+        
+        pending = [callback]
+        binding = self.root.bind("<Expose>", on_expose, add="+")
+        timer = self.root.after(fallback_ms, run_once)
+    
+    def load_image(self, icon_name, pixels=None):
+        """Load an image from the images directory, reusing prefetched pixels if given"""
+        return self.icon_cache.get(icon_name, pixels)
     
     def next_question(self):
         """Set up the next question"""
-        # Select a random service
-        self.current_service = random.choice(self.aws_services)
+        self.load_icons()
+        
+        # Take the next pregenerated question; its icon was decoded in the background
+        question, pixels = self.question_pipeline.next_question()
+        self.current_service = self.question_engine.service(question.service_id)
         
         # Load the icon
-        icon_image = self.load_image(self.current_service["icon"])
+        icon_image = self.load_image(self.current_service["icon"], pixels)
         self.icon_label.configure(image=icon_image)
         self.icon_label.image = icon_image  # Keep a reference
         
-        # Create answer options (1 correct, 2 incorrect)
-        options = [self.current_service["name"]]
-        
-        # Add two incorrect options
-        other_services = [s for s in self.aws_services if s != self.current_service]
-        incorrect_options = random.sample(other_services, 2)
-        options.extend([s["name"] for s in incorrect_options])
-        
-        # Shuffle options
-        random.shuffle(options)
-        
         # Update buttons
-        for i, option in enumerate(options):
+        for i, option in enumerate(self.question_engine.option_names(question)):
             self.option_buttons[i].config(text=option)
         
         # Store correct answer index
-        self.correct_index = options.index(self.current_service["name"])
+        self.correct_index = question.correct_index
+        self.current_service_id = question.service_id
+        if not self.feedback_banner.active:
+            self.question_shown_at = time.perf_counter()
     
     def check_answer(self, selected_index):
         """Check if the selected answer is correct"""
-        if selected_index == self.correct_index:
-            self.score += 1
-            self.score_label.config(text=f"Score: {self.score}")
-            messagebox.showinfo("Correct!", f"Yes, that's {self.current_service['name']}!")
-            self.next_question()
+        if self.feedback_banner.active or self.correct_index is None:
+            return  # Still showing feedback, or the first question is not up yet
+        
+        started = self.answer_latency.start()
+        result = self.game_state.answer(selected_index == self.correct_index)
+        player = result.player
+        self.set_options_state(tk.DISABLED)
+        response = started - self.question_shown_at
+        self.scheduler.record(0, self.current_service_id, result.correct, response)
+        if self.recorder is not None:
+            self.recorder.answer(0, self.current_service_id, self.correct_index, selected_index,
+                                 response, self.game_state, result)
+        
+        if result.correct:
+            self.score_label.config(text=f"Score: {player['score']}")
+            self.feedback_banner.show(
+                f"Correct! That's {self.current_service['name']}.",
+                CORRECT_COLOR,
+                on_done=lambda: self.set_options_state(tk.NORMAL)
+            )
         else:
-            self.lives -= 1
-            self.lives_label.config(text=f"Lives: {'❤️' * self.lives}")
+            self.lives_label.config(text=f"Lives: {'❤️' * player['lives']}")
+            
+            if result.game_over:
+                self.scheduler.save()
+                self.feedback_banner.show(
+                    f"Game Over! Your final score is {player['score']}.",
+                    INCORRECT_COLOR,
+                    on_done=self.show_game_over
+                )
+                return
             
-            if self.lives > 0:
-                messagebox.showinfo("Incorrect", f"Sorry, that was {self.current_service['name']}. You have {self.lives} lives left.")
-                self.next_question()
-            else:
-                messagebox.showinfo("Game Over", f"Game Over! Your final score is {self.score}.")
-                self.show_game_over()
+            self.feedback_banner.show(
+                f"Sorry, that was {self.current_service['name']}. You have {player['lives']} lives left.",
+                INCORRECT_COLOR,
+                on_done=lambda: self.set_options_state(tk.NORMAL)
+            )
+        
+        # Draw the next question behind the banner; the buttons unlock when it clears
+        self.next_question()
+        self.root.after_idle(self.answer_latency.finish, started)
     
     def show_game_over(self):
         """Show game over screen and restart option"""
@@ -268,7 +282,7 @@ class AWSIconGame:
         
         score_label = tk.Label(
             game_over_frame,
-            text=f"Your final score: {self.score}",
+            text=f"Your final score: {self.game_state.current_player['score']}",
             font=("Arial", 18),
             fg="white",
             bg="#232F3E"
@@ -297,8 +311,10 @@ class AWSIconGame:
     
     def restart_game(self):
         """Restart the game"""
-        self.score = 0
-        self.lives = 3
+        self.game_state = GameState(["Player 1"])
+        self.scheduler.start_game([self.game_state.current_player["name"]])
+        # Questions queued for the previous game came from its seed
+        self.question_pipeline.reset()
         
         # Clear the screen
         for widget in self.root.winfo_children():
@@ -311,9 +327,36 @@ class AWSIconGame:
         self.next_question()
 
 def main():
+    parser = argparse.ArgumentParser(description="AWS Service Icon Game")
+    parser.add_argument("--hard", action="store_true", help="wrong answers use look-alike icons")
+    add_recording_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    profiler = Profiler.from_args(args, AWSIconGame)  # None unless --profile was given
+    recorder = SessionRecorder.from_args(args, load_catalog().question_pool())
     root = tk.Tk()
-    game = AWSIconGame(root)
+    game = AWSIconGame(root, hard_mode=args.hard, seed=args.seed, recorder=recorder)
     root.mainloop()
+    
+    if game.question_pipeline is not None:
+        game.question_pipeline.shutdown()
+    if game.scheduler is not None:
+        game.scheduler.save()  # Keep what was learned in an unfinished game
+    stats = game.answer_latency.summary()
+    print(f"Answer to next question: {stats['count']} answers, "
+          f"mean {stats['mean_ms']:.1f} ms, max {stats['max_ms']:.1f} ms")
+    if game.question_pipeline is not None:
+        stats = game.question_pipeline.stats()
+        print(f"Icon prefetch: {stats['hits']} hits, {stats['misses']} misses")
+        stats = game.icon_cache.stats()
+        print(f"Icon cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['evictions']} evictions, {stats['bytes']} bytes")
+    if recorder is not None:
+        recorder.close()
+    if profiler is not None:
+        profiler.stop()
 
 if __name__ == "__main__":
     main()
@@ -1,132 +1,173 @@
 #!/usr/bin/env python3
 import tkinter as tk
-from tkinter import messagebox, simpledialog
-import random
-import os
-from PIL import Image, ImageTk
-import json
-from datetime import datetime
+from tkinter import simpledialog, messagebox
+import argparse
+import logging
+import sqlite3
+import time
+from catalog import load_catalog
+from game_state import GameState
+from game_profiler import Profiler, add_profile_arguments
+from session_recorder import SessionRecorder, add_recording_arguments
+from scoreboard import ScoreboardModel, VirtualScoreboard
+from high_score_store import HighScoreStore
+from adaptive_scheduler import AdaptiveScheduler, PlayerStatsStore
+from answer_feedback import (
+    FeedbackBanner, AnswerLatency, FEEDBACK_DELAY_MS, CORRECT_COLOR, INCORRECT_COLOR
+)
+from question_engine import QuestionEngine
+
+MAX_PLAYERS = 500
+NAME_ENTRY_LIMIT = 6  # Above this, names are typed one per line into a text box
 
 class AWSIconGameMultiplayer:
-    def __init__(self, root):
+    def __init__(self, root, feedback_delay_ms=FEEDBACK_DELAY_MS, categories=None,
+                 seed=None, recorder=None):
         self.root = root
         self.root.title("AWS Service Icon Game - Multiplayer")
-        self.root.geometry("800x600")
+        self.root.geometry("800x640")
         self.root.configure(bg="#232F3E")  # AWS dark blue background
         
         # Game state
-        self.players = []
-        self.current_player_index = 0
-        self.aws_services = self.load_aws_services()
+        self.game_state = None  # GameState for the game in progress
+        self.aws_services = self.load_aws_services(categories)
         self.current_service = None
-        self.icon_cache = {}  # Cache for downloaded icons
-        self.game_mode = None  # 'single' or 'multi'
-        self.high_scores = self.load_high_scores()
-        
-        # Start with mode selection
+        self.current_service_id = None
+        self.question_shown_at = None
+        self.question_engine = QuestionEngine(self.aws_services)
+        # Weighted towards each player's weak services; stats are opened with the icons
+        # Each game's questions are seeded from seed (a random one if None)
+        self.scheduler = AdaptiveScheduler(self.question_engine, seed=seed)
+        self.scheduler.next_player = self.upcoming_player
+        self.scheduler.recorder = recorder
+        self.recorder = recorder  # SessionRecorder with --record, otherwise None
+        # Icon loading pulls in Pillow, so it is set up after the first paint
+        self.icon_cache = None
+        self.question_pipeline = None
+        self.pipeline_reset_turn = 0  # Game turn when the pipeline was last reset
+        self.feedback_delay_ms = feedback_delay_ms
+        self.answer_latency = AnswerLatency()
+        self.game_mode = None  # 'single', 'multi' or 'network'
+        self.high_scores = None  # Opened on first use by load_high_scores
+        self.network_game = None  # NetworkGame while joined to a room server
+        self.hard_mode_var = tk.BooleanVar(self.root, False)
+        self.similar_services = None  # Look-alike table for hard mode, loaded on first use
+        
+        # Start with mode selection, then get icons ready while the player chooses
         self.show_welcome_screen()
+        self.after_first_paint(self.load_icons)
+    
+    def load_icons(self):
+        """Set up icon loading and prefetching, the first time it is needed"""
+        if self.icon_cache is not None:
+            return
+        
+        # Imported here so that Pillow is not loaded before the first screen is drawn
+        from icon_atlas import IconAtlas
+        from icon_bundle import IconBundle
+        from icon_cache import IconCache
+        from icon_derivatives import DerivativeCache
+        from question_pipeline import QuestionPipeline
+        
+        try:
+            self.scheduler.store = PlayerStatsStore()
+        except sqlite3.Error as e:
+            print(f"Could not open player stats database: {e}")
+        
+        # Shared LRU icon cache. The bundle and atlas are None until icon_bundle.py
+        # or icon_atlas.py has been run; with a bundle there is no atlas to decode
+        bundle = IconBundle.load()
+        atlas = IconAtlas.load() if bundle is None else None
+        self.icon_cache = IconCache(atlas, derivatives=DerivativeCache(), bundle=bundle)
+        self.question_pipeline = QuestionPipeline(
+            self.scheduler,
+            self.icon_cache.load_pixels,
+            is_cached=self.icon_cache.__contains__
+        )
+    
+    def after_first_paint(self, callback, fallback_ms=1000):
+        """Run callback once the window has first been drawn
+
+        Falls back to a timer in case the window is never exposed (e.g. it
+        starts minimised).
+        """
+        def run_once():
+            if pending:
+                pending.clear()
+                self.root.after_cancel(timer)
+                callback()
+        
+        def on_expose(event):
+            self.root.unbind("<Expose>", binding)
+            # Redraws triggered by the expose are idle tasks queued ahead of this one
+            self.root.after_idle(run_once)
+        
+        pending = [callback]
+        binding = self.root.bind("<Expose>", on_expose, add="+")
+        timer = self.root.after(fallback_ms, run_once)
+    
+    def upcoming_player(self):
+        """Index of the player who will answer the question being drawn now
+
+        The pipeline draws questions a few turns ahead; the question drawn
+        n-th since it was last reset is answered n turns after that reset.
+        The prediction assumes nobody goes out meanwhile, so the queue is
+        redrawn whenever a player does.
+        """
+        if self.game_state is None or self.question_pipeline is None:
+            return 0
+        turns_since_reset = self.game_state.turns - self.pipeline_reset_turn
+        return self.game_state.player_after(self.question_pipeline.drawn - turns_since_reset)
+    
+    def reset_pipeline(self):
+        """Drop the queued questions and draw them again for the current seating"""
+        self.pipeline_reset_turn = self.game_state.turns
+        self.question_pipeline.reset()
+    
+    def start_game(self, names):
+        """Start a game for the given players and draw their first question"""
+        self.game_state = GameState(names)
+        self.load_icons()
+        self.question_engine.similar = self.load_similar_services() if self.hard_mode_var.get() else None
+        self.scheduler.start_game(names)
+        # Questions queued for the previous game were weighted for its players
+        self.reset_pipeline()
+        self.setup_game_ui()
+        self.next_question()
+    
+    def load_similar_services(self):
+        """Load the look-alike table for hard mode, or None if it has not been built"""
+        if self.similar_services is None:
+            from icon_similarity import load_similar_services
+            self.similar_services = load_similar_services(self.aws_services)
+            if self.similar_services is None:
+                print("No similarity index found (run icon_similarity.py); using random answers")
+        return self.similar_services
     
     def load_high_scores(self):
-        """Load high scores from file"""
+        """Open the high score store, importing high_scores.json on first run"""
+        if self.high_scores is not None:
+            return self.high_scores
         try:
-            if os.path.exists("high_scores.json"):
-                with open("high_scores.json", "r") as f:
-                    return json.load(f)
-            return []
-        except:
-            return []
+            self.high_scores = HighScoreStore()
+        except sqlite3.Error as e:
+            print(f"Could not open high score database: {e}")
+            # Keep scores for this session only
+            self.high_scores = HighScoreStore(":memory:", legacy_json_path=None)
+        return self.high_scores
     
-    def save_high_scores(self):
-        """Save high scores to file"""
+    def save_high_scores(self, player):
+        """Append a finished player's score to the store"""
         try:
-            with open("high_scores.json", "w") as f:
-                json.dump(self.high_scores, f)
-        except:
-            pass
+            self.load_high_scores().add(player["name"], player["score"])
+        except sqlite3.Error as e:
+            print(f"Could not save high score: {e}")
     
-    def load_aws_services(self):
+    @staticmethod
+    def load_aws_services(categories=None):
         """Load AWS services data with their icons and names"""
-        # Comprehensive list of AWS services
-        services = [
-            # Compute
-            {"name": "Amazon EC2", "icon": "ec2.png"},
-            {"name": "AWS Lambda", "icon": "lambda.png"},
-            {"name": "Amazon ECS", "icon": "ecs.png"},
-            {"name": "Amazon EKS", "icon": "eks.png"},
-            {"name": "AWS Fargate", "icon": "fargate.png"},
-            {"name": "AWS Batch", "icon": "batch.png"},
-            {"name": "Amazon Lightsail", "icon": "lightsail.png"},
-            {"name": "AWS Elastic Beanstalk", "icon": "elasticbeanstalk.png"},
-            
-            # Storage
-            {"name": "Amazon S3", "icon": "s3.png"},
-            {"name": "Amazon EBS", "icon": "ebs.png"},
-            {"name": "Amazon EFS", "icon": "efs.png"},
-            {"name": "Amazon S3 Glacier", "icon": "glacier.png"},
-            {"name": "AWS Storage Gateway", "icon": "storagegateway.png"},
-            
-            # Database
-            {"name": "Amazon RDS", "icon": "rds.png"},
-            {"name": "Amazon DynamoDB", "icon": "dynamodb.png"},
-            {"name": "Amazon Aurora", "icon": "aurora.png"},
-            {"name": "Amazon Redshift", "icon": "redshift.png"},
-            {"name": "Amazon ElastiCache", "icon": "elasticache.png"},
-            {"name": "Amazon Neptune", "icon": "neptune.png"},
-            {"name": "Amazon DocumentDB", "icon": "documentdb.png"},
-            
-            # Networking & Content Delivery
-            {"name": "Amazon VPC", "icon": "vpc.png"},
-            {"name": "Amazon CloudFront", "icon": "cloudfront.png"},
-            {"name": "Amazon Route 53", "icon": "route53.png"},
-            {"name": "AWS Direct Connect", "icon": "directconnect.png"},
-            {"name": "Elastic Load Balancing", "icon": "elb.png"},
-            {"name": "AWS Global Accelerator", "icon": "globalaccelerator.png"},
-            
-            # Security, Identity & Compliance
-            {"name": "AWS IAM", "icon": "iam.png"},
-            {"name": "Amazon Cognito", "icon": "cognito.png"},
-            {"name": "AWS Shield", "icon": "shield.png"},
-            {"name": "AWS WAF", "icon": "waf.png"},
-            {"name": "AWS KMS", "icon": "kms.png"},
-            {"name": "AWS Secrets Manager", "icon": "secretsmanager.png"},
-            
-            # Management & Governance
-            {"name": "Amazon CloudWatch", "icon": "cloudwatch.png"},
-            {"name": "AWS CloudTrail", "icon": "cloudtrail.png"},
-            {"name": "AWS Config", "icon": "config.png"},
-            {"name": "AWS CloudFormation", "icon": "cloudformation.png"},
-            {"name": "AWS Systems Manager", "icon": "systemsmanager.png"},
-            {"name": "AWS Organizations", "icon": "organizations.png"},
-            
-            # Application Integration
-            {"name": "Amazon SNS", "icon": "sns.png"},
-            {"name": "Amazon SQS", "icon": "sqs.png"},
-            {"name": "AWS Step Functions", "icon": "stepfunctions.png"},
-            {"name": "Amazon EventBridge", "icon": "eventbridge.png"},
-            {"name": "Amazon MQ", "icon": "mq.png"},
-            
-            # Developer Tools
-            {"name": "AWS CodePipeline", "icon": "codepipeline.png"},
-            {"name": "AWS CodeBuild", "icon": "codebuild.png"},
-            {"name": "AWS CodeDeploy", "icon": "codedeploy.png"},
-            {"name": "AWS CodeCommit", "icon": "codecommit.png"},
-            
-            # Analytics
-            {"name": "Amazon Athena", "icon": "athena.png"},
-            {"name": "Amazon EMR", "icon": "emr.png"},
-            {"name": "Amazon Kinesis", "icon": "kinesis.png"},
-            {"name": "AWS Glue", "icon": "glue.png"},
-            
-            # Machine Learning
-            {"name": "Amazon SageMaker", "icon": "sagemaker.png"},
-            {"name": "Amazon Rekognition", "icon": "rekognition.png"},
-            {"name": "Amazon Comprehend", "icon": "comprehend.png"},
-            
-            # API Services
-            {"name": "Amazon API Gateway", "icon": "apigateway.png"},
-            {"name": "Amazon AppSync", "icon": "appsync.png"}
-        ]
-        return services
+        # Shared catalog from aws_services.json, optionally limited to some categories
+        return load_catalog().question_pool(categories)
     
     def show_welcome_screen(self):
         """Show welcome screen with game mode selection"""
@@ -184,6 +225,30 @@ class AWSIconGameMultiplayer:
         )
         multi_button.pack(pady=10)
         
+        network_button = tk.Button(
+            mode_frame,
+            text="Join Network Game",
+            font=("Arial", 16),
+            width=15,
+            bg="#FF9900",
+            activebackground="#EC7211",
+            command=self.show_join_screen
+        )
+        network_button.pack(pady=10)
+        
+        hard_mode_check = tk.Checkbutton(
+            mode_frame,
+            text="Hard mode (look-alike answers)",
+            variable=self.hard_mode_var,
+            font=("Arial", 12),
+            fg="white",
+            bg="#232F3E",
+            selectcolor="#232F3E",
+            activebackground="#232F3E",
+            activeforeground="white"
+        )
+        hard_mode_check.pack(pady=5)
+        
         # High scores button
         high_scores_button = tk.Button(
             welcome_frame,
@@ -226,12 +291,16 @@ class AWSIconGameMultiplayer:
         )
         title_label.pack(pady=20)
         
-        # Sort high scores
-        sorted_scores = sorted(self.high_scores, key=lambda x: x["score"], reverse=True)
+        # Top 10, served from the score index
+        try:
+            top_scores = self.load_high_scores().top(10)
+        except sqlite3.Error as e:
+            print(f"Could not read high scores: {e}")
+            top_scores = []
         
         # Display scores
-        if sorted_scores:
-            for i, score_data in enumerate(sorted_scores[:10]):  # Show top 10
+        if top_scores:
+            for i, score_data in enumerate(top_scores):
                 score_text = f"{i+1}. {score_data['name']}: {score_data['score']} points ({score_data['date']})"
                 score_label = tk.Label(
                     scores_frame,
@@ -262,6 +331,80 @@ class AWSIconGameMultiplayer:
         )
         back_button.pack(pady=30)
     
+    def show_join_screen(self):
+        """Ask for a room server address, room and name"""
+        # Clear the screen
+        for widget in self.root.winfo_children():
+            widget.destroy()
+        
+        join_frame = tk.Frame(self.root, bg="#232F3E")
+        join_frame.pack(expand=True)
+        
+        title_label = tk.Label(
+            join_frame,
+            text="Join Network Game",
+            font=("Arial", 24, "bold"),
+            fg="#FF9900",
+            bg="#232F3E"
+        )
+        title_label.pack(pady=20)
+        
+        self.join_entries = {}
+        for field, default in (("Server (host:port)", "127.0.0.1:8765"), ("Room", "aws"), ("Name", "Player")):
+            field_frame = tk.Frame(join_frame, bg="#232F3E")
+            field_frame.pack(pady=10)
+            
+            field_label = tk.Label(
+                field_frame,
+                text=f"{field}:",
+                font=("Arial", 14),
+                fg="white",
+                bg="#232F3E",
+                width=16,
+                anchor="e"
+            )
+            field_label.pack(side=tk.LEFT)
+            
+            field_entry = tk.Entry(field_frame, font=("Arial", 14), width=20)
+            field_entry.insert(0, default)
+            field_entry.pack(side=tk.LEFT, padx=10)
+            self.join_entries[field] = field_entry
+        
+        join_button = tk.Button(
+            join_frame,
+            text="Join",
+            font=("Arial", 14),
+            bg="#FF9900",
+            activebackground="#EC7211",
+            command=self.join_network_game
+        )
+        join_button.pack(pady=20)
+        
+        back_button = tk.Button(
+            join_frame,
+            text="Back to Menu",
+            font=("Arial", 12),
+            bg="#FF9900",
+            activebackground="#EC7211",
+            command=self.show_welcome_screen
+        )
+        back_button.pack(pady=10)
+    
+    def join_network_game(self):
+        """Connect to a room server and hand the window over to the network client"""
+        from room_client import NetworkGame, RoomConnection, parse_address
+        
+        self.game_mode = 'network'
+        try:
+            host, port = parse_address(self.join_entries["Server (host:port)"].get())
+            connection = RoomConnection(host, port)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Network Game", f"Could not connect: {e}", parent=self.root)
+            return
+        room = self.join_entries["Room"].get().strip() or "aws"
+        name = self.join_entries["Name"].get().strip() or "Player"
+        self.network_game = NetworkGame(self, connection, room, name)
+    
     def start_single_player(self):
         """Start single player mode"""
         self.game_mode = 'single'
@@ -269,10 +412,7 @@ class AWSIconGameMultiplayer:
         if not player_name:
             player_name = "Player 1"
         
-        self.players = [{"name": player_name, "lives": 3, "score": 0}]
-        self.current_player_index = 0
-        self.setup_game_ui()
-        self.next_question()
+        self.start_game([player_name])
     
     def setup_multiplayer(self):
         """Setup multiplayer game"""
@@ -309,17 +449,18 @@ class AWSIconGameMultiplayer:
         )
         count_label.pack(side=tk.LEFT, padx=10)
         
-        player_counts = [2, 3, 4, 5, 6]
         self.player_count_var = tk.StringVar(self.root)
-        self.player_count_var.set(str(player_counts[0]))
+        self.player_count_var.set("2")
         
-        count_menu = tk.OptionMenu(
+        count_spinbox = tk.Spinbox(
             count_frame,
-            self.player_count_var,
-            *[str(c) for c in player_counts]
+            from_=2,
+            to=MAX_PLAYERS,
+            textvariable=self.player_count_var,
+            font=("Arial", 14),
+            width=5
         )
-        count_menu.config(bg="#FF9900", activebackground="#EC7211", width=5)
-        count_menu.pack(side=tk.LEFT)
+        count_spinbox.pack(side=tk.LEFT)
         
         # Start button
         start_button = tk.Button(
@@ -345,7 +486,11 @@ class AWSIconGameMultiplayer:
     
     def get_player_names(self):
         """Get names for all players"""
-        player_count = int(self.player_count_var.get())
+        try:
+            player_count = int(self.player_count_var.get())
+        except ValueError:
+            player_count = 2
+        player_count = max(2, min(player_count, MAX_PLAYERS))
         
         # Clear the screen
         for widget in self.root.winfo_children():
@@ -365,9 +510,31 @@ class AWSIconGameMultiplayer:
         )
         title_label.pack(pady=20)
         
-        # Name entry fields
+        # Name entry fields; large classes type names one per line instead
         self.name_entries = []
-        for i in range(player_count):
+        self.names_text = None
+        if player_count > NAME_ENTRY_LIMIT:
+            hint_label = tk.Label(
+                names_frame,
+                text=f"One name per line ({player_count} players):",
+                font=("Arial", 14),
+                fg="white",
+                bg="#232F3E"
+            )
+            hint_label.pack()
+            
+            text_frame = tk.Frame(names_frame, bg="#232F3E")
+            text_frame.pack(pady=10)
+            
+            self.names_text = tk.Text(text_frame, font=("Arial", 12), width=30, height=12)
+            self.names_text.insert("1.0", "\n".join(f"Player {i+1}" for i in range(player_count)))
+            self.names_text.pack(side=tk.LEFT)
+            
+            names_scrollbar = tk.Scrollbar(text_frame, command=self.names_text.yview)
+            names_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            self.names_text.config(yscrollcommand=names_scrollbar.set)
+        
+        for i in range(player_count if self.names_text is None else 0):
             player_frame = tk.Frame(names_frame, bg="#232F3E")
             player_frame.pack(pady=10)
             
@@ -415,16 +582,23 @@ class AWSIconGameMultiplayer:
     
     def start_multiplayer(self):
         """Start multiplayer game with entered player names"""
-        self.players = []
-        for entry in self.name_entries:
-            name = entry.get().strip()
+        if self.names_text is not None:
+            # One player per non-blank line
+            lines = self.names_text.get("1.0", tk.END).splitlines()
+            entered = [line for line in lines if line.strip()][:MAX_PLAYERS]
+        else:
+            entered = [entry.get() for entry in self.name_entries]
+        while len(entered) < 2:
+            entered.append("")
+        
+        names = []
+        for name in entered:
+            name = name.strip()
             if not name:
-                name = f"Player {len(self.players) + 1}"
-            self.players.append({"name": name, "lives": 3, "score": 0})
+                name = f"Player {len(names) + 1}"
+            names.append(name)
         
-        self.current_player_index = 0
-        self.setup_game_ui()
-        self.next_question()
+        self.start_game(names)
     
     def setup_game_ui(self):
         """Set up the game UI"""
@@ -449,7 +623,8 @@ class AWSIconGameMultiplayer:
         self.player_frame = tk.Frame(self.root, bg="#232F3E")
         self.player_frame.pack(pady=5, fill=tk.X)
         
-        # Will be populated in update_player_info
+        # Widgets are created once here and updated in place by update_player_info
+        self.build_player_info()
         
         # Icon display
         self.icon_frame = tk.Frame(self.root, bg="#232F3E")
@@ -458,6 +633,9 @@ class AWSIconGameMultiplayer:
         self.icon_label = tk.Label(self.icon_frame, bg="#232F3E")
         self.icon_label.pack()
         
+        # Answer feedback, shown without blocking the event loop
+        self.feedback_banner = FeedbackBanner(self.root, self.feedback_delay_ms)
+        
         # Answer options
         self.options_frame = tk.Frame(self.root, bg="#232F3E")
         self.options_frame.pack(pady=10)
@@ -480,18 +658,20 @@ class AWSIconGameMultiplayer:
         # Update player info
         self.update_player_info()
     
-    def update_player_info(self):
-        """Update the player information display"""
-        # Clear existing player info
-        for widget in self.player_frame.winfo_children():
-            widget.destroy()
-        
-        current_player = self.players[self.current_player_index]
-        
+    def set_options_state(self, state):
+        """Enable or disable all answer buttons"""
+        for btn in self.option_buttons:
+            btn.config(state=state)
+        if state == tk.NORMAL:
+            self.question_shown_at = time.perf_counter()
+    
+    def build_player_info(self):
+        """Create the player information widgets for a new game"""
         # Current player indicator
+        self.current_player_var = tk.StringVar(self.root)
         current_label = tk.Label(
             self.player_frame,
-            text=f"Current Player: {current_player['name']}",
+            textvariable=self.current_player_var,
             font=("Arial", 14, "bold"),
             fg="#FF9900",
             bg="#232F3E"
@@ -502,26 +682,30 @@ class AWSIconGameMultiplayer:
         stats_frame = tk.Frame(self.player_frame, bg="#232F3E")
         stats_frame.pack()
         
+        self.current_score_var = tk.StringVar(self.root)
         score_label = tk.Label(
             stats_frame,
-            text=f"Score: {current_player['score']}",
+            textvariable=self.current_score_var,
             font=("Arial", 12),
             fg="white",
             bg="#232F3E"
         )
         score_label.pack(side=tk.LEFT, padx=20)
         
+        self.current_lives_var = tk.StringVar(self.root)
         lives_label = tk.Label(
             stats_frame,
-            text=f"Lives: {'❤️' * current_player['lives']}",
+            textvariable=self.current_lives_var,
             font=("Arial", 12),
             fg="white",
             bg="#232F3E"
         )
         lives_label.pack(side=tk.RIGHT, padx=20)
         
-        # All players status
-        if self.game_mode == 'multi' and len(self.players) > 1:
+        # All players status, sorted by score; only the visible rows are drawn
+        self.scoreboard = None
+        self.highlighted_index = None
+        if self.game_mode == 'multi' and self.game_state.is_multiplayer:
             all_players_frame = tk.Frame(self.player_frame, bg="#232F3E")
             all_players_frame.pack(pady=10)
             
@@ -534,135 +718,103 @@ class AWSIconGameMultiplayer:
             )
             all_players_label.pack()
             
-            for i, player in enumerate(self.players):
-                player_status = tk.Label(
-                    all_players_frame,
-                    text=f"{player['name']}: {player['score']} pts, {'❤️' * player['lives']}",
-                    font=("Arial", 10),
-                    fg="white" if i != self.current_player_index else "#FF9900",
-                    bg="#232F3E"
-                )
-                player_status.pack()
+            self.scoreboard = VirtualScoreboard(
+                all_players_frame,
+                ScoreboardModel(self.game_state.players),
+                highlight_index=self.game_state.current_player_index
+            )
+            self.scoreboard.pack()
     
-    def load_image(self, icon_name):
-        """Load an image from the images directory"""
-        try:
-            # Check if image is in cache
-            if icon_name in self.icon_cache:
-                return self.icon_cache[icon_name]
-            
-            # Try to load from local directory
-            image_path = os.path.join("images", icon_name)
-            if os.path.exists(image_path):
-                img = Image.open(image_path)
-            else:
-                # Create a placeholder image
-                img = Image.new('RGB', (100, 100), color='#FF9900')
-            
-            img = img.resize((100, 100), Image.LANCZOS)
-            photo_img = ImageTk.PhotoImage(img)
-            
-            # Cache the image
-            self.icon_cache[icon_name] = photo_img
-            return photo_img
-        except Exception as e:
-            print(f"Error loading image: {e}")
-            # Return a placeholder if image can't be loaded
-            placeholder = Image.new('RGB', (100, 100), color='#FF9900')
-            return ImageTk.PhotoImage(placeholder)
+    def update_player_info(self):
+        """Update the player information display in place"""
+        current_player = self.game_state.current_player
+        self.current_player_var.set(f"Current Player: {current_player['name']}")
+        self.current_score_var.set(f"Score: {current_player['score']}")
+        self.current_lives_var.set(f"Lives: {'❤️' * current_player['lives']}")
+        
+        if self.scoreboard is None:
+            return
+        
+        # Only the player who just answered can have a new score or lives
+        if self.highlighted_index is not None:
+            self.scoreboard.update_player(self.highlighted_index)
+        self.highlighted_index = self.game_state.current_player_index
+        self.scoreboard.set_highlight(self.highlighted_index)
+    
+    def load_image(self, icon_name, pixels=None):
+        """Load an image from the images directory, reusing prefetched pixels if given"""
+        return self.icon_cache.get(icon_name, pixels)
     
     def next_question(self):
         """Set up the next question"""
-        # Select a random service
-        self.current_service = random.choice(self.aws_services)
+        self.load_icons()
+        
+        # Take the next pregenerated question; its icon was decoded in the background
+        question, pixels = self.question_pipeline.next_question()
+        self.current_service = self.question_engine.service(question.service_id)
         
         # Load the icon
-        icon_image = self.load_image(self.current_service["icon"])
+        icon_image = self.load_image(self.current_service["icon"], pixels)
         self.icon_label.configure(image=icon_image)
         self.icon_label.image = icon_image  # Keep a reference
         
-        # Create answer options (1 correct, 2 incorrect)
-        options = [self.current_service["name"]]
-        
-        # Add two incorrect options
-        other_services = [s for s in self.aws_services if s != self.current_service]
-        incorrect_options = random.sample(other_services, 2)
-        options.extend([s["name"] for s in incorrect_options])
-        
-        # Shuffle options
-        random.shuffle(options)
-        
         # Update buttons
-        for i, option in enumerate(options):
+        for i, option in enumerate(self.question_engine.option_names(question)):
             self.option_buttons[i].config(text=option)
         
         # Store correct answer index
-        self.correct_index = options.index(self.current_service["name"])
+        self.correct_index = question.correct_index
+        self.current_service_id = question.service_id
+        if not self.feedback_banner.active:
+            self.question_shown_at = time.perf_counter()
     
     def check_answer(self, selected_index):
         """Check if the selected answer is correct"""
-        current_player = self.players[self.current_player_index]
-        
-        if selected_index == self.correct_index:
-            # Correct answer
-            current_player["score"] += 1
-            messagebox.showinfo("Correct!", f"Yes, that's {self.current_service['name']}!")
+        if self.feedback_banner.active:
+            return  # Still showing feedback for the previous answer
+        
+        started = self.answer_latency.start()
+        player_index = self.game_state.current_player_index
+        result = self.game_state.answer(selected_index == self.correct_index)
+        current_player = result.player
+        self.set_options_state(tk.DISABLED)
+        response = started - self.question_shown_at
+        self.scheduler.record(player_index, self.current_service_id, result.correct, response)
+        if self.recorder is not None:
+            self.recorder.answer(player_index, self.current_service_id, self.correct_index,
+                                 selected_index, response, self.game_state, result)
+        
+        if result.correct:
+            message = f"Correct! That's {self.current_service['name']}."
         else:
-            # Incorrect answer
-            current_player["lives"] -= 1
-            messagebox.showinfo("Incorrect", f"Sorry, that was {self.current_service['name']}.")
+            message = f"Sorry, that was {self.current_service['name']}."
         
         # Check if current player is out
-        if current_player["lives"] <= 0:
+        if result.player_out:
             # Add to high scores if single player
             if self.game_mode == 'single':
-                self.high_scores.append({
-                    "name": current_player["name"],
-                    "score": current_player["score"],
-                    "date": datetime.now().strftime("%Y-%m-%d")
-                })
-                self.save_high_scores()
+                self.save_high_scores(current_player)
             
             if self.game_mode == 'multi':
-                messagebox.showinfo("Player Out", f"{current_player['name']} is out of the game!")
-                
-                # Check if only one player remains
-                active_players = [p for p in self.players if p["lives"] > 0]
-                if len(active_players) == 1:
-                    winner = active_players[0]
-                    self.show_game_over(winner)
-                    return
-                elif len(active_players) == 0:
-                    # All players lost at the same time (unlikely but possible)
-                    self.show_game_over(None)
-                    return
-            else:
-                # Single player game over
-                self.show_game_over(current_player)
-                return
+                message += f" {current_player['name']} is out of the game!"
         
-        # Move to next player in multiplayer mode
-        if self.game_mode == 'multi':
-            self.advance_to_next_player()
+        color = CORRECT_COLOR if result.correct else INCORRECT_COLOR
+        if result.game_over:
+            self.scheduler.save()
+            # winner is None if all players went out at once
+            self.feedback_banner.show(message, color, on_done=lambda: self.show_game_over(result.winner))
+            return
         
-        # Update display and show next question
+        self.feedback_banner.show(message, color, on_done=lambda: self.set_options_state(tk.NORMAL))
+        
+        if result.player_out:
+            # The queued questions were drawn for players in the old turn order
+            self.reset_pipeline()
+        
+        # Update display and draw the next question behind the banner
         self.update_player_info()
         self.next_question()
-    
-    def advance_to_next_player(self):
-        """Advance to the next player who still has lives"""
-        original_index = self.current_player_index
-        
-        while True:
-            self.current_player_index = (self.current_player_index + 1) % len(self.players)
-            
-            # If we've checked all players and come back to the original, break
-            if self.current_player_index == original_index:
-                break
-            
-            # If this player has lives, break
-            if self.players[self.current_player_index]["lives"] > 0:
-                break
+        self.root.after_idle(self.answer_latency.finish, started)
     
     def show_game_over(self, winner=None):
         """Show game over screen"""
@@ -738,18 +890,15 @@ class AWSIconGameMultiplayer:
             )
             rankings_label.pack(pady=10)
             
-            # Sort players by score
-            sorted_players = sorted(self.players, key=lambda p: p["score"], reverse=True)
-            
-            for i, player in enumerate(sorted_players):
-                rank_label = tk.Label(
-                    rankings_frame,
-                    text=f"{i+1}. {player['name']}: {player['score']} points",
-                    font=("Arial", 14),
-                    fg="white",
-                    bg="#232F3E"
-                )
-                rank_label.pack(pady=2)
+            # Sorted by score; scrollable when there are more players than fit
+            rankings = VirtualScoreboard(
+                rankings_frame,
+                ScoreboardModel(self.game_state.players),
+                visible_rows=10,
+                font=("Arial", 14),
+                show_lives=False
+            )
+            rankings.pack()
         
         # Buttons frame
         buttons_frame = tk.Frame(game_over_frame, bg="#232F3E")
@@ -778,9 +927,38 @@ class AWSIconGameMultiplayer:
         quit_button.pack(side=tk.LEFT, padx=10)
 
 def main():
+    parser = argparse.ArgumentParser(description="AWS Service Icon Game (multiplayer)")
+    add_recording_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    profiler = Profiler.from_args(args, AWSIconGameMultiplayer)  # None unless --profile was given
+    recorder = SessionRecorder.from_args(args, load_catalog().question_pool())
     root = tk.Tk()
-    game = AWSIconGameMultiplayer(root)
+    game = AWSIconGameMultiplayer(root, seed=args.seed, recorder=recorder)
     root.mainloop()
+    
+    if game.question_pipeline is not None:
+        game.question_pipeline.shutdown()
+    if game.high_scores is not None:
+        game.high_scores.close()
+    game.scheduler.save()  # Keep what was learned in an unfinished game
+    if game.network_game is not None:
+        game.network_game.connection.close()
+    stats = game.answer_latency.summary()
+    print(f"Answer to next question: {stats['count']} answers, "
+          f"mean {stats['mean_ms']:.1f} ms, max {stats['max_ms']:.1f} ms")
+    if game.question_pipeline is not None:
+        stats = game.question_pipeline.stats()
+        print(f"Icon prefetch: {stats['hits']} hits, {stats['misses']} misses")
+        stats = game.icon_cache.stats()
+        print(f"Icon cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['evictions']} evictions, {stats['bytes']} bytes")
+    if recorder is not None:
+        recorder.close()
+    if profiler is not None:
+        profiler.stop()
 
 if __name__ == "__main__":
     main()
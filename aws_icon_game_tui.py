@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Terminal version of the AWS Icon Game
+
+Plays the single player game in a terminal, e.g. over SSH on a machine
+without a display. Questions, scoring and the adaptive question order are
+the same as in aws_icon_game.py, and the answer stats are shared with it.
+
+Icons are drawn as block art: each character cell shows two pixels with
+the upper half block and its foreground and background colours. The art
+is rendered from images/ once per icon and colour mode and kept under
+cache/block_art, keyed by the source file's mtime and size, so a changed
+icon is rendered again. All art is loaded when the game starts, and only
+art that is not cached yet is rendered then, which is the only time Pillow
+is imported; questions are drawn without tkinter or Pillow. --build-art
+renders every icon ahead of time.
+
+    python aws_icon_game_tui.py [--color truecolor|256|none] [--build-art]
+                                [--seed N] [--record [PATH]]
+
+Answer with 1-3, quit with q.
+"""
+import argparse
+import os
+import sys
+import time
+from catalog import load_catalog
+from game_state import GameState
+from question_engine import QuestionEngine
+from adaptive_scheduler import AdaptiveScheduler, PlayerStatsStore
+from session_recorder import SessionRecorder, add_recording_arguments
+
+# Same cache directory as icon_atlas.CACHE_DIR, which is not imported because it loads Pillow
+BLOCK_ART_DIR = os.path.join("cache", "block_art")
+ART_COLUMNS = 32  # Icons are drawn 32 pixels wide and tall, in 16 rows of cells
+ART_VERSION = 2  # Bumped when rendering changes, so art cached by older versions is not reused
+COLOR_MODES = ("truecolor", "256", "none")
+SHADES = " ░▒▓█"
+CUBE_LEVELS = (0, 95, 135, 175, 215, 255)  # Channel values of the 256-colour palette's 6x6x6 cube
+
+RESET = "\x1b[0m"
+CLEAR = "\x1b[2J\x1b[H"
+ORANGE = "\x1b[1;38;5;208m"
+GREEN = "\x1b[1;32m"
+RED = "\x1b[1;31m"
+
+
+def default_color_mode():
+    """Pick the richest colour mode the terminal says it supports"""
+    if os.environ.get("NO_COLOR") or os.environ.get("TERM") == "dumb":
+        return "none"
+    if os.environ.get("COLORTERM") in ("truecolor", "24bit"):
+        return "truecolor"
+    return "256"
+
+
+def cube_level(value):
+    """Index of the xterm colour cube level nearest to a channel value"""
+    return min(range(len(CUBE_LEVELS)), key=lambda i: abs(CUBE_LEVELS[i] - value))
+
+
+def palette_index(rgb):
+    """Nearest entry of the 256-colour palette, from the colour cube or the gray ramp"""
+    r, g, b = rgb
+    levels = [cube_level(c) for c in rgb]
+    cube = tuple(CUBE_LEVELS[i] for i in levels)
+    # Gray ramp entries 232-255 run from 8 to 238 in steps of 10
+    step = min(23, max(0, round((sum(rgb) / 3 - 8) / 10)))
+    gray = 8 + 10 * step
+    cube_distance = sum((c - v) ** 2 for c, v in zip(cube, rgb))
+    gray_distance = (r - gray) ** 2 + (g - gray) ** 2 + (b - gray) ** 2
+    if gray_distance < cube_distance:
+        return 232 + step
+    return 16 + 36 * levels[0] + 6 * levels[1] + levels[2]
+
+
+def color_code(rgb, mode, background=False):
+    """ANSI escape selecting a foreground or background colour"""
+    r, g, b = rgb
+    if mode == "truecolor":
+        return f"\x1b[{48 if background else 38};2;{r};{g};{b}m"
+    return f"\x1b[{48 if background else 38};5;{palette_index(rgb)}m"
+
+
+def render_block_art(path, mode, columns=ART_COLUMNS):
+    """Render an icon file as lines of block characters (imports Pillow)"""
+    from PIL import Image
+    with Image.open(path) as img:
+        img = img.convert("RGBA").resize((columns, columns), Image.LANCZOS)
+    pixels = img.load()
+
+    lines = []
+    for y in range(0, columns, 2):
+        cells = []
+        current = None  # Escape codes in effect, so runs of one colour are written once
+        for x in range(columns):
+            top, bottom = pixels[x, y], pixels[x, y + 1]
+            top_visible, bottom_visible = top[3] >= 128, bottom[3] >= 128
+            if mode == "none":
+                visible = [p for p, v in ((top, top_visible), (bottom, bottom_visible)) if v]
+                if not visible:
+                    cells.append(" ")
+                    continue
+                luma = sum(0.299 * p[0] + 0.587 * p[1] + 0.114 * p[2] for p in visible) / len(visible)
+                cells.append(SHADES[min(len(SHADES) - 1, 1 + int(luma / 256 * (len(SHADES) - 1)))])
+                continue
+
+            if top_visible and bottom_visible:
+                codes, char = color_code(top[:3], mode) + color_code(bottom[:3], mode, True), "▀"
+            elif top_visible:
+                codes, char = RESET + color_code(top[:3], mode), "▀"
+            elif bottom_visible:
+                codes, char = RESET + color_code(bottom[:3], mode), "▄"
+            else:
+                codes, char = RESET, " "
+            if codes != current:
+                cells.append(codes)
+                current = codes
+            cells.append(char)
+        lines.append("".join(cells) + (RESET if mode != "none" else ""))
+    return lines
+
+
+class BlockArtCache:
+    """Block art of each icon, rendered once and kept on disk"""
+
+    def __init__(self, mode, images_dir="images", cache_dir=BLOCK_ART_DIR, columns=ART_COLUMNS):
+        self.mode = mode
+        self.images_dir = images_dir
+        self.columns = columns
+        self.cache_dir = os.path.join(cache_dir, f"{mode}-{columns}-v{ART_VERSION}")
+        self.loaded = {}  # icon_name -> lines, for this session
+        self.renders = 0
+
+    def art_path(self, icon_name, stat):
+        stem = os.path.splitext(icon_name)[0]
+        return os.path.join(self.cache_dir, f"{stem}-{stat.st_mtime_ns}-{stat.st_size}.txt")
+
+    def get(self, icon_name):
+        """Return an icon's art as loaded by prepare(), or None; never renders"""
+        return self.loaded.get(icon_name)
+
+    def prepare(self, icon_names):
+        """Load the art of the given icons, rendering what is not cached; returns how many are ready"""
+        return sum(1 for icon_name in dict.fromkeys(icon_names) if self.load(icon_name) is not None)
+
+    def load(self, icon_name):
+        """Return an icon's block art, or None if it has no image or cannot be rendered"""
+        lines = self.loaded.get(icon_name)
+        if lines is not None:
+            return lines
+        source_path = os.path.join(self.images_dir, icon_name)
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return None
+
+        path = self.art_path(icon_name, stat)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            lines = self.render(icon_name, source_path, path)
+        if lines is not None:
+            self.loaded[icon_name] = lines
+        return lines
+
+    def render(self, icon_name, source_path, path):
+        """Render an icon and store the art, replacing art of older versions"""
+        if not self.renders:
+            print("Rendering icon art for this terminal (once; see --build-art)...", file=sys.stderr)
+        try:
+            lines = render_block_art(source_path, self.mode, self.columns)
+        except ImportError:
+            return None  # Pillow is not installed, so only prebuilt art can be shown
+        except Exception as e:
+            print(f"Could not render {icon_name}: {e}", file=sys.stderr)
+            return None
+        self.renders += 1
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            stem = os.path.splitext(icon_name)[0]
+            for filename in os.listdir(self.cache_dir):
+                if filename.rsplit("-", 2)[0] == stem:
+                    os.remove(os.path.join(self.cache_dir, filename))
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not store block art for {icon_name}: {e}", file=sys.stderr)
+        return lines
+
+    def placeholder(self):
+        """Art shown for icons that are missing or cannot be rendered"""
+        rows = self.columns // 2
+        inner = "(no icon)".center(self.columns - 2)
+        blank = " " * (self.columns - 2)
+        body = [f"│{inner if row == rows // 2 - 1 else blank}│" for row in range(rows - 2)]
+        return ["┌" + "─" * (self.columns - 2) + "┐"] + body + ["└" + "─" * (self.columns - 2) + "┘"]
+
+
+class KeyReader:
+    """Reads single key presses, or whole lines when input is not a terminal"""
+
+    def __init__(self, stream=sys.stdin):
+        self.stream = stream
+        self.saved_mode = None
+        self.is_terminal = stream.isatty()
+
+    def __enter__(self):
+        if self.is_terminal and os.name != "nt":
+            import termios
+            import tty
+            fd = self.stream.fileno()
+            self.saved_mode = termios.tcgetattr(fd)
+            tty.setcbreak(fd)  # Keys arrive without Enter; Ctrl-C still interrupts
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.saved_mode is not None:
+            import termios
+            termios.tcsetattr(self.stream.fileno(), termios.TCSADRAIN, self.saved_mode)
+            self.saved_mode = None
+
+    def read_key(self):
+        """Return the next key as a lower-case string, or None at end of input"""
+        if self.is_terminal and os.name == "nt":
+            import msvcrt
+            return msvcrt.getwch().lower()
+        if self.is_terminal:
+            data = os.read(self.stream.fileno(), 1)
+            return data.decode("utf-8", "replace").lower() if data else None
+        line = self.stream.readline()
+        if not line:
+            return None
+        return line.strip()[:1].lower() or "\n"
+
+
+class TerminalGame:
+    """Single player game drawn with ANSI escapes in a terminal"""
+
+    def __init__(self, color_mode, categories=None, player_name="Player 1", store=None,
+                 out=sys.stdout, seed=None, recorder=None):
+        self.color_mode = color_mode
+        self.aws_services = load_catalog().question_pool(categories)
+        self.question_engine = QuestionEngine(self.aws_services)
+        # Questions are weighted towards the services this player gets wrong
+        self.scheduler = AdaptiveScheduler(self.question_engine, store, seed)
+        self.scheduler.recorder = recorder
+        self.recorder = recorder
+        self.player_name = player_name
+        self.art = BlockArtCache(color_mode)
+        # Before the first question, so Pillow is never loaded mid-game
+        self.art.prepare(service["icon"] for service in self.aws_services)
+        self.out = out
+        self.game_state = None
+
+    def paint(self, text):
+        self.out.write(text)
+        self.out.flush()
+
+    def style(self, code, text):
+        return text if self.color_mode == "none" else f"{code}{text}{RESET}"
+
+    def draw_question(self, question, feedback):
+        """Draw the whole screen for a question in one write"""
+        player = self.game_state.current_player
+        service = self.question_engine.service(question.service_id)
+        art = self.art.get(service["icon"]) or self.art.placeholder()
+        lines = [
+            self.style(ORANGE, "AWS Service Icon Game"),
+            f"Score: {player['score']}   Lives: {'♥ ' * player['lives']}",
+            feedback or "",
+            "",
+        ]
+        lines += ["  " + line for line in art]
+        lines.append("")
+        for i, option in enumerate(self.question_engine.option_names(question)):
+            lines.append(f"  {i + 1}) {option}")
+        lines.append("")
+        lines.append(f"Press 1-{self.question_engine.num_options} to answer, q to quit")
+        self.paint(CLEAR + "\n".join(lines) + "\n")
+
+    def wait_for(self, keys, allowed):
+        """Return the first allowed key pressed, or None if the player quits"""
+        while True:
+            key = keys.read_key()
+            if key is None or key == "q":
+                return None
+            if key in allowed:
+                return key
+
+    def play_game(self, keys):
+        """Play one game; return False if the player quit"""
+        self.game_state = GameState([self.player_name])
+        self.scheduler.start_game([self.player_name])
+        answers = [str(i + 1) for i in range(self.question_engine.num_options)]
+        feedback = None
+        while True:
+            question = self.scheduler.next_question()
+            service = self.question_engine.service(question.service_id)
+            self.draw_question(question, feedback)
+            shown_at = time.perf_counter()
+
+            key = self.wait_for(keys, answers)
+            if key is None:
+                return False
+            response = time.perf_counter() - shown_at
+            selected = answers.index(key)
+            result = self.game_state.answer(selected == question.correct_index)
+            self.scheduler.record(0, question.service_id, result.correct, response)
+            if self.recorder is not None:
+                self.recorder.answer(0, question.service_id, question.correct_index, selected,
+                                     response, self.game_state, result)
+
+            if result.correct:
+                feedback = self.style(GREEN, f"Correct! That's {service['name']}.")
+            else:
+                feedback = self.style(RED, f"Sorry, that was {service['name']}.")
+            if result.game_over:
+                self.scheduler.save()
+                score = result.player["score"]
+                self.paint(CLEAR + "\n".join([
+                    self.style(ORANGE, "Game Over!"),
+                    feedback,
+                    "",
+                    f"Your final score: {score}",
+                    "",
+                    "Press r to play again, q to quit",
+                ]) + "\n")
+                return self.wait_for(keys, ("r", "\n")) is not None
+
+    def run(self, keys):
+        """Play games until the player quits"""
+        while self.play_game(keys):
+            pass
+
+
+def build_art(color_mode, categories=None):
+    """Render the block art of every catalog icon ahead of time"""
+    art = BlockArtCache(color_mode)
+    ready = art.prepare(service["icon"] for service in load_catalog().question_pool(categories))
+    print(f"{ready} icons ready in {art.cache_dir} ({art.renders} rendered)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AWS Service Icon Game in the terminal")
+    parser.add_argument("--color", choices=COLOR_MODES, default=default_color_mode(),
+                        help="colour mode for the icon art (default: detected from the terminal)")
+    parser.add_argument("--category", action="append", dest="categories",
+                        help="only ask about services in this category (can be repeated)")
+    parser.add_argument("--name", default="Player 1", help="player name for the answer stats")
+    parser.add_argument("--build-art", action="store_true",
+                        help="render the art for every icon, then exit")
+    add_recording_arguments(parser)
+    args = parser.parse_args()
+
+    if args.build_art:
+        build_art(args.color, args.categories)
+        return
+
+    import sqlite3
+    try:
+        store = PlayerStatsStore()
+    except sqlite3.Error as e:
+        print(f"Could not open player stats database: {e}", file=sys.stderr)
+        store = None
+
+    recorder = SessionRecorder.from_args(args, load_catalog().question_pool(args.categories),
+                                         args.categories, front_end="tui")
+    game = TerminalGame(args.color, args.categories, args.name, store,
+                        seed=args.seed, recorder=recorder)
+    terminal = sys.stdout.isatty()
+    if terminal:
+        game.paint("\x1b[?1049h\x1b[?25l")  # Alternate screen, hidden cursor
+    try:
+        with KeyReader() as keys:
+            game.run(keys)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if terminal:
+            game.paint(RESET + "\x1b[?25h\x1b[?1049l")
+        game.scheduler.save()  # Keep what was learned in an unfinished game
+        if store is not None:
+            store.close()
+        if recorder is not None:
+            recorder.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Headless benchmarks for the AWS Icon Game
+
+Run them as modules from the repository root, e.g.:
+    python -m benchmarks.engine
+"""
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the game rules and question sampling
+
+Plays rounds headless through QuestionEngine and GameState, one at a time
+and as numpy batches, without Tk or Pillow, so it also runs in CI without
+an X server:
+    python -m benchmarks.engine --rounds 1000000
+"""
+import argparse
+import random
+import time
+from game_state import GameState, STARTING_LIVES
+from question_engine import QuestionEngine, load_numpy
+from adaptive_scheduler import AdaptiveScheduler
+
+
+def make_services(count):
+    """Build a synthetic catalog of the given size"""
+    return [{"name": f"Service {i}", "icon": f"service{i}.png"} for i in range(count)]
+
+
+def pick_answer(question, rng, accuracy, num_options):
+    """Simulate a player who answers correctly with the given probability"""
+    if rng.random() < accuracy:
+        return question.correct_index
+    return (question.correct_index + 1) % num_options
+
+
+def play_rounds(engine, rounds, players, accuracy, seed=None):
+    """Play rounds one at a time through GameState; return the number of games"""
+    rng = random.Random(seed)
+    names = [f"Player {i + 1}" for i in range(players)]
+    state = GameState(names)
+    games = 1
+    for _ in range(rounds):
+        question = engine.next_question()
+        selected = pick_answer(question, rng, accuracy, engine.num_options)
+        if state.answer(selected == question.correct_index).game_over:
+            state = GameState(names)
+            games += 1
+    return games
+
+
+def play_adaptive(scheduler, rounds, accuracy, seed=None):
+    """Draw weighted questions and record an answer to each, as the games do"""
+    rng = random.Random(seed)
+    for _ in range(rounds):
+        question = scheduler.next_question()
+        scheduler.record(0, question.service_id, rng.random() < accuracy, rng.uniform(1.0, 5.0))
+
+
+def play_batch(engine, rounds, accuracy, lives=STARTING_LIVES, seed=None):
+    """Draw a batch of questions and score single-player games on it with numpy
+
+    Returns the per-game scores and whether each answer was correct.
+    """
+    np = load_numpy()
+    batch = engine.generate_batch(rounds)
+    correct_indices = np.asarray(batch.correct_indices)
+    # Vectorized pick_answer: the right option with the given probability, else the next one
+    knows = np.random.default_rng(seed).random(rounds) < accuracy
+    selected = np.where(knows, correct_indices, (correct_indices + 1) % engine.num_options)
+    correct = selected == correct_indices
+    wrong = ~correct
+
+    # A round belongs to the game numbered by how many lives were lost before it
+    lost_before = np.cumsum(wrong) - wrong
+    game_ids = lost_before // lives
+    return np.bincount(game_ids, weights=correct).astype(int), correct
+
+
+def verify_batch(correct, scores, lives=STARTING_LIVES):
+    """Check the vectorized scores against GameState played on the same answers"""
+    expected = []
+    state = GameState(["Player 1"], lives)
+    for is_correct in correct.tolist():
+        if state.answer(is_correct).game_over:
+            expected.append(state.current_player["score"])
+            state = GameState(["Player 1"], lives)
+    if state.turns:
+        expected.append(state.current_player["score"])  # Unfinished last game
+    return expected == scores.tolist()
+
+
+def timed(func, *args, **kwargs):
+    """Run func and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    """Run the engine benchmark and print rounds per second"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=1000000, help="rounds per measurement")
+    parser.add_argument("--catalog-size", type=int, default=57, help="number of services")
+    parser.add_argument("--players", type=int, default=4, help="players for the turn-based run")
+    parser.add_argument("--accuracy", type=float, default=0.8, help="chance of a correct answer")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = QuestionEngine(make_services(args.catalog_size), seed=args.seed)
+    print(f"{args.rounds:,} rounds, {args.catalog_size} services, accuracy {args.accuracy}")
+
+    _, elapsed = timed(lambda: [engine.next_question() for _ in range(args.rounds)])
+    print(f"  question sampling:       {args.rounds / elapsed:>14,.0f} questions/s")
+
+    scheduler = AdaptiveScheduler(engine, seed=args.seed)
+    scheduler.start_game(["Player 1"])
+    _, elapsed = timed(play_adaptive, scheduler, args.rounds, args.accuracy, args.seed)
+    print(f"  adaptive draw + update:  {args.rounds / elapsed:>14,.0f} questions/s")
+
+    for players in sorted({1, args.players}):
+        games, elapsed = timed(play_rounds, engine, args.rounds, players, args.accuracy, args.seed)
+        print(f"  rules, {players} player(s):     {args.rounds / elapsed:>14,.0f} rounds/s ({games:,} games)")
+
+    if load_numpy() is None:
+        print("  batched: skipped (numpy is not installed)")
+        return
+
+    (scores, correct), elapsed = timed(play_batch, engine, args.rounds, args.accuracy, seed=args.seed)
+    print(f"  batched draw + rules:    {args.rounds / elapsed:>14,.0f} rounds/s ({len(scores):,} games)")
+
+    sample = min(args.rounds, 100000)
+    sample_scores, sample_correct = play_batch(engine, sample, args.accuracy, seed=args.seed)
+    if not verify_batch(sample_correct, sample_scores):
+        raise SystemExit("Batched results do not match GameState")
+    print(f"  batched scoring matches GameState on {sample:,} rounds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Load test for the room server with simulated players
+
+Starts room_server.py in a child process (or targets a running server with
+--server) and connects bot clients to it over TCP. Bots fill rooms of
+--room-size players; each bot waits a random think time after its
+question arrives, then answers correctly with probability --accuracy. Room
+hosts restart their game whenever it ends, until --duration has passed.
+
+Reports:
+  - throughput: answers processed per second across all rooms
+  - latency: p50/p99/max time from a bot sending its answer to the next
+    question (or game over) arriving
+  - memory per session: growth of the server's resident set size divided
+    by the number of connected bots (Linux only, local server only)
+
+    python -m benchmarks.load --bots 2000 --duration 30 --output load.json
+
+All bots share one event loop, so with very many bots and short think
+times the client side can become the bottleneck; the results record the
+configuration so runs can be compared like for like.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+
+CONNECT_CONCURRENCY = 100  # Connections opened at once while ramping up
+STARTUP_TIMEOUT = 10
+STOP_GRACE = 10  # Seconds after the deadline before stragglers are cancelled
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def read_rss(pid):
+    """Resident set size of a process in bytes, or None if it cannot be read"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def raise_file_limit(needed):
+    """Raise the open file limit towards what the bots and server need"""
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+    if soft != resource.RLIM_INFINITY and soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+
+class LoadStats:
+    """Counters and latency samples shared by every bot"""
+
+    def __init__(self):
+        self.answers = 0
+        self.games = 0
+        self.latencies = []
+        self.errors = 0
+        self.disconnects = 0
+
+
+class Bot:
+    """One simulated player connected to a room"""
+
+    def __init__(self, name, room, room_size, accuracy, think_ms, stats, rng):
+        self.name = name
+        self.room = room
+        self.room_size = room_size
+        self.accuracy = accuracy
+        self.think_ms = think_ms
+        self.stats = stats
+        self.rng = rng
+        self.player_index = None
+        self.is_host = False
+        self.answered_at = None
+        self.writer = None
+
+    def send(self, message):
+        self.writer.write((json.dumps(message) + "\n").encode("utf-8"))
+
+    async def connect(self, host, port):
+        reader, self.writer = await asyncio.open_connection(host, port)
+        self.send({"type": "join", "room": self.room, "name": self.name})
+        return reader
+
+    async def play(self, reader, deadline):
+        """Play games until the deadline, then disconnect"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    self.stats.disconnects += 1
+                    return
+                message = json.loads(line)
+                kind = message["type"]
+                if kind in ("question", "game_over") and self.answered_at is not None:
+                    self.stats.latencies.append(time.perf_counter() - self.answered_at)
+                    self.answered_at = None
+
+                if kind == "welcome":
+                    self.player_index = message["player"]
+                    self.is_host = message["host"]
+                elif kind == "lobby":
+                    # Between games everyone leaves once time is up
+                    if time.perf_counter() >= deadline:
+                        return
+                    # Hosts start once the room is full, and again after each game
+                    if self.is_host and len(message["players"]) >= self.room_size:
+                        self.send({"type": "start"})
+                elif kind == "question" and message["player"] == self.player_index:
+                    if time.perf_counter() >= deadline:
+                        return
+                    asyncio.ensure_future(self.answer(message))
+                elif kind == "result":
+                    self.stats.answers += 1 if message["player"] == self.player_index else 0
+                elif kind == "game_over":
+                    self.stats.games += 1 if self.is_host else 0
+                elif kind == "error":
+                    self.stats.errors += 1
+        except (ConnectionError, ValueError):
+            self.stats.disconnects += 1
+        finally:
+            self.writer.close()
+
+    async def answer(self, question):
+        """Think for a while, then answer the question"""
+        if self.think_ms > 0:
+            await asyncio.sleep(self.rng.expovariate(1000.0 / self.think_ms))
+        correct = question["option_ids"].index(question["service_id"])
+        if self.rng.random() < self.accuracy:
+            option = correct
+        else:
+            option = (correct + 1) % len(question["option_ids"])
+        self.answered_at = time.perf_counter()
+        try:
+            self.send({"type": "answer", "seq": question["seq"], "option": option})
+        except ConnectionError:
+            pass
+
+
+async def start_local_server():
+    """Start room_server.py on a free port; return (process, host, port)"""
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "room_server.py", "--port", "0", "--stats-db", ":memory:", cwd=repo_root,
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+    )
+    line = await asyncio.wait_for(process.stderr.readline(), STARTUP_TIMEOUT)
+    match = re.search(rb"listening on (\S+):(\d+)", line)
+    if not match:
+        process.kill()
+        raise SystemExit(f"Room server did not start: {line.decode(errors='replace').strip()}")
+    return process, match.group(1).decode(), int(match.group(2))
+
+
+async def drain_log(process, counts):
+    """Keep reading the server log so its pipe never fills; count dropped clients"""
+    async for line in process.stderr:
+        if b"Dropping slow client" in line:
+            counts["slow_clients_dropped"] += 1
+
+
+async def run(args):
+    """Connect the bots, play for the configured duration and return the results"""
+    process = None
+    server_log = {"slow_clients_dropped": 0}
+    if args.server:
+        host, _, port = args.server.rpartition(":")
+        host, port = host or "127.0.0.1", int(port)
+    else:
+        process, host, port = await start_local_server()
+        log_task = asyncio.ensure_future(drain_log(process, server_log))
+    rss_before = read_rss(process.pid) if process else None
+
+    stats = LoadStats()
+    rng = random.Random(args.seed)
+    bots = [
+        Bot(f"bot{i}", f"room{i // args.room_size}", args.room_size,
+            args.accuracy, args.think_ms, stats, random.Random(rng.random()))
+        for i in range(args.bots)
+    ]
+
+    # Ramp up: open connections a batch at a time so the listen backlog is not overrun
+    ramp_started = time.perf_counter()
+    semaphore = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+    async def connect(bot):
+        async with semaphore:
+            return await bot.connect(host, port)
+
+    readers = await asyncio.gather(*(connect(bot) for bot in bots))
+    ramp_time = time.perf_counter() - ramp_started
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    rss_peak = rss_before
+    players = asyncio.gather(*(bot.play(reader, deadline) for bot, reader in zip(bots, readers)))
+    while not players.done():
+        await asyncio.wait([players], timeout=0.5)
+        if time.perf_counter() > deadline + STOP_GRACE:
+            players.cancel()  # Bots stuck waiting on a server that stopped responding
+            break
+        if process:
+            rss = read_rss(process.pid)
+            if rss is not None and rss_peak is not None:
+                rss_peak = max(rss_peak, rss)
+    elapsed = time.perf_counter() - started
+
+    if process:
+        process.terminate()
+        await process.wait()
+        log_task.cancel()
+
+    latencies = sorted(stats.latencies)
+    per_session = None
+    if rss_before is not None and rss_peak is not None:
+        per_session = (rss_peak - rss_before) / args.bots
+    return {
+        "config": vars(args),
+        "python": sys.version,
+        "ramp_seconds": ramp_time,
+        "elapsed_seconds": elapsed,
+        "sessions": args.bots,
+        "rooms": -(-args.bots // args.room_size),
+        "games": stats.games,
+        "answers": stats.answers,
+        "answers_per_second": stats.answers / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "samples": len(latencies),
+            "p50": None if not latencies else percentile(latencies, 0.50) * 1000,
+            "p99": None if not latencies else percentile(latencies, 0.99) * 1000,
+            "max": None if not latencies else latencies[-1] * 1000,
+        },
+        "server_rss_bytes": {"before": rss_before, "peak": rss_peak},
+        "memory_per_session_bytes": per_session,
+        "errors": stats.errors,
+        "disconnects": stats.disconnects,
+        "slow_clients_dropped": server_log["slow_clients_dropped"],
+    }
+
+
+def print_results(results):
+    latency = results["latency_ms"]
+    print(f"{results['sessions']:,} sessions in {results['rooms']:,} rooms, "
+          f"ramp-up {results['ramp_seconds']:.1f} s, ran {results['elapsed_seconds']:.1f} s")
+    print(f"  throughput: {results['answers_per_second']:,.0f} answers/s "
+          f"({results['answers']:,} answers, {results['games']:,} games)")
+    if latency["samples"]:
+        print(f"  answer to next question: p50 {latency['p50']:.2f} ms, "
+              f"p99 {latency['p99']:.2f} ms, max {latency['max']:.2f} ms")
+    if results["memory_per_session_bytes"] is not None:
+        print(f"  server memory per session: {results['memory_per_session_bytes'] / 1024:.1f} KiB")
+    if results["errors"] or results["disconnects"] or results["slow_clients_dropped"]:
+        print(f"  errors {results['errors']}, disconnects {results['disconnects']}, "
+              f"slow clients dropped {results['slow_clients_dropped']}")
+
+
+def main():
+    """Run the load test and write its results file"""
+    parser = argparse.ArgumentParser(description="Load test the AWS Icon Game room server")
+    parser.add_argument("--bots", type=int, default=1000, help="simulated players")
+    parser.add_argument("--room-size", type=int, default=4, help="players per room")
+    parser.add_argument("--accuracy", type=float, default=0.8, help="chance of a correct answer")
+    parser.add_argument("--think-ms", type=float, default=500.0,
+                        help="mean think time before answering (exponentially distributed)")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to play")
+    parser.add_argument("--server", help="host:port of a running server (default: start one)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load_results.json", help="results file")
+    args = parser.parse_args()
+
+    raise_file_limit(2 * args.bots + 256)
+    results = asyncio.run(run(args))
+    print_results(results)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the AWS Icon Game
+
+Launches a game in a fresh interpreter several times and reports, from
+the start of the game's own code:
+  - import: time to import the game module
+  - first_paint: time until the first screen has been drawn
+  - first_question (single player) / icons_ready (multiplayer): time until
+    the first icon is on screen, or the icon cache is set up
+  - process_total: wall time of the whole launch, interpreter start included
+
+    python -m benchmarks.startup --runs 10 --json startup.json
+
+Without a display only the import time can be measured.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+GAMES = {
+    "aws_icon_game": "AWSIconGame",
+    "aws_icon_game_multiplayer": "AWSIconGameMultiplayer",
+}
+
+# Runs in the child interpreter; prints one JSON object of marks in seconds
+CHILD_SCRIPT = r"""
+import importlib, json, sys, time
+start = time.perf_counter()
+module_name, class_name, timeout = sys.argv[1], sys.argv[2], float(sys.argv[3])
+module = importlib.import_module(module_name)
+marks = {"import": time.perf_counter() - start}
+
+import tkinter as tk
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print(json.dumps(marks))
+    sys.exit(0)
+
+def mark(name):
+    marks.setdefault(name, time.perf_counter() - start)
+
+def on_expose(event):
+    root.after_idle(mark, "first_paint")
+root.bind("<Expose>", on_expose, add="+")
+
+game = getattr(module, class_name)(root)
+
+def poll():
+    if getattr(game, "current_service", None) is not None:
+        mark("first_question")
+    elif class_name != "AWSIconGame" and game.icon_cache is not None:
+        mark("icons_ready")
+    if len(marks) >= 3 or time.perf_counter() - start > timeout:
+        root.destroy()
+    else:
+        root.after(1, poll)
+root.after(1, poll)
+root.mainloop()
+print(json.dumps(marks))
+"""
+
+
+def run_once(module_name, timeout):
+    """Start one game process and return its marks plus the whole process wall time"""
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    launched = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, module_name, GAMES[module_name], str(timeout)],
+        cwd=repo_root, capture_output=True, text=True, check=True
+    ).stdout
+    total = time.perf_counter() - launched
+    marks = json.loads(output.strip().splitlines()[-1])
+    marks["process_total"] = total
+    return marks
+
+
+def summarize(runs):
+    """Return min/median/max milliseconds for every mark seen in the runs"""
+    names = sorted({name for run in runs for name in run})
+    summary = {}
+    for name in names:
+        values = [run[name] * 1000 for run in runs if name in run]
+        summary[name] = {
+            "runs": len(values),
+            "min_ms": min(values),
+            "median_ms": statistics.median(values),
+            "max_ms": max(values),
+        }
+    return summary
+
+
+def main():
+    """Run the startup benchmark for one or both games"""
+    parser = argparse.ArgumentParser(description="Measure AWS Icon Game startup time")
+    parser.add_argument("--game", choices=sorted(GAMES), action="append",
+                        help="game module to launch (default: both)")
+    parser.add_argument("--runs", type=int, default=5, help="launches per game")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="seconds to wait for the first question in each launch")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for module_name in args.game or sorted(GAMES):
+        runs = [run_once(module_name, args.timeout) for _ in range(args.runs)]
+        results[module_name] = summarize(runs)
+
+        print(f"{module_name} ({args.runs} runs):")
+        for name, stats in results[module_name].items():
+            print(f"  {name:15} median {stats['median_ms']:8.1f} ms  "
+                  f"(min {stats['min_ms']:.1f}, max {stats['max_ms']:.1f})")
+        if "first_paint" not in results[module_name]:
+            print("  (no display available: only import time was measured)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the AWS Icon Game's core operations
+
+One command times the operations a kiosk session spends its time in:
+  - icons: cold and warm icon loads from each source (PNG, on-disk
+    derivatives, atlas, memory-mapped bundle), and the game's load_image
+  - questions: drawing the next question at catalog sizes from 57 to 5,000,
+    through the engine, the adaptive scheduler, the prefetch pipeline and
+    the game's next_question
+  - players: the game's update_player_info with 2 to 500 players
+  - high_scores: saving a score and reading the leaderboard with 10 to
+    1,000,000 stored scores
+  - screens: show_welcome_screen, setup_game_ui, show_high_scores and
+    show_game_over
+
+    python -m benchmarks.suite --output bench_results.json
+    python -m benchmarks.suite --compare bench_results.json
+
+Everything runs in a scratch directory with a copy of images/, so no cache,
+stats or high score file of the real game is touched. The icon, question
+and high score benchmarks run headless; the ones that drive the Tk game
+need a display and are recorded as skipped without one (on a server, run
+the suite under xvfb-run). Times include Tk's idle-time layout, as the
+player would see it.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from catalog import load_catalog
+from game_state import GameState
+from question_engine import QuestionEngine
+from adaptive_scheduler import AdaptiveScheduler
+from high_score_store import HighScoreStore
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GROUPS = ("icons", "questions", "players", "high_scores", "screens")
+DEFAULT_CATALOG_SIZES = "57,500,1000,5000"
+DEFAULT_PLAYER_COUNTS = "2,10,100,500"
+DEFAULT_SCORE_COUNTS = "10,1000,100000,1000000"
+POPULATE_BATCH = 100000  # Rows per transaction when filling the high score table
+
+
+def parse_sizes(text):
+    return [int(size) for size in text.split(",") if size.strip()]
+
+
+def summarize(samples):
+    """Latency statistics in milliseconds for a list of durations in seconds"""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def measure(func, repeat, after=None):
+    """Call func repeat times and summarize the durations
+
+    after runs outside the timed region following each call, e.g. to wait
+    for background work that a real player's think time would cover.
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+        if after is not None:
+            after()
+    return summarize(samples)
+
+
+def make_services(count, icon_names):
+    """Synthetic catalog of the given size, reusing the real icons in turn"""
+    return [{"name": f"Service {i}", "icon": icon_names[i % len(icon_names)], "category": "Benchmark"}
+            for i in range(count)]
+
+
+def wait_for_prefetch(pipeline):
+    """Block until the pipeline's queued icon decodes have finished"""
+    for _, future in list(pipeline.pending):
+        if future is not None:
+            future.result()
+
+
+class Suite:
+    """Runs the benchmark groups in a scratch directory and collects results"""
+
+    def __init__(self, args, workdir):
+        self.args = args
+        self.workdir = workdir
+        self.images_dir = os.path.join(workdir, "images")
+        self.icon_names = [name for name in dict.fromkeys(load_catalog().icon_names())
+                           if os.path.exists(os.path.join(self.images_dir, name))]
+        self.results = {}
+        self.skipped = {}
+        self.tk = None  # tkinter, once a display has been found
+        self.has_display = None
+
+    def record(self, group, case, stats):
+        self.results.setdefault(group, {})[case] = stats
+        print(f"  {case:42} mean {stats['mean_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  "
+              f"max {stats['max_ms']:9.3f} ms  (n={stats['count']})")
+
+    def skip(self, group, reason):
+        self.skipped[group] = reason
+        print(f"  skipped: {reason}")
+
+    def open_display(self):
+        """Return True if Tk can open a window, remembering tkinter for later"""
+        if self.has_display is None:
+            import tkinter
+            try:
+                tkinter.Tk().destroy()
+                self.tk = tkinter
+                self.has_display = True
+            except tkinter.TclError:
+                self.has_display = False
+        return self.has_display
+
+    def make_game(self, services=None):
+        """Create a multiplayer game window, optionally over a synthetic catalog"""
+        from aws_icon_game_multiplayer import AWSIconGameMultiplayer
+        root = self.tk.Tk()
+        game = AWSIconGameMultiplayer(root)
+        if services is not None:
+            # Swapped in before the icons are loaded, so the pipeline is built over them
+            game.aws_services = services
+            game.question_engine = QuestionEngine(services, seed=self.args.seed)
+            game.scheduler = AdaptiveScheduler(game.question_engine, seed=self.args.seed)
+            game.scheduler.next_player = game.upcoming_player
+        root.update()
+        return game
+
+    @staticmethod
+    def close_game(game):
+        if game.question_pipeline is not None:
+            game.question_pipeline.shutdown()
+        game.root.destroy()
+
+    # Groups
+
+    def bench_icons(self):
+        """Cold and warm icon loads from every source the icon cache can use"""
+        from icon_atlas import IconAtlas, build_atlas
+        from icon_bundle import IconBundle, build_bundle
+        from icon_cache import IconCache
+        from icon_derivatives import DerivativeCache
+
+        cache_dir = os.path.join(self.workdir, "cache")
+        atlas_image = os.path.join(cache_dir, "icon_atlas.png")
+        atlas_index = os.path.join(cache_dir, "icon_atlas.json")
+        bundle_path = os.path.join(cache_dir, "icons.bundle")
+        build_atlas(self.icon_names, self.images_dir, atlas_image, atlas_index)
+        build_bundle(self.icon_names, self.images_dir, bundle_path)
+        derivative_dir = os.path.join(cache_dir, "derivatives")
+
+        def png():
+            return IconCache(images_dir=self.images_dir)
+
+        def derivatives():
+            return IconCache(derivatives=DerivativeCache(self.images_dir, derivative_dir),
+                             images_dir=self.images_dir)
+
+        def atlas():
+            return IconCache(IconAtlas.load(atlas_image, atlas_index), images_dir=self.images_dir)
+
+        def bundle():
+            return IconCache(bundle=IconBundle.load(bundle_path), images_dir=self.images_dir)
+
+        sources = [("png", png), ("derivatives", derivatives), ("atlas", atlas), ("bundle", bundle)]
+        for label, make_cache in sources:
+            # Opening the source is part of a cold start, e.g. decoding the atlas
+            self.record("icons", f"open {label}", measure(make_cache, 1))
+            cache = make_cache()
+            names = iter(self.icon_names)
+            # Derivatives are built on this first pass and read back from disk afterwards
+            self.record("icons", f"load_pixels {label}",
+                        measure(lambda: cache.load_pixels(next(names)), len(self.icon_names)))
+        cache = derivatives()
+        names = iter(self.icon_names)
+        self.record("icons", "load_pixels derivatives, from disk",
+                    measure(lambda: cache.load_pixels(next(names)), len(self.icon_names)))
+
+        if not self.open_display():
+            self.skip("icons.tk", "load_image needs a display (try xvfb-run)")
+            return
+        game = self.make_game()
+        game.load_icons()
+        for label, make_cache in sources:
+            game.icon_cache = make_cache()
+            names = iter(self.icon_names)
+            self.record("icons", f"load_image cold, {label}",
+                        measure(lambda: game.load_image(next(names)), len(self.icon_names)))
+            names = iter(self.icon_names * self.args.repeat)
+            self.record("icons", f"load_image warm, {label}",
+                        measure(lambda: game.load_image(next(names)), len(self.icon_names) * self.args.repeat))
+        self.close_game(game)
+
+    def bench_questions(self):
+        """Drawing the next question at several catalog sizes"""
+        from icon_cache import IconCache
+        from question_pipeline import QuestionPipeline
+
+        repeat = self.args.repeat * 100
+        for size in self.args.catalog_sizes:
+            services = make_services(size, self.icon_names)
+            engine = QuestionEngine(services, seed=self.args.seed)
+            self.record("questions", f"engine next_question, {size} services",
+                        measure(engine.next_question, repeat))
+
+            scheduler = AdaptiveScheduler(engine, seed=self.args.seed)
+            scheduler.start_game(["Player 1", "Player 2"])
+            self.record("questions", f"adaptive next_question, {size} services",
+                        measure(scheduler.next_question, repeat))
+
+            cache = IconCache(images_dir=self.images_dir)
+            pipeline = QuestionPipeline(scheduler, cache.load_pixels, is_cached=cache.__contains__)
+            wait_for_prefetch(pipeline)
+            self.record("questions", f"pipeline next_question, {size} services",
+                        measure(pipeline.next_question, self.args.repeat * 10,
+                                after=lambda: wait_for_prefetch(pipeline)))
+            pipeline.shutdown()
+
+        if not self.open_display():
+            self.skip("questions.tk", "the game's next_question needs a display (try xvfb-run)")
+            return
+        for size in self.args.catalog_sizes:
+            game = self.make_game(make_services(size, self.icon_names))
+            game.game_mode = 'multi'
+            game.start_game(["Player 1", "Player 2"])
+
+            def next_question():
+                game.next_question()
+                game.root.update_idletasks()
+            self.record("questions", f"game next_question, {size} services",
+                        measure(next_question, self.args.repeat * 10,
+                                after=lambda: wait_for_prefetch(game.question_pipeline)))
+            self.close_game(game)
+
+    def bench_players(self):
+        """Redrawing the player info after an answer, for growing player counts"""
+        if not self.open_display():
+            self.skip("players", "update_player_info needs a display (try xvfb-run)")
+            return
+        rng = random.Random(self.args.seed)
+        for count in self.args.player_counts:
+            names = [f"Player {i + 1}" for i in range(count)]
+            game = self.make_game()
+            game.game_mode = 'multi'
+            game.start_game(names)
+
+            def answer():
+                # Advance the game outside the timed region, as check_answer would
+                if game.game_state.answer(rng.random() < 0.8).game_over:
+                    game.game_state = GameState(names)
+                    game.setup_game_ui()
+
+            def update_player_info():
+                game.update_player_info()
+                game.root.update_idletasks()
+            answer()
+            self.record("players", f"update_player_info, {count} players",
+                        measure(update_player_info, self.args.repeat * 10, after=answer))
+            self.close_game(game)
+
+    def bench_high_scores(self):
+        """Saving a score and reading the leaderboard as the table grows"""
+        rng = random.Random(self.args.seed)
+        for count in self.args.score_counts:
+            path = os.path.join(self.workdir, f"high_scores_{count}.db")
+            store = HighScoreStore(path, legacy_json_path=None)
+            started = time.perf_counter()
+            for start in range(0, count, POPULATE_BATCH):
+                store.add_many([(f"Player {rng.randrange(1000)}", rng.randrange(100),
+                                 f"2024-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}")
+                                for _ in range(min(POPULATE_BATCH, count - start))])
+            populated = time.perf_counter() - started
+            store.close()
+            print(f"  ({count:,} scores written in {populated:.2f} s)")
+
+            # Opening is what the game does before the first save or leaderboard
+            self.record("high_scores", f"open, {count} scores",
+                        measure(lambda: HighScoreStore(path, legacy_json_path=None).close(), self.args.repeat))
+            store = HighScoreStore(path, legacy_json_path=None)
+            self.record("high_scores", f"add, {count} scores",
+                        measure(lambda: store.add("Benchmark", rng.randrange(100)), self.args.repeat * 10))
+            self.record("high_scores", f"top 10, {count} scores",
+                        measure(lambda: store.top(10), self.args.repeat * 10))
+            self.record("high_scores", f"top 10 for one player, {count} scores",
+                        measure(lambda: store.top(10, name="Player 7"), self.args.repeat * 10))
+            store.close()
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def bench_screens(self):
+        """Switching between the game's screens"""
+        if not self.open_display():
+            self.skip("screens", "screen transitions need a display (try xvfb-run)")
+            return
+        game = self.make_game()
+        game.load_icons()
+        game.load_high_scores().add_many([(f"Player {i}", i, "2024-01-01") for i in range(100)])
+        names = [f"Player {i + 1}" for i in range(4)]
+        game.game_mode = 'multi'
+        game.start_game(names)
+
+        def screen(show):
+            def run():
+                show()
+                game.root.update_idletasks()
+            return run
+        repeat = self.args.repeat * 5
+        self.record("screens", "show_welcome_screen", measure(screen(game.show_welcome_screen), repeat))
+        self.record("screens", "show_high_scores", measure(screen(game.show_high_scores), repeat))
+        self.record("screens", "setup_game_ui", measure(screen(game.setup_game_ui), repeat))
+        winner = game.game_state.players[0]
+        self.record("screens", "show_game_over", measure(screen(lambda: game.show_game_over(winner)), repeat))
+        self.close_game(game)
+
+    def run(self, groups):
+        for group in groups:
+            print(f"{group}:")
+            getattr(self, "bench_" + group)()
+
+
+def compare(results, baseline_path):
+    """Print how each case's mean changed against an earlier results file"""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)["results"]
+    print(f"Compared with {baseline_path}:")
+    for group, cases in results.items():
+        for case, stats in cases.items():
+            before = baseline.get(group, {}).get(case)
+            if before is None or not before["mean_ms"]:
+                continue
+            change = stats["mean_ms"] / before["mean_ms"] - 1
+            flag = "  <-- slower" if change > 0.1 else ""
+            print(f"  {group}/{case:42} {before['mean_ms']:9.3f} -> {stats['mean_ms']:9.3f} ms "
+                  f"({change:+.0%}){flag}")
+
+
+def main():
+    """Run the benchmark suite and write its results file"""
+    parser = argparse.ArgumentParser(description="Benchmark the AWS Icon Game's core operations")
+    parser.add_argument("--group", choices=GROUPS, action="append",
+                        help="benchmark group to run (default: all)")
+    parser.add_argument("--catalog-sizes", type=parse_sizes, default=parse_sizes(DEFAULT_CATALOG_SIZES))
+    parser.add_argument("--player-counts", type=parse_sizes, default=parse_sizes(DEFAULT_PLAYER_COUNTS))
+    parser.add_argument("--score-counts", type=parse_sizes, default=parse_sizes(DEFAULT_SCORE_COUNTS))
+    parser.add_argument("--repeat", type=int, default=20, help="scales how many times each case runs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_results.json", help="results file")
+    parser.add_argument("--compare", metavar="PATH", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="aws_icon_bench_")
+    shutil.copytree(os.path.join(REPO_ROOT, "images"), os.path.join(workdir, "images"))
+    output = os.path.abspath(args.output)
+    cwd = os.getcwd()
+    os.chdir(workdir)  # The game opens its caches and databases relative to here
+    try:
+        suite = Suite(args, workdir)
+        suite.run(args.group or GROUPS)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version,
+        "platform": platform.platform(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": suite.results,
+        "skipped": suite.skipped,
+    }
+    if args.compare:
+        compare(suite.results, args.compare)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
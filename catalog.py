@@ -0,0 +1,79 @@
+"""
+AWS service catalog for the AWS Icon Game
+
+Every service the game knows about lives in aws_services.json, grouped by
+category. load_catalog() parses that file once per process and builds
+lookups by name, icon file and category, so the games and the icon tools all
+share one structure instead of keeping their own copies of the list.
+"""
+import json
+import os
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "aws_services.json")
+
+_catalogs = {}  # path -> ServiceCatalog, so each file is parsed once
+
+
+class ServiceCatalog:
+    """Indexed, read-only list of AWS services"""
+
+    def __init__(self, categories):
+        self.services = []  # Service dicts: name, icon, category; list index is the service id
+        self.by_name = {}
+        self.by_icon = {}
+        self.by_category = {}  # category -> list of service ids
+        for category in categories:
+            ids = self.by_category.setdefault(category["name"], [])
+            for entry in category["services"]:
+                service_id = len(self.services)
+                service = {"name": entry["name"], "icon": entry["icon"], "category": category["name"]}
+                if service["name"] in self.by_name:
+                    raise ValueError(f"Duplicate service name in catalog: {service['name']}")
+                self.services.append(service)
+                self.by_name[service["name"]] = service_id
+                self.by_icon[service["icon"]] = service_id
+                ids.append(service_id)
+
+    @classmethod
+    def from_file(cls, path=CATALOG_PATH):
+        """Parse a catalog file"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f)["categories"])
+
+    def __len__(self):
+        return len(self.services)
+
+    def categories(self):
+        """Return the category names in catalog order"""
+        return list(self.by_category)
+
+    def icon_names(self):
+        """Return every icon filename in the catalog"""
+        return [service["icon"] for service in self.services]
+
+    def service_named(self, name):
+        """Return the service with the given display name, or None"""
+        service_id = self.by_name.get(name)
+        return None if service_id is None else self.services[service_id]
+
+    def service_for_icon(self, icon_name):
+        """Return the service that uses an icon file, or None"""
+        service_id = self.by_icon.get(icon_name)
+        return None if service_id is None else self.services[service_id]
+
+    def question_pool(self, categories=None):
+        """Return the services to ask about, optionally limited to some categories"""
+        if not categories:
+            return self.services
+        unknown = set(categories) - set(self.by_category)
+        if unknown:
+            raise ValueError(f"Unknown categories: {', '.join(sorted(unknown))}")
+        return [self.services[i] for category in categories for i in self.by_category[category]]
+
+
+def load_catalog(path=CATALOG_PATH):
+    """Return the catalog for a file, parsing it on first use only"""
+    catalog = _catalogs.get(path)
+    if catalog is None:
+        catalog = _catalogs[path] = ServiceCatalog.from_file(path)
+    return catalog
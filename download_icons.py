@@ -1,64 +1,283 @@
 #!/usr/bin/env python3
 """
 Script to download AWS service icons for the AWS Icon Game
+
+Icons are fetched concurrently through one pooled HTTP session, with a
+timeout on every request and exponential backoff between retries. Use
+--workers 1 to download one icon at a time, and --base-url to point the
+downloads at a local stand-in server when testing.
+
+A manifest next to the icons records each file's source URL, ETag,
+Last-Modified, content hash and saved size. Reruns send conditional requests
+and leave unchanged icons alone, so a refresh where nothing changed upstream
+costs a handful of 304 responses and no image processing.
 """
+import argparse
+import hashlib
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 import requests
-from io import BytesIO
+from requests.adapters import HTTPAdapter
 from PIL import Image
 
-def download_icon(url, filename, size=(100, 100)):
-    """Download an icon from a URL and save it to the images directory"""
+DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT = 10  # Seconds, per request
+DEFAULT_RETRIES = 3
+BACKOFF_BASE = 0.5  # Seconds before the first retry, doubled on each further one
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MANIFEST_NAME = "icon_manifest.json"
+CHUNK_SIZE = 65536
+
+# Dictionary of AWS service icons with their URLs
+ICONS = {
+    "ec2.png": "https://d1.awsstatic.com/icons/jp/console_ec2_icon.64795d08c5e23e92c12cc2c6f91a01aa1b2d60f8.png",
+    "s3.png": "https://d1.awsstatic.com/icons/jp/console_s3_icon.8373b9e7a80599afa7e0331eeb97d54f790c82ba.png",
+    "rds.png": "https://d1.awsstatic.com/icons/jp/console_rds_icon.a478de57ff85a66d93ef078999e8d5f5bdd5cfce.png",
+    "lambda.png": "https://d1.awsstatic.com/icons/jp/console_lambda_icon.dc7781a6b5f1f3cb267b0bac7c9208ce5bb8a2f6.png",
+    "dynamodb.png": "https://d1.awsstatic.com/icons/jp/console_dynamodb_icon.0c655f0f1f7541dc238d4bfe873f8e5a0d454d2a.png",
+    "cloudwatch.png": "https://d1.awsstatic.com/icons/jp/console_cloudwatch_icon.8c2a00a80275209372b0b5caf8c8a37d5c3e5a93.png",
+    "sns.png": "https://d1.awsstatic.com/icons/jp/console_sns_icon.c972fdc0103e27b6a2a20b732839b3a0b8d17e85.png",
+    "sqs.png": "https://d1.awsstatic.com/icons/jp/console_sqs_icon.d7ad274661bc6fd5b6ca0e6bf17da8a4f82b08b9.png",
+    "iam.png": "https://d1.awsstatic.com/icons/jp/console_iam_icon.3eeed669dca9f9e20597cc51d904ed13b5ad4afb.png",
+    "vpc.png": "https://d1.awsstatic.com/icons/jp/console_vpc_icon.d09340f3abe0c7f5d5a3ad664264cb834b11f9a8.png",
+    "ecs.png": "https://d1.awsstatic.com/icons/jp/compute/ecs_blue.8aaa3a8fa5f8250f5047d35df5ff6c9001c23ac0.png",
+    "eks.png": "https://d1.awsstatic.com/icons/jp/eks_blue.9d6b8d799a6c89a6664fdcb2a9c313c8a1d3e0f7.png",
+    "cloudformation.png": "https://d1.awsstatic.com/icons/jp/console_cloudformation_icon.8f058b213317e7099ff8a5cfa848cff0e8e9a2b3.png",
+    "apigateway.png": "https://d1.awsstatic.com/icons/jp/console_apigateway_icon.dc7f9b0b18ecf5aa96265a2e69183e7716e6be1e.png",
+    "stepfunctions.png": "https://d1.awsstatic.com/icons/jp/console_states_icon.3b7c036f544db8e28663de2e7d8a0a5e8d73c642.png"
+}
+
+
+def make_session(pool_size=DEFAULT_WORKERS):
+    """Create an HTTP session whose connection pool fits all workers"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def rebase_url(url, base_url):
+    """Point a URL at another scheme and host, keeping its path"""
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    return base_url.rstrip("/") + path
+
+
+def load_manifest(path):
+    """Load the download manifest, or an empty one"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(path, manifest):
+    """Write the download manifest atomically"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def conditional_headers(entry):
+    """Request headers that let the server answer 304 for an unchanged icon"""
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def fetch(session, url, download_path, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+          backoff=BACKOFF_BASE, headers=None):
+    """Download a URL to download_path, retrying transient failures with exponential backoff
+
+    The body is read inside the retried block, so a reset or timeout part
+    way through starts the download over. Returns (response or None, SHA-256
+    of the body or None, attempts, error message or None). The response is
+    closed and is either 200, with the complete body in download_path, or 304.
+    """
+    error = None
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff * 2 ** (attempt - 1))
+        try:
+            with session.get(url, timeout=timeout, headers=headers, stream=True) as response:
+                if response.status_code == 200:
+                    return response, stream_to_file(response, download_path), attempt + 1, None
+                if response.status_code == 304:
+                    return response, None, attempt + 1, None
+                error = f"HTTP {response.status_code}"
+                if response.status_code not in RETRY_STATUSES:
+                    return None, None, attempt + 1, error
+        except requests.RequestException as e:
+            error = str(e)
+    return None, None, retries + 1, error
+
+
+def stream_to_file(response, path):
+    """Stream a response body to a file, returning its SHA-256 hex digest"""
+    digest = hashlib.sha256()
+    with open(path, "wb") as f:
+        for chunk in response.iter_content(CHUNK_SIZE):
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+
+def download_icon(url, filename, size=(100, 100), session=None, output_dir="images",
+                  timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, manifest=None):
+    """Download an icon from a URL and save it to the images directory
+
+    If a manifest dict is given, the request is made conditional on the
+    recorded ETag/Last-Modified, unchanged icons are skipped, and the
+    manifest entry is updated. Returns a result dict with the outcome,
+    attempts and latency in seconds.
+    """
+    session = session or requests
+    start = time.perf_counter()
+    result = {"filename": filename, "url": url, "ok": False, "unchanged": False,
+              "attempts": 0, "error": None}
+    output_path = os.path.join(output_dir, filename)
+    entry = {}
+    if manifest is not None and os.path.exists(output_path):
+        entry = manifest.get(filename, {})
+        if entry.get("url") != url:
+            entry = {}
+    download_path = f"{output_path}.{threading.get_ident()}.part"
     try:
         print(f"Downloading {filename} from {url}...")
-        response = requests.get(url)
-        if response.status_code != 200:
-            print(f"Failed to download {filename}: HTTP {response.status_code}")
-            return False
-        
-        img_data = BytesIO(response.content)
-        img = Image.open(img_data)
-        img = img.resize(size, Image.LANCZOS)
-        
         # Create images directory if it doesn't exist
-        os.makedirs("images", exist_ok=True)
-        
-        # Save the image
-        img.save(os.path.join("images", filename))
-        print(f"Successfully saved {filename}")
-        return True
+        os.makedirs(output_dir, exist_ok=True)
+        response, sha256, result["attempts"], error = fetch(
+            session, url, download_path, timeout, retries, headers=conditional_headers(entry)
+        )
+        if response is None:
+            print(f"Failed to download {filename}: {error}")
+            result["error"] = error
+            return result
+
+        if response.status_code == 304:
+            print(f"{filename} is unchanged")
+            result["ok"] = result["unchanged"] = True
+            return result
+
+        new_entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "sha256": sha256,
+            "size": list(size)
+        }
+
+        if entry.get("sha256") == sha256 and entry.get("size") == list(size):
+            # Server sent the same bytes again (no validators); keep our copy
+            print(f"{filename} is unchanged")
+            result["unchanged"] = True
+        else:
+            with Image.open(download_path) as img:
+                img = img.resize(size, Image.LANCZOS)
+                # Save next to the final file and rename, so readers never see half an icon
+                tmp_path = f"{output_path}.{threading.get_ident()}.tmp"
+                img.save(tmp_path, format=img.format or "PNG")
+            os.replace(tmp_path, output_path)
+            print(f"Successfully saved {filename}")
+
+        if manifest is not None:
+            manifest[filename] = new_entry
+        result["ok"] = True
+        return result
     except Exception as e:
         print(f"Error downloading {filename}: {e}")
-        return False
+        result["error"] = str(e)
+        return result
+    finally:
+        if os.path.exists(download_path):
+            os.remove(download_path)
+        result["latency"] = time.perf_counter() - start
+
+
+def download_all(icons, workers=DEFAULT_WORKERS, output_dir="images",
+                 timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, use_manifest=True):
+    """Download icons concurrently with at most `workers` requests in flight"""
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path) if use_manifest else {}
+    session = make_session(workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(download_icon, url, filename, session=session,
+                                output_dir=output_dir, timeout=timeout, retries=retries,
+                                manifest=manifest)
+                for filename, url in icons.items()
+            ]
+            results = [future.result() for future in futures]
+    finally:
+        session.close()
+
+    try:
+        save_manifest(manifest_path, manifest)
+    except OSError as e:
+        print(f"Could not save {manifest_path}: {e}")
+    return results
+
+
+def print_summary(results, elapsed):
+    """Print per-URL latency and an overall summary"""
+    print("\nLatency per icon:")
+    for result in sorted(results, key=lambda r: r["latency"], reverse=True):
+        if result["unchanged"]:
+            status = "unchanged"
+        elif result["ok"]:
+            status = "ok"
+        else:
+            status = f"FAILED ({result['error']})"
+        print(f"  {result['latency'] * 1000:8.1f} ms  {result['attempts']} attempt(s)  "
+              f"{result['filename']}: {status}")
+
+    latencies = sorted(r["latency"] for r in results)
+    if latencies:
+        print(f"Fastest {latencies[0] * 1000:.1f} ms, median {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+              f"slowest {latencies[-1] * 1000:.1f} ms; total wall time {elapsed:.2f} s")
+
 
 def main():
     """Main function to download all icons"""
-    # Dictionary of AWS service icons with their URLs
-    icons = {
-        "ec2.png": "https://d1.awsstatic.com/icons/jp/console_ec2_icon.64795d08c5e23e92c12cc2c6f91a01aa1b2d60f8.png",
-        "s3.png": "https://d1.awsstatic.com/icons/jp/console_s3_icon.8373b9e7a80599afa7e0331eeb97d54f790c82ba.png",
-        "rds.png": "https://d1.awsstatic.com/icons/jp/console_rds_icon.a478de57ff85a66d93ef078999e8d5f5bdd5cfce.png",
-        "lambda.png": "https://d1.awsstatic.com/icons/jp/console_lambda_icon.dc7781a6b5f1f3cb267b0bac7c9208ce5bb8a2f6.png",
-        "dynamodb.png": "https://d1.awsstatic.com/icons/jp/console_dynamodb_icon.0c655f0f1f7541dc238d4bfe873f8e5a0d454d2a.png",
-        "cloudwatch.png": "https://d1.awsstatic.com/icons/jp/console_cloudwatch_icon.8c2a00a80275209372b0b5caf8c8a37d5c3e5a93.png",
-        "sns.png": "https://d1.awsstatic.com/icons/jp/console_sns_icon.c972fdc0103e27b6a2a20b732839b3a0b8d17e85.png",
-        "sqs.png": "https://d1.awsstatic.com/icons/jp/console_sqs_icon.d7ad274661bc6fd5b6ca0e6bf17da8a4f82b08b9.png",
-        "iam.png": "https://d1.awsstatic.com/icons/jp/console_iam_icon.3eeed669dca9f9e20597cc51d904ed13b5ad4afb.png",
-        "vpc.png": "https://d1.awsstatic.com/icons/jp/console_vpc_icon.d09340f3abe0c7f5d5a3ad664264cb834b11f9a8.png",
-        "ecs.png": "https://d1.awsstatic.com/icons/jp/compute/ecs_blue.8aaa3a8fa5f8250f5047d35df5ff6c9001c23ac0.png",
-        "eks.png": "https://d1.awsstatic.com/icons/jp/eks_blue.9d6b8d799a6c89a6664fdcb2a9c313c8a1d3e0f7.png",
-        "cloudformation.png": "https://d1.awsstatic.com/icons/jp/console_cloudformation_icon.8f058b213317e7099ff8a5cfa848cff0e8e9a2b3.png",
-        "apigateway.png": "https://d1.awsstatic.com/icons/jp/console_apigateway_icon.dc7f9b0b18ecf5aa96265a2e69183e7716e6be1e.png",
-        "stepfunctions.png": "https://d1.awsstatic.com/icons/jp/console_states_icon.3b7c036f544db8e28663de2e7d8a0a5e8d73c642.png"
-    }
-    
-    # Download each icon
-    success_count = 0
-    for filename, url in icons.items():
-        if download_icon(url, filename):
-            success_count += 1
-    
-    print(f"\nDownloaded {success_count} of {len(icons)} icons")
+    parser = argparse.ArgumentParser(description="Download AWS service icons")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="maximum concurrent downloads (1 downloads sequentially)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="per-request timeout in seconds")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="retries per icon after a transient failure")
+    parser.add_argument("--base-url",
+                        help="fetch from this scheme://host[:port] instead (e.g. a local test server)")
+    parser.add_argument("--output-dir", default="images", help="where to save the icons")
+    parser.add_argument("--force", action="store_true",
+                        help="ignore the manifest and download every icon again")
+    args = parser.parse_args()
+
+    icons = ICONS
+    if args.base_url:
+        icons = {filename: rebase_url(url, args.base_url) for filename, url in ICONS.items()}
+
+    start = time.perf_counter()
+    results = download_all(icons, max(1, args.workers), args.output_dir, args.timeout,
+                           args.retries, use_manifest=not args.force)
+    elapsed = time.perf_counter() - start
+    print_summary(results, elapsed)
+
+    success_count = sum(1 for r in results if r["ok"])
+    unchanged_count = sum(1 for r in results if r["unchanged"])
+    print(f"\nDownloaded {success_count} of {len(icons)} icons ({unchanged_count} unchanged)")
     if success_count < len(icons):
         print("Some icons could not be downloaded. You may need to manually download them.")
         print("See the README.md file for more information.")
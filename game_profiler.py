@@ -0,0 +1,205 @@
+"""
+Built-in profiling for the AWS Icon Game
+
+Run either game with --profile to time its hot paths (icon loading,
+drawing the next question, redrawing the scoreboard, building the game
+screen, saving high scores) and write a summary on exit:
+
+    python aws_icon_game_multiplayer.py --profile profile.json --cprofile --tracemalloc
+
+The summary holds count, mean, p95 and max latency per method, the
+process's peak memory and, with --cprofile and --tracemalloc, the top
+functions by cumulative time and the top allocation sites. The full
+cProfile data is written next to it as <summary>.prof for pstats or
+snakeviz.
+
+Methods are wrapped on the game class before the window is built, so Tk
+callbacks bound during setup are timed too. IconCache.load_pixels and
+IconCache.get are wrapped as well, since icons are decoded on the question
+pipeline's prefetch thread (and the network client only goes through the
+cache); calls made off the Tk thread are reported with an "@worker" suffix,
+and with --cprofile they are profiled on that thread too. Without --profile
+nothing is wrapped or started, so profiling costs nothing when it is off.
+"""
+import functools
+import json
+import sys
+import threading
+import time
+import types
+
+DEFAULT_PROFILE = "profile.json"
+HOT_PATHS = (
+    "setup_ui",
+    "setup_game_ui",
+    "load_image",
+    "next_question",
+    "check_answer",
+    "update_player_info",
+    "show_game_over",
+    "save_high_scores",
+)
+CACHE_HOT_PATHS = ("load_pixels", "get")
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 15
+
+
+def add_profile_arguments(parser):
+    """Add the --profile options to a game's argument parser"""
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE, metavar="PATH",
+                        help=f"time the game's hot paths and write a summary (default {DEFAULT_PROFILE})")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="with --profile, also record a cProfile of the session")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="with --profile, also trace Python memory allocations")
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where it is not available"""
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+class Profiler:
+    """Collects per-method timings, and optionally cProfile and tracemalloc data"""
+
+    def __init__(self, path=DEFAULT_PROFILE, cprofile=False, memory=False):
+        self.path = path
+        self.samples = {}  # Method name -> list of durations in seconds
+        self.profile = None
+        self.thread_profiles = {}  # Thread ident -> cProfile.Profile for worker threads
+        self.lock = threading.Lock()
+        self.memory = memory
+        self.started = time.perf_counter()
+        if memory:
+            import tracemalloc
+            tracemalloc.start()
+        if cprofile:
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    @classmethod
+    def from_args(cls, args, game_class):
+        """Start profiling game_class if --profile was given, otherwise return None"""
+        if not args.profile:
+            return None
+        profiler = cls(args.profile, cprofile=args.cprofile, memory=args.tracemalloc)
+        profiler.instrument(game_class)
+        from icon_cache import IconCache  # Loads Pillow early, which only matters when profiling
+        profiler.instrument(IconCache, CACHE_HOT_PATHS, prefix="IconCache.")
+        return profiler
+
+    def instrument(self, cls, names=HOT_PATHS, prefix=""):
+        """Replace the named methods of a class with timed wrappers"""
+        for name in names:
+            method = cls.__dict__.get(name)
+            if isinstance(method, types.FunctionType):  # Not every game has every hot path
+                setattr(cls, name, self.timed(prefix + name, method))
+
+    def thread_profile(self):
+        """The cProfile.Profile of the calling worker thread, created on first use"""
+        ident = threading.get_ident()
+        with self.lock:
+            profile = self.thread_profiles.get(ident)
+            if profile is None:
+                import cProfile
+                profile = self.thread_profiles[ident] = cProfile.Profile()
+        return profile
+
+    def timed(self, name, func):
+        """Wrap func so every call's duration is recorded under name
+
+        Calls off the main (Tk) thread are recorded under "name @worker",
+        and profiled with that thread's own profile when --cprofile is on.
+        """
+        samples = self.samples.setdefault(name, [])
+        worker_samples = self.samples.setdefault(name + " @worker", [])
+        main_thread = threading.main_thread()
+        perf_counter = time.perf_counter
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            on_main = threading.current_thread() is main_thread
+            profile = None if on_main or self.profile is None else self.thread_profile()
+            if profile is not None:
+                profile.enable()
+            started = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - started
+                if profile is not None:
+                    profile.disable()
+                (samples if on_main else worker_samples).append(elapsed)
+        return wrapper
+
+    def summary(self):
+        """Return the latency summary and memory figures as a dict"""
+        functions = {}
+        for name, samples in self.samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            functions[name] = {
+                "count": len(ordered),
+                "mean_ms": sum(ordered) / len(ordered) * 1000,
+                "p95_ms": percentile(ordered, 0.95) * 1000,
+                "max_ms": ordered[-1] * 1000,
+                "total_ms": sum(ordered) * 1000,
+            }
+        return {
+            "session_seconds": time.perf_counter() - self.started,
+            "functions": functions,
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+
+    def stop(self):
+        """Stop collecting and write the summary (and cProfile data) to disk"""
+        report = self.summary()
+
+        if self.profile is not None:
+            import pstats
+            self.profile.disable()
+            prof_path = self.path + ".prof"
+            stats = pstats.Stats(self.profile)
+            with self.lock:
+                for profile in self.thread_profiles.values():
+                    stats.add(profile)  # Worker threads' calls, merged into one profile
+            stats.dump_stats(prof_path)
+            top = []
+            for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+                top.append({"function": f"{filename}:{line}({function})", "calls": calls,
+                            "total_ms": total * 1000, "cumulative_ms": cumulative * 1000})
+            top.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+            report["cprofile"] = {"stats_file": prof_path, "top": top[:TOP_FUNCTIONS]}
+
+        if self.memory:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            report["tracemalloc"] = {
+                "current_bytes": current,
+                "peak_bytes": peak,
+                "top": [{"site": str(stat.traceback), "bytes": stat.size, "blocks": stat.count}
+                        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]],
+            }
+
+        with open(self.path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Profile written to {self.path}")
+        for name, stats in sorted(report["functions"].items(), key=lambda item: -item[1]["total_ms"]):
+            print(f"  {name}: {stats['count']} calls, mean {stats['mean_ms']:.2f} ms, "
+                  f"p95 {stats['p95_ms']:.2f} ms, max {stats['max_ms']:.2f} ms")
+        return report
@@ -0,0 +1,108 @@
+"""
+Game rules for the AWS Icon Game, independent of Tkinter
+
+GameState tracks scores, lives and turn order. The GUIs feed it one answer
+at a time and render whatever it reports back, so the rules can also run
+headless in benchmarks and simulations.
+"""
+from collections import namedtuple
+
+STARTING_LIVES = 3
+
+AnswerResult = namedtuple("AnswerResult", ["correct", "player", "player_out", "game_over", "winner"])
+
+
+class GameState:
+    """Scores, lives and turn order for one game"""
+
+    def __init__(self, player_names, lives=STARTING_LIVES):
+        if not player_names:
+            raise ValueError("A game needs at least one player")
+        self.players = [{"name": name, "lives": lives, "score": 0} for name in player_names]
+        self.current_player_index = 0
+        self.turns = 0  # Answers given so far
+        self.game_over = False
+        self.winner = None
+
+    @property
+    def is_multiplayer(self):
+        return len(self.players) > 1
+
+    @property
+    def current_player(self):
+        return self.players[self.current_player_index]
+
+    def active_players(self):
+        """Return the players who still have lives"""
+        return [p for p in self.players if p["lives"] > 0]
+
+    def answer(self, correct):
+        """Apply the current player's answer and move the turn on"""
+        if self.game_over:
+            raise RuntimeError("The game is already over")
+
+        player = self.current_player
+        self.turns += 1
+        if correct:
+            player["score"] += 1
+        else:
+            player["lives"] -= 1
+
+        player_out = player["lives"] <= 0
+        if player_out:
+            if not self.is_multiplayer:
+                self.game_over = True
+                self.winner = player
+                return AnswerResult(correct, player, True, True, player)
+
+            # Last player standing wins; if everyone is out it is a tie
+            active = self.active_players()
+            if len(active) <= 1:
+                self.game_over = True
+                self.winner = active[0] if active else None
+                return AnswerResult(correct, player, True, True, self.winner)
+
+        if self.is_multiplayer:
+            self.advance_to_next_player()
+        return AnswerResult(correct, player, player_out, False, None)
+
+    def forfeit(self, index):
+        """Take a player out of the game (e.g. they left), moving the turn on if needed
+
+        Returns True if this ended the game.
+        """
+        if self.game_over or self.players[index]["lives"] <= 0:
+            return self.game_over
+        self.players[index]["lives"] = 0
+
+        active = self.active_players()
+        if not self.is_multiplayer or len(active) <= 1:
+            self.game_over = True
+            self.winner = active[0] if active else None
+        elif index == self.current_player_index:
+            self.advance_to_next_player()
+        return self.game_over
+
+    def player_after(self, turns):
+        """Index of the player whose turn it will be after the given number of turns,
+        assuming nobody else goes out in the meantime"""
+        active = [i for i, p in enumerate(self.players) if p["lives"] > 0]
+        if not active:
+            return self.current_player_index
+        start = next((k for k, i in enumerate(active) if i >= self.current_player_index), 0)
+        return active[(start + turns) % len(active)]
+
+    def advance_to_next_player(self):
+        """Advance to the next player who still has lives"""
+        original_index = self.current_player_index
+
+        while True:
+            self.current_player_index = (self.current_player_index + 1) % len(self.players)
+
+            # If we've checked all players and come back to the original, break
+            if self.current_player_index == original_index:
+                break
+
+            # If this player has lives, break
+            if self.players[self.current_player_index]["lives"] > 0:
+                break
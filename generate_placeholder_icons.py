@@ -1,11 +1,56 @@
 #!/usr/bin/env python3
 """
 Script to generate placeholder icons for the AWS Icon Game
+
+Icons are drawn on a process pool, each worker loading the font once. A
+fingerprint of every icon's inputs (name, size, colours, font) is kept in
+images/.placeholder_fingerprints.json, and icons whose inputs have not
+changed are skipped, so regenerating an unchanged catalog is nearly instant.
 """
+import argparse
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+import PIL
 from PIL import Image, ImageDraw, ImageFont
+from catalog import load_catalog
+
+DEFAULT_SIZE = (100, 100)
+DEFAULT_BG_COLOR = "#FF9900"
+DEFAULT_TEXT_COLOR = "#232F3E"
+FONT_NAME = "Arial"
+FONT_SIZE = 12
+FINGERPRINT_FILE = os.path.join("images", ".placeholder_fingerprints.json")
+
+_worker_font = None  # Loaded once per worker process by init_worker
+
+def load_font():
+    """Try to use a system font, fall back to default if not available"""
+    try:
+        return ImageFont.truetype(FONT_NAME, FONT_SIZE)
+    except IOError:
+        return ImageFont.load_default()
+
+def init_worker():
+    """Load the font once for every icon this worker process draws"""
+    global _worker_font
+    _worker_font = load_font()
 
-def create_placeholder_icon(service_name, filename, size=(100, 100), bg_color="#FF9900", text_color="#232F3E"):
+def font_identity(font):
+    """Describe the font that will actually be used, for fingerprinting"""
+    path = getattr(font, "path", None)
+    if isinstance(path, str):
+        return f"{FONT_NAME}:{FONT_SIZE}:{path}"
+    return "default"  # Pillow's built-in font, which may be loaded from memory
+
+def icon_fingerprint(service_name, filename, size, bg_color, text_color, font_id):
+    """Hash every input that affects a placeholder's pixels"""
+    inputs = [service_name, filename, list(size), bg_color, text_color, font_id, PIL.__version__]
+    return hashlib.sha256(json.dumps(inputs).encode("utf-8")).hexdigest()
+
+def create_placeholder_icon(service_name, filename, size=DEFAULT_SIZE, bg_color=DEFAULT_BG_COLOR,
+                            text_color=DEFAULT_TEXT_COLOR, font=None):
     """Create a placeholder icon with the service name"""
     try:
         print(f"Creating placeholder for {service_name}...")
@@ -14,11 +59,8 @@ def create_placeholder_icon(service_name, filename, size=(100, 100), bg_color="#
         img = Image.new('RGB', size, color=bg_color)
         draw = ImageDraw.Draw(img)
         
-        # Try to use a system font, fall back to default if not available
-        try:
-            font = ImageFont.truetype("Arial", 12)
-        except IOError:
-            font = ImageFont.load_default()
+        if font is None:
+            font = _worker_font or load_font()
         
         # Get the abbreviated name (first letters or short form)
         if " " in service_name:
@@ -42,8 +84,10 @@ def create_placeholder_icon(service_name, filename, size=(100, 100), bg_color="#
         # Create images directory if it doesn't exist
         os.makedirs("images", exist_ok=True)
         
-        # Save the image
-        img.save(os.path.join("images", filename))
+        # Save the image, renaming into place so an interrupted run leaves no partial file
+        tmp_path = os.path.join("images", f".{filename}.tmp")
+        img.save(tmp_path, format="PNG")
+        os.replace(tmp_path, os.path.join("images", filename))
         print(f"Successfully created {filename}")
         return True
     except Exception as e:
@@ -52,94 +96,49 @@ def create_placeholder_icon(service_name, filename, size=(100, 100), bg_color="#
 
 def main():
     """Main function to create all placeholder icons"""
-    # Dictionary of AWS services with their icon filenames
-    services = {
-        # Compute
-        "Amazon EC2": "ec2.png",
-        "AWS Lambda": "lambda.png",
-        "Amazon ECS": "ecs.png",
-        "Amazon EKS": "eks.png",
-        "AWS Fargate": "fargate.png",
-        "AWS Batch": "batch.png",
-        "Amazon Lightsail": "lightsail.png",
-        "AWS Elastic Beanstalk": "elasticbeanstalk.png",
-        
-        # Storage
-        "Amazon S3": "s3.png",
-        "Amazon EBS": "ebs.png",
-        "Amazon EFS": "efs.png",
-        "Amazon S3 Glacier": "glacier.png",
-        "AWS Storage Gateway": "storagegateway.png",
-        
-        # Database
-        "Amazon RDS": "rds.png",
-        "Amazon DynamoDB": "dynamodb.png",
-        "Amazon Aurora": "aurora.png",
-        "Amazon Redshift": "redshift.png",
-        "Amazon ElastiCache": "elasticache.png",
-        "Amazon Neptune": "neptune.png",
-        "Amazon DocumentDB": "documentdb.png",
-        
-        # Networking & Content Delivery
-        "Amazon VPC": "vpc.png",
-        "Amazon CloudFront": "cloudfront.png",
-        "Amazon Route 53": "route53.png",
-        "AWS Direct Connect": "directconnect.png",
-        "Elastic Load Balancing": "elb.png",
-        "AWS Global Accelerator": "globalaccelerator.png",
-        
-        # Security, Identity & Compliance
-        "AWS IAM": "iam.png",
-        "Amazon Cognito": "cognito.png",
-        "AWS Shield": "shield.png",
-        "AWS WAF": "waf.png",
-        "AWS KMS": "kms.png",
-        "AWS Secrets Manager": "secretsmanager.png",
-        
-        # Management & Governance
-        "Amazon CloudWatch": "cloudwatch.png",
-        "AWS CloudTrail": "cloudtrail.png",
-        "AWS Config": "config.png",
-        "AWS CloudFormation": "cloudformation.png",
-        "AWS Systems Manager": "systemsmanager.png",
-        "AWS Organizations": "organizations.png",
-        
-        # Application Integration
-        "Amazon SNS": "sns.png",
-        "Amazon SQS": "sqs.png",
-        "AWS Step Functions": "stepfunctions.png",
-        "Amazon EventBridge": "eventbridge.png",
-        "Amazon MQ": "mq.png",
-        
-        # Developer Tools
-        "AWS CodePipeline": "codepipeline.png",
-        "AWS CodeBuild": "codebuild.png",
-        "AWS CodeDeploy": "codedeploy.png",
-        "AWS CodeCommit": "codecommit.png",
-        
-        # Analytics
-        "Amazon Athena": "athena.png",
-        "Amazon EMR": "emr.png",
-        "Amazon Kinesis": "kinesis.png",
-        "AWS Glue": "glue.png",
-        
-        # Machine Learning
-        "Amazon SageMaker": "sagemaker.png",
-        "Amazon Rekognition": "rekognition.png",
-        "Amazon Comprehend": "comprehend.png",
-        
-        # API Services
-        "Amazon API Gateway": "apigateway.png",
-        "Amazon AppSync": "appsync.png"
-    }
+    # AWS services with their icon filenames, from the shared catalog
+    services = {service["name"]: service["icon"] for service in load_catalog().services}
     
-    # Create each placeholder icon
-    success_count = 0
+    parser = argparse.ArgumentParser(description="Generate placeholder AWS service icons")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true",
+                        help="regenerate every icon even if its inputs are unchanged")
+    args = parser.parse_args()
+    
+    try:
+        with open(FINGERPRINT_FILE, "r") as f:
+            fingerprints = {} if args.force else json.load(f)
+    except (OSError, ValueError):
+        fingerprints = {}
+    
+    # Only redraw icons whose inputs changed or whose file has gone missing
+    font_id = font_identity(load_font())
+    pending = {}
     for service_name, filename in services.items():
-        if create_placeholder_icon(service_name, filename):
-            success_count += 1
+        fingerprint = icon_fingerprint(service_name, filename, DEFAULT_SIZE, DEFAULT_BG_COLOR,
+                                       DEFAULT_TEXT_COLOR, font_id)
+        if fingerprints.get(filename) == fingerprint and os.path.exists(os.path.join("images", filename)):
+            continue
+        pending[filename] = (service_name, fingerprint)
+    
+    # Create each changed placeholder icon on the process pool
+    success_count = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as executor:
+            names = [service_name for service_name, _ in pending.values()]
+            results = executor.map(create_placeholder_icon, names, list(pending))
+            for filename, ok in zip(list(pending), results):
+                if ok:
+                    fingerprints[filename] = pending[filename][1]
+                    success_count += 1
+        
+        os.makedirs(os.path.dirname(FINGERPRINT_FILE), exist_ok=True)
+        with open(FINGERPRINT_FILE, "w") as f:
+            json.dump(fingerprints, f, indent=2, sort_keys=True)
     
-    print(f"\nCreated {success_count} of {len(services)} placeholder icons")
+    skipped = len(services) - len(pending)
+    print(f"\nCreated {success_count} of {len(pending)} placeholder icons ({skipped} unchanged)")
 
 if __name__ == "__main__":
     main()
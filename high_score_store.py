@@ -0,0 +1,143 @@
+"""
+SQLite-backed high score storage for the AWS Icon Game
+
+Scores are appended as rows rather than rewriting a JSON file on every game
+over, and the leaderboard's top-N queries are answered from indexes on
+score, so both stay fast after years of kiosk play. An existing
+high_scores.json is imported the first time the store is opened.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+HIGH_SCORES_DB = "high_scores.db"
+LEGACY_HIGH_SCORES_JSON = "high_scores.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS high_scores (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS high_scores_by_score ON high_scores (score DESC, id);
+CREATE INDEX IF NOT EXISTS high_scores_by_name ON high_scores (name, score DESC, id);
+CREATE INDEX IF NOT EXISTS high_scores_by_date ON high_scores (date, score DESC, id);
+CREATE TABLE IF NOT EXISTS migrations (
+    source_sha256 TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    date TEXT NOT NULL
+);
+"""
+
+
+class HighScoreStore:
+    """Append-only high score table with indexed top-N queries"""
+
+    def __init__(self, path=HIGH_SCORES_DB, legacy_json_path=LEGACY_HIGH_SCORES_JSON):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        if path != ":memory:":
+            # Appends only need the write-ahead log, not a full sync
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        if legacy_json_path:
+            self.migrate_json(legacy_json_path)
+
+    def migrate_json(self, json_path):
+        """Import scores from the old JSON file once, then set the file aside
+
+        The import is recorded, keyed by the file's contents, in the same
+        transaction as the scores, so a file that could not be renamed is
+        not imported again on the next start.
+        """
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, "rb") as f:
+                data = f.read()
+            entries = json.loads(data)
+            rows = [(e["name"], int(e["score"]), e["date"]) for e in entries]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Could not read {json_path} for migration: {e}")
+            return 0
+
+        source_sha256 = hashlib.sha256(data).hexdigest()
+        with self.conn:
+            already = self.conn.execute(
+                "SELECT 1 FROM migrations WHERE source_sha256 = ?", (source_sha256,)
+            ).fetchone()
+            if not already:
+                self.conn.executemany(
+                    "INSERT INTO high_scores (name, score, date) VALUES (?, ?, ?)", rows
+                )
+                self.conn.execute(
+                    "INSERT INTO migrations (source_sha256, path, rows, date) VALUES (?, ?, ?, ?)",
+                    (source_sha256, os.path.abspath(json_path), len(rows),
+                     datetime.now().strftime("%Y-%m-%d"))
+                )
+        try:
+            os.replace(json_path, json_path + ".migrated")
+        except OSError as e:
+            print(f"Could not rename {json_path} after migrating it: {e}")
+        if already:
+            return 0
+        print(f"Migrated {len(rows)} high scores from {json_path}")
+        return len(rows)
+
+    def add(self, name, score, date=None):
+        """Append one score"""
+        if date is None:
+            date = datetime.now().strftime("%Y-%m-%d")
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO high_scores (name, score, date) VALUES (?, ?, ?)",
+                (name, score, date)
+            )
+
+    def add_many(self, entries):
+        """Append many (name, score, date) rows in one transaction"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO high_scores (name, score, date) VALUES (?, ?, ?)", entries
+            )
+
+    def top(self, limit=10, name=None, since=None, until=None):
+        """Return the best scores, optionally for one player or a date range
+
+        Dates are inclusive "YYYY-MM-DD" strings. Ties are listed in the order
+        the scores were recorded.
+        """
+        conditions = []
+        params = []
+        if name is not None:
+            conditions.append("name = ?")
+            params.append(name)
+        if since is not None:
+            conditions.append("date >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("date <= ?")
+            params.append(until)
+
+        query = "SELECT name, score, date FROM high_scores"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY score DESC, id LIMIT ?"
+        params.append(limit)
+
+        return [
+            {"name": row[0], "score": row[1], "date": row[2]}
+            for row in self.conn.execute(query, params)
+        ]
+
+    def count(self):
+        """Return the number of stored scores"""
+        return self.conn.execute("SELECT COUNT(*) FROM high_scores").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Script to build a sprite atlas of all service icons for the AWS Icon Game
+
+The atlas packs every catalog icon, already resized to display size, into a
+single image plus a small JSON index. The games decode the atlas once at
+startup and cut individual icons out of it instead of opening one PNG per
+question. The index records each source file's mtime and size, and icons
+changed since the atlas was built are not cut from it.
+"""
+import json
+import math
+import os
+from PIL import Image
+from catalog import load_catalog
+
+ICON_SIZE = (100, 100)
+CACHE_DIR = "cache"
+ATLAS_IMAGE = os.path.join(CACHE_DIR, "icon_atlas.png")
+ATLAS_INDEX = os.path.join(CACHE_DIR, "icon_atlas.json")
+
+
+class IconAtlas:
+    """Service icons packed into one decoded image"""
+
+    def __init__(self, image, index):
+        self.image = image
+        self.icon_size = tuple(index["size"])
+        self.positions = index["icons"]
+        # icon_name -> [mtime_ns, size] of its source; atlases built before this have none
+        self.sources = index.get("sources", {})
+
+    @classmethod
+    def load(cls, image_path=ATLAS_IMAGE, index_path=ATLAS_INDEX):
+        """Load a prebuilt atlas, or return None if it has not been built"""
+        if not (os.path.exists(image_path) and os.path.exists(index_path)):
+            return None
+        try:
+            with open(index_path, "r") as f:
+                index = json.load(f)
+            image = Image.open(image_path)
+            image.load()  # Decode now rather than on the first question
+            return cls(image, index)
+        except Exception as e:
+            print(f"Error loading icon atlas: {e}")
+            return None
+
+    def __contains__(self, icon_name):
+        return icon_name in self.positions
+
+    def is_current(self, icon_name, source_path):
+        """Whether an icon is in the atlas and its source file is unchanged since"""
+        source = self.sources.get(icon_name)
+        if source is None or icon_name not in self.positions:
+            return False
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return False
+        return source == [stat.st_mtime_ns, stat.st_size]
+
+    def crop(self, icon_name):
+        """Cut a single icon out of the atlas"""
+        x, y = self.positions[icon_name]
+        width, height = self.icon_size
+        return self.image.crop((x, y, x + width, y + height))
+
+
+def build_atlas(icon_names, images_dir="images", image_path=ATLAS_IMAGE,
+                index_path=ATLAS_INDEX, size=ICON_SIZE):
+    """Pack the given icons into an atlas image and write its index"""
+    available = [name for name in icon_names
+                 if os.path.exists(os.path.join(images_dir, name))]
+    if not available:
+        print("No icons found to pack")
+        return False
+
+    columns = math.ceil(math.sqrt(len(available)))
+    rows = math.ceil(len(available) / columns)
+    atlas = Image.new('RGBA', (columns * size[0], rows * size[1]), (0, 0, 0, 0))
+
+    positions = {}
+    sources = {}
+    for i, icon_name in enumerate(available):
+        x = (i % columns) * size[0]
+        y = (i // columns) * size[1]
+        # Stat before decoding, so an icon changed mid-build is seen as stale, not current
+        stat = os.stat(os.path.join(images_dir, icon_name))
+        sources[icon_name] = [stat.st_mtime_ns, stat.st_size]
+        with Image.open(os.path.join(images_dir, icon_name)) as img:
+            img = img.convert('RGBA').resize(size, Image.LANCZOS)
+            atlas.paste(img, (x, y))
+        positions[icon_name] = [x, y]
+
+    os.makedirs(os.path.dirname(image_path) or ".", exist_ok=True)
+    atlas.save(image_path)
+    with open(index_path, "w") as f:
+        json.dump({"size": list(size), "icons": positions, "sources": sources}, f)
+
+    missing = len(icon_names) - len(available)
+    print(f"Packed {len(available)} icons into {image_path}")
+    if missing:
+        print(f"{missing} icons were not found and will use placeholders")
+    return True
+
+
+def main():
+    """Main function to build the icon atlas"""
+    icon_names = load_catalog().icon_names()
+    build_atlas(icon_names)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Script to audit the icon set for the AWS Icon Game
+
+Decodes every image under images/ on a process pool and reports:
+  - corrupt files that Pillow cannot verify or decode
+  - icons whose dimensions differ from the expected size
+  - exact duplicates (identical bytes) and pixel duplicates (identical
+    pixels, different files)
+  - near duplicates, whose perceptual hashes differ by only a few bits
+  - catalog entries with no icon file, and icon files no service uses
+
+Perceptual hashes are the same ones the similarity index uses, computed
+with vectorized numpy over all icons at once, and near duplicates are found
+with a blocked pairwise Hamming distance, so the audit stays fast on
+thousands of icons. Without numpy the near-duplicate check is skipped.
+
+    python icon_audit.py [--report icon_audit.json]
+
+Exits with status 1 if any icon is corrupt or missing, so it can gate CI.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from catalog import load_catalog
+from icon_atlas import ICON_SIZE
+from icon_similarity import IMAGE_EXTENSIONS, SAMPLE_SIZE, compute_features
+from question_engine import load_numpy
+
+DEFAULT_REPORT = "icon_audit.json"
+NEAR_DUPLICATE_BITS = 6  # Of 64 hash bits
+MAX_NEIGHBOURS = 8  # Close icons kept per icon, which bounds the size of a group
+CHUNK_ROWS = 1024
+
+
+def inspect_icon(path):
+    """Check one icon file; runs in a worker process"""
+    result = {"file": os.path.basename(path)}
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        result["bytes"] = len(data)
+        result["sha256"] = hashlib.sha256(data).hexdigest()
+
+        with Image.open(path) as img:
+            img.verify()  # Checks the file structure; the image cannot be used afterwards
+        with Image.open(path) as img:
+            img.load()
+            result["size"] = list(img.size)
+            result["mode"] = img.mode
+            rgba = img.convert("RGBA")
+        pixels = rgba.tobytes()
+        result["pixel_sha256"] = hashlib.sha256(repr(rgba.size).encode() + pixels).hexdigest()
+        result["thumbnail"] = rgba.resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.BILINEAR).tobytes()
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def group_by(results, key):
+    """Return groups of two or more files that share the same value of key"""
+    groups = {}
+    for result in results:
+        if key in result:
+            groups.setdefault(result[key], []).append(result["file"])
+    return [sorted(files) for files in groups.values() if len(files) > 1]
+
+
+def close_neighbours(bits, max_bits, k):
+    """Each icon's k nearest other icons within max_bits, nearest first
+
+    Returns (indexes, distances) arrays of shape (count, k), padded with -1.
+    """
+    np = load_numpy()
+    count = len(bits)
+    k = min(k, count - 1)
+    inverse = 1.0 - bits
+    neighbours = np.full((count, k), -1, dtype=np.int64)
+    distances = np.full((count, k), -1, dtype=np.int64)
+    # A band of rows at a time, so memory stays bounded on large icon sets
+    for start in range(0, count, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, count)
+        distance = bits[start:stop] @ inverse.T + inverse[start:stop] @ bits.T
+        distance[np.arange(stop - start), np.arange(start, stop)] = np.inf  # Not its own neighbour
+        nearest = np.argpartition(distance, k - 1, axis=1)[:, :k]
+        nearest_distance = np.take_along_axis(distance, nearest, axis=1)
+        order = np.argsort(nearest_distance, axis=1, kind="stable")
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        nearest_distance = np.take_along_axis(nearest_distance, order, axis=1)
+        close = nearest_distance <= max_bits
+        neighbours[start:stop] = np.where(close, nearest, -1)
+        distances[start:stop] = np.where(close, nearest_distance, -1)
+    return neighbours, distances
+
+
+def near_duplicates(results, max_bits=NEAR_DUPLICATE_BITS, max_neighbours=MAX_NEIGHBOURS):
+    """Groups of visually near-identical icons, or None without numpy
+
+    Each icon keeps at most max_neighbours close icons. The icon with the
+    most close neighbours becomes a group's medoid and takes its neighbours
+    that are not grouped yet, then the next, so every member is within
+    max_bits of its medoid and a group holds at most max_neighbours + 1
+    distinct images. The distance matrix is computed in bands and only the
+    nearest neighbours are kept, so time and memory grow with the number of
+    icons rather than the number of close pairs. Pixel duplicates are clustered once and listed with
+    their original, as they are reported separately too.
+    """
+    np = load_numpy()
+    if np is None:
+        return None
+    files_by_pixels = {}
+    for result in results:
+        if "thumbnail" in result:
+            files_by_pixels.setdefault(result["pixel_sha256"], []).append(result)
+    distinct = [files[0] for files in files_by_pixels.values()]
+    if len(distinct) < 2:
+        return []
+
+    thumbnails = np.stack([
+        np.frombuffer(r["thumbnail"], dtype=np.uint8).reshape(SAMPLE_SIZE, SAMPLE_SIZE, 4)
+        for r in distinct
+    ])
+    hashes, _ = compute_features(thumbnails)
+    bits = np.unpackbits(hashes, axis=1).astype(np.float32)
+
+    group_of = np.full(len(distinct), -1, dtype=np.int64)
+    groups = []
+    # Icons whose close neighbours were all taken by other groups get another
+    # round among themselves, until a round forms no new group
+    remaining = np.arange(len(distinct))
+    while len(remaining) > 1:
+        neighbours, _ = close_neighbours(bits[remaining], max_bits, max_neighbours)
+        neighbours = np.where(neighbours >= 0, remaining[neighbours], -1)
+        degree = (neighbours >= 0).sum(axis=1)
+        formed = len(groups)
+        # Greedy medoids, best connected icons first
+        for row in np.argsort(-degree, kind="stable").tolist():
+            if degree[row] == 0:
+                break
+            medoid = remaining[row]
+            if group_of[medoid] >= 0:
+                continue
+            candidates = neighbours[row][neighbours[row] >= 0]
+            members = candidates[group_of[candidates] < 0]
+            if not len(members):
+                continue
+            group_of[medoid] = len(groups)
+            group_of[members] = len(groups)
+            groups.append(np.concatenate(([medoid], members)))
+        if len(groups) == formed:
+            break
+        remaining = remaining[(group_of[remaining] < 0) & (degree > 0)]
+
+    report = []
+    for members in groups:
+        # Largest distance between any two members, not just to the medoid
+        group_bits = bits[members]
+        widest = int((group_bits @ (1.0 - group_bits).T).max() + 0.5)
+        files = [r["file"] for i in members.tolist()
+                 for r in files_by_pixels[distinct[i]["pixel_sha256"]]]
+        report.append({"files": sorted(files), "max_distance_bits": widest})
+    return sorted(report, key=lambda group: (group["max_distance_bits"], group["files"]))
+
+
+def audit(images_dir="images", expected_size=ICON_SIZE, workers=None):
+    """Audit every icon under images_dir and return the report as a dict"""
+    started = time.perf_counter()
+    names = sorted(name for name in os.listdir(images_dir)
+                   if name.lower().endswith(IMAGE_EXTENSIONS) and not name.startswith("."))
+    paths = [os.path.join(images_dir, name) for name in names]
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # A few chunks per worker keeps the pool busy without a round trip per icon
+        chunksize = max(1, len(paths) // (workers * 4))
+        results = list(executor.map(inspect_icon, paths, chunksize=chunksize))
+
+    catalog = load_catalog()
+    present = set(names)
+    byte_groups = group_by(results, "sha256")
+    byte_duplicated = {frozenset(group) for group in byte_groups}
+    report = {
+        "images_dir": images_dir,
+        "files": len(names),
+        "expected_size": list(expected_size),
+        "corrupt": [{"file": r["file"], "error": r["error"]} for r in results if "error" in r],
+        "wrong_dimensions": [
+            {"file": r["file"], "size": r["size"]}
+            for r in results if "size" in r and tuple(r["size"]) != tuple(expected_size)
+        ],
+        "exact_duplicates": byte_groups,
+        # Same pixels but different bytes, e.g. re-encoded copies
+        "pixel_duplicates": [group for group in group_by(results, "pixel_sha256")
+                             if frozenset(group) not in byte_duplicated],
+        "near_duplicates": near_duplicates(results),
+        "missing": [
+            {"service": service["name"], "icon": service["icon"]}
+            for service in catalog.services if service["icon"] not in present
+        ],
+        "unused": sorted(present - set(catalog.icon_names())),
+    }
+    report["elapsed_seconds"] = time.perf_counter() - started
+    return report
+
+
+def print_summary(report):
+    print(f"Audited {report['files']} icons in {report['images_dir']} "
+          f"in {report['elapsed_seconds']:.2f} s")
+    for item in report["corrupt"]:
+        print(f"  corrupt: {item['file']} ({item['error']})")
+    for item in report["missing"]:
+        print(f"  missing: {item['icon']} for {item['service']}")
+    for item in report["wrong_dimensions"]:
+        print(f"  wrong dimensions: {item['file']} is {item['size'][0]}x{item['size'][1]}")
+    for group in report["exact_duplicates"]:
+        print(f"  identical files: {', '.join(group)}")
+    for group in report["pixel_duplicates"]:
+        print(f"  identical pixels: {', '.join(group)}")
+    if report["near_duplicates"] is None:
+        print("  near duplicates: skipped (numpy is not installed)")
+    else:
+        for group in report["near_duplicates"]:
+            files = group["files"]
+            shown = ", ".join(files[:6]) + (f" and {len(files) - 6} more" if len(files) > 6 else "")
+            print(f"  near duplicates (at most {group['max_distance_bits']} bits apart pairwise): {shown}")
+    if report["unused"]:
+        print(f"  {len(report['unused'])} icon files are not used by any service")
+
+
+def parse_size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height or width)
+
+
+def main():
+    """Audit the icon set and write the report"""
+    parser = argparse.ArgumentParser(description="Audit the AWS Icon Game icon set")
+    parser.add_argument("--images-dir", default="images")
+    parser.add_argument("--report", default=DEFAULT_REPORT, help="JSON report to write")
+    parser.add_argument("--expected-size", type=parse_size, default=ICON_SIZE,
+                        help="expected icon dimensions, e.g. 100x100")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    report = audit(args.images_dir, args.expected_size, args.workers)
+    print_summary(report)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.report}")
+    if report["corrupt"] or report["missing"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
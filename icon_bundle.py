@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Script to build a memory-mapped icon bundle for the AWS Icon Game
+
+The bundle is one file holding every catalog icon as raw RGBA pixels at
+display size, behind a fixed-size offset table:
+
+    header   magic, version, icon width and height, icon count, data offset
+    table    one entry per icon: NUL-padded UTF-8 file name, pixel offset,
+             and the source file's mtime and size when it was bundled
+    pixels   width * height * 4 bytes per icon, starting on a page boundary
+
+The games map the file read-only and wrap each icon's slice of the mapping
+in a Pillow image without copying or decompressing it, so the first
+question no longer waits on PNG decoding, and several games running on the
+same machine share one page-cached copy of the pixels. An icon whose
+source file has changed since it was bundled is skipped, so edits show up
+before the bundle is rebuilt.
+"""
+import mmap
+import os
+import struct
+from PIL import Image
+from catalog import load_catalog
+from icon_atlas import CACHE_DIR, ICON_SIZE
+
+BUNDLE_PATH = os.path.join(CACHE_DIR, "icons.bundle")
+MAGIC = b"AWSICONS"
+VERSION = 2
+HEADER = struct.Struct("<8sIHHIQ")  # magic, version, width, height, count, data offset
+ENTRY = struct.Struct("<56sQqQ")  # file name, absolute offset of its pixels, source mtime_ns and size
+NAME_BYTES = 56
+PAGE_SIZE = 4096
+BUNDLE_MODE = 'RGBA'
+
+
+class IconBundle:
+    """Read-only memory map of a prebuilt icon bundle"""
+
+    def __init__(self, mapping, size=ICON_SIZE):
+        self.mapping = mapping
+        self.view = memoryview(mapping)
+        magic, version, width, height, count, data_offset = HEADER.unpack_from(mapping, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not an icon bundle, or built by a different version")
+        self.icon_size = (width, height)
+        if self.icon_size != tuple(size):
+            raise ValueError(f"icon bundle holds {width}x{height} icons, the game shows "
+                             f"{size[0]}x{size[1]}; rebuild it")
+        self.icon_bytes = width * height * len(BUNDLE_MODE)
+        if data_offset + count * self.icon_bytes > len(mapping):
+            raise ValueError("icon bundle is truncated")
+
+        self.offsets = {}
+        self.sources = {}  # icon_name -> (mtime_ns, size) of the file it was built from
+        for i in range(count):
+            name, offset, mtime_ns, source_size = ENTRY.unpack_from(mapping, HEADER.size + i * ENTRY.size)
+            name = name.rstrip(b"\0").decode("utf-8")
+            self.offsets[name] = offset
+            self.sources[name] = (mtime_ns, source_size)
+
+    @classmethod
+    def load(cls, path=BUNDLE_PATH, size=ICON_SIZE):
+        """Map a prebuilt bundle, or return None if it has not been built or does not fit"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                # The mapping stays valid after the file is closed
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return cls(mapping, size)
+        except (OSError, ValueError) as e:
+            print(f"Error loading icon bundle: {e}")
+            return None
+
+    def __contains__(self, icon_name):
+        return icon_name in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def is_current(self, icon_name, source_path):
+        """Whether an icon is bundled and its source file is unchanged since"""
+        source = self.sources.get(icon_name)
+        if source is None:
+            return False
+        try:
+            stat = os.stat(source_path)
+        except OSError:
+            return False
+        return source == (stat.st_mtime_ns, stat.st_size)
+
+    def image(self, icon_name):
+        """Return an icon as a read-only image backed directly by the mapping"""
+        offset = self.offsets[icon_name]
+        pixels = self.view[offset:offset + self.icon_bytes]
+        return Image.frombuffer(BUNDLE_MODE, self.icon_size, pixels, 'raw', BUNDLE_MODE, 0, 1)
+
+
+def build_bundle(icon_names, images_dir="images", path=BUNDLE_PATH, size=ICON_SIZE):
+    """Decode and resize the given icons into a bundle file"""
+    icon_names = list(dict.fromkeys(icon_names))  # Services may share an icon
+    available = []
+    for name in icon_names:
+        if len(name.encode("utf-8")) > NAME_BYTES:
+            print(f"Skipping {name}: file name is longer than {NAME_BYTES} bytes")
+        elif os.path.exists(os.path.join(images_dir, name)):
+            available.append(name)
+    if not available:
+        print("No icons found to bundle")
+        return False
+
+    icon_bytes = size[0] * size[1] * len(BUNDLE_MODE)
+    table_end = HEADER.size + len(available) * ENTRY.size
+    data_offset = -(-table_end // PAGE_SIZE) * PAGE_SIZE
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, size[0], size[1], len(available), data_offset))
+        # Stat before decoding, so an icon changed mid-build is seen as stale, not current
+        stats = [os.stat(os.path.join(images_dir, name)) for name in available]
+        for i, (name, stat) in enumerate(zip(available, stats)):
+            f.write(ENTRY.pack(name.encode("utf-8"), data_offset + i * icon_bytes,
+                               stat.st_mtime_ns, stat.st_size))
+        f.write(b"\0" * (data_offset - table_end))
+        for name in available:
+            with Image.open(os.path.join(images_dir, name)) as img:
+                f.write(img.convert(BUNDLE_MODE).resize(size, Image.LANCZOS).tobytes())
+    # Replace rather than rewrite, so running games keep their mapping of the old file
+    os.replace(tmp_path, path)
+
+    missing = len(icon_names) - len(available)
+    print(f"Bundled {len(available)} icons into {path}")
+    if missing:
+        print(f"{missing} icons were not found and will use placeholders")
+    return True
+
+
+def main():
+    """Main function to build the icon bundle"""
+    icon_names = load_catalog().icon_names()
+    build_bundle(icon_names)
+
+
+if __name__ == "__main__":
+    main()
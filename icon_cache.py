@@ -0,0 +1,131 @@
+"""
+Shared icon cache for the AWS Icon Game
+
+Both game windows load their icons through an IconCache. Decoded icons are
+kept in least-recently-used order and evicted once their decoded size goes
+over a byte budget, so memory stays flat however large the catalog grows.
+Icons that are missing or cannot be decoded are remembered as misses and
+share a single placeholder image.
+"""
+import os
+from collections import OrderedDict
+from PIL import Image, ImageTk
+from icon_atlas import ICON_SIZE
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024  # Roughly 400 RGBA icons at 100x100
+PLACEHOLDER_COLOR = '#FF9900'
+
+
+def image_nbytes(img):
+    """Decoded size of a PIL image in bytes"""
+    return img.width * img.height * len(img.getbands())
+
+
+class IconCache:
+    """LRU cache of Tk icon images bounded by decoded bytes"""
+
+    def __init__(self, atlas=None, derivatives=None, max_bytes=DEFAULT_MAX_BYTES,
+                 images_dir="images", bundle=None):
+        self.atlas = atlas
+        self.bundle = bundle  # Optional memory-mapped IconBundle
+        self.derivatives = derivatives  # Optional on-disk DerivativeCache
+        self.max_bytes = max_bytes
+        self.images_dir = images_dir
+        self.entries = OrderedDict()  # icon_name -> (photo, nbytes)
+        self.missing = set()  # Icons known to be absent or undecodable
+        self.current_bytes = 0
+        self.placeholder_image = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, icon_name):
+        return icon_name in self.entries or icon_name in self.missing
+
+    def load_pixels(self, icon_name):
+        """Decode an icon at display size, or return None if it does not exist
+
+        Does not touch Tk or the cache itself, so it is safe to call from a
+        worker thread.
+        """
+        image_path = os.path.join(self.images_dir, icon_name)
+
+        # Prefer the memory-mapped bundle, which needs no decoding at all,
+        # unless the icon has been edited since the bundle was built
+        if self.bundle is not None and self.bundle.is_current(icon_name, image_path):
+            return self.bundle.image(icon_name)
+
+        # Then the prebuilt atlas, which is already at display size, again only
+        # while the source is unchanged; otherwise the derivative cache notices the edit
+        if self.atlas and self.atlas.is_current(icon_name, image_path):
+            return self.atlas.crop(icon_name)
+
+        # Then the on-disk cache of pre-resized icons
+        if self.derivatives is not None:
+            return self.derivatives.get(icon_name, ICON_SIZE)
+
+        if not os.path.exists(image_path):
+            return None
+        with Image.open(image_path) as img:
+            return img.resize(ICON_SIZE, Image.LANCZOS)
+
+    def placeholder(self):
+        """Return the shared placeholder image, creating it on first use"""
+        if self.placeholder_image is None:
+            img = Image.new('RGB', ICON_SIZE, color=PLACEHOLDER_COLOR)
+            self.placeholder_image = ImageTk.PhotoImage(img)
+        return self.placeholder_image
+
+    def get(self, icon_name, pixels=None):
+        """Return the Tk image for an icon, decoding it unless pixels are supplied"""
+        entry = self.entries.get(icon_name)
+        if entry is not None:
+            self.entries.move_to_end(icon_name)
+            self.hits += 1
+            return entry[0]
+        if icon_name in self.missing:
+            self.hits += 1
+            return self.placeholder()
+
+        self.misses += 1
+        try:
+            if pixels is None:
+                pixels = self.load_pixels(icon_name)
+            if pixels is None:
+                self.missing.add(icon_name)
+                return self.placeholder()
+            photo_img = ImageTk.PhotoImage(pixels)
+        except Exception as e:
+            print(f"Error loading image {icon_name}: {e}")
+            self.missing.add(icon_name)
+            return self.placeholder()
+
+        self.put(icon_name, photo_img, image_nbytes(pixels))
+        return photo_img
+
+    def put(self, icon_name, photo_img, nbytes):
+        """Add an image to the cache, evicting the least recently used ones"""
+        self.entries[icon_name] = (photo_img, nbytes)
+        self.current_bytes += nbytes
+        while self.current_bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, evicted_bytes) = self.entries.popitem(last=False)
+            self.current_bytes -= evicted_bytes
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every cached image and forget known misses"""
+        self.entries.clear()
+        self.missing.clear()
+        self.current_bytes = 0
+
+    def stats(self):
+        """Return cache hit/miss/eviction counts and current usage"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "missing": len(self.missing),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
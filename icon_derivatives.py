@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of pre-resized icon derivatives for the AWS Icon Game
+
+Each source icon is converted to the display mode and resized to every
+display size once, then stored as raw pixels under cache/derivatives. Entries
+are keyed by the source file's content hash and mtime, so editing or
+replacing an icon rebuilds its derivatives automatically and a warm start
+never resamples anything.
+"""
+import hashlib
+import json
+import os
+import threading
+from PIL import Image
+from catalog import load_catalog
+from icon_atlas import CACHE_DIR, ICON_SIZE
+
+DERIVATIVE_DIR = os.path.join(CACHE_DIR, "derivatives")
+DISPLAY_MODE = 'RGBA'
+DISPLAY_SIZES = [ICON_SIZE]
+
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DerivativeCache:
+    """Resized, mode-converted icons stored on disk between runs"""
+
+    def __init__(self, images_dir="images", cache_dir=DERIVATIVE_DIR,
+                 sizes=DISPLAY_SIZES, mode=DISPLAY_MODE):
+        self.images_dir = images_dir
+        self.cache_dir = cache_dir
+        self.sizes = [tuple(size) for size in sizes]
+        self.mode = mode
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.index = self.load_index()  # icon_name -> {"mtime_ns", "size", "sha256"}
+        self.lock = threading.Lock()  # Icons are also loaded from the prefetch thread
+        self.builds = 0
+
+    def load_index(self):
+        """Load the source fingerprint index"""
+        try:
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_index(self):
+        """Write the source fingerprint index atomically"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def source_key(self, icon_name, source_path):
+        """Return (sha256, mtime_ns) for a source icon, rehashing only if it changed"""
+        stat = os.stat(source_path)
+        with self.lock:
+            entry = self.index.get(icon_name)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                return entry["sha256"], entry["mtime_ns"]
+
+        sha256 = file_digest(source_path)
+        with self.lock:
+            self.index[icon_name] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": sha256
+            }
+            try:
+                self.remove_derivatives(icon_name)
+                self.save_index()
+            except OSError as e:
+                print(f"Could not update icon derivative index: {e}")
+        return sha256, stat.st_mtime_ns
+
+    def derivative_path(self, icon_name, sha256, mtime_ns, size):
+        """Path of the derivative for one source version at one display size"""
+        stem = os.path.splitext(icon_name)[0]
+        filename = f"{stem}-{sha256[:16]}-{mtime_ns}-{size[0]}x{size[1]}.{self.mode.lower()}"
+        return os.path.join(self.cache_dir, filename)
+
+    def remove_derivatives(self, icon_name):
+        """Delete stale derivatives left over from previous versions of an icon"""
+        stem = os.path.splitext(icon_name)[0]
+        if not os.path.isdir(self.cache_dir):
+            return
+        for filename in os.listdir(self.cache_dir):
+            if filename.rsplit("-", 3)[0] == stem and filename != "index.json":
+                os.remove(os.path.join(self.cache_dir, filename))
+
+    def get(self, icon_name, size=ICON_SIZE):
+        """Return an icon at the given display size, or None if its source is missing"""
+        size = tuple(size)
+        source_path = os.path.join(self.images_dir, icon_name)
+        if not os.path.exists(source_path):
+            return None
+
+        sha256, mtime_ns = self.source_key(icon_name, source_path)
+        path = self.derivative_path(icon_name, sha256, mtime_ns, size)
+        try:
+            with open(path, "rb") as f:
+                return Image.frombytes(self.mode, size, f.read())
+        except (OSError, ValueError):
+            pass  # Not built yet, or truncated by an interrupted write
+
+        return self.build(source_path, path, size)
+
+    def build(self, source_path, path, size):
+        """Resize a source icon and store the derivative"""
+        with Image.open(source_path) as img:
+            derivative = img.convert(self.mode).resize(size, Image.LANCZOS)
+        self.builds += 1
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(derivative.tobytes())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not store icon derivative {path}: {e}")
+        return derivative
+
+    def warm(self, icon_names):
+        """Build every missing or stale derivative for the given icons"""
+        count = 0
+        for icon_name in icon_names:
+            for size in self.sizes:
+                if self.get(icon_name, size) is not None:
+                    count += 1
+        return count
+
+
+def main():
+    """Main function to prebuild all icon derivatives"""
+    cache = DerivativeCache()
+    icon_names = load_catalog().icon_names()
+    count = cache.warm(icon_names)
+    print(f"{count} icon derivatives ready in {cache.cache_dir} ({cache.builds} rebuilt)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Script to build a visual similarity index of the icons for hard mode
+
+For every image under images/ this computes a 64-bit perceptual hash (DCT
+of a 32x32 greyscale thumbnail) and a 64-bin colour histogram, and stores
+each icon's nearest neighbours by a blend of hash distance and histogram
+overlap. In hard mode the game draws its wrong answers from an icon's
+neighbours, so at question time picking look-alike distractors is a lookup.
+
+Features are computed with vectorized numpy over all changed icons at once.
+They are kept in the index with each file's mtime, size and content hash,
+so a rebuild only decodes icons that were added or changed; the neighbour
+table itself is cheap and is recomputed whenever anything changed.
+
+    python icon_similarity.py [--force]
+"""
+import argparse
+import json
+import os
+from PIL import Image
+from icon_atlas import CACHE_DIR
+from icon_derivatives import file_digest
+from question_engine import load_numpy
+
+SIMILARITY_INDEX = os.path.join(CACHE_DIR, "icon_similarity.json")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp")
+SAMPLE_SIZE = 32  # Icons are reduced to this many pixels square before hashing
+HASH_SIZE = 8  # Low-frequency DCT coefficients kept per side, so 64 hash bits
+HISTOGRAM_LEVELS = 4  # Per channel, so 64 colour bins
+HASH_WEIGHT = 0.5  # Share of the distance from the hash; the rest is colour
+NEIGHBOURS = 8  # Most similar icons stored per icon
+HARD_CANDIDATES = 4  # Hard mode draws its distractors from this many neighbours
+CHUNK_ROWS = 256  # Rows of the distance matrix computed at a time
+
+
+def decode_icon(path):
+    """Load an icon as a SAMPLE_SIZE x SAMPLE_SIZE RGBA array"""
+    np = load_numpy()
+    with Image.open(path) as img:
+        img = img.convert("RGBA").resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.BILINEAR)
+        return np.asarray(img, dtype=np.uint8)
+
+
+def dct_matrix(n):
+    """Orthonormal DCT-II matrix, so coefficients = D @ block @ D.T"""
+    np = load_numpy()
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+def compute_features(pixels):
+    """Perceptual hashes (N x 8 bytes) and colour histograms (N x 64) for a stack of icons"""
+    np = load_numpy()
+    count = len(pixels)
+    rgba = pixels.astype(np.float32) / 255.0
+    alpha = rgba[..., 3:]
+
+    # Hash the icon as drawn on a white background
+    rgb = rgba[..., :3] * alpha + (1.0 - alpha)
+    grey = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    dct = dct_matrix(SAMPLE_SIZE).astype(np.float32)
+    coefficients = dct @ grey @ dct.T
+    low = coefficients[:, :HASH_SIZE, :HASH_SIZE].reshape(count, -1)
+    # The DC term is the mean brightness, so it is left out of the median
+    bits = low > np.median(low[:, 1:], axis=1, keepdims=True)
+    hashes = np.packbits(bits, axis=1)
+
+    # Colour histogram over visible pixels, weighted by alpha
+    levels = np.minimum((rgba[..., :3] * HISTOGRAM_LEVELS).astype(np.int64), HISTOGRAM_LEVELS - 1)
+    bins = (levels[..., 0] * HISTOGRAM_LEVELS + levels[..., 1]) * HISTOGRAM_LEVELS + levels[..., 2]
+    bin_count = HISTOGRAM_LEVELS ** 3
+    bins = bins.reshape(count, -1) + (np.arange(count) * bin_count)[:, None]
+    histograms = np.bincount(bins.ravel(), weights=alpha.ravel(), minlength=count * bin_count)
+    histograms = histograms.reshape(count, bin_count)
+    totals = histograms.sum(axis=1, keepdims=True)
+    histograms = np.divide(histograms, totals, out=np.zeros_like(histograms), where=totals > 0)
+    return hashes, histograms
+
+
+def nearest_neighbours(hashes, histograms, k=NEIGHBOURS):
+    """Return the indexes of each icon's k most similar icons, nearest first"""
+    np = load_numpy()
+    count = len(hashes)
+    k = min(k, count - 1)
+    if k <= 0:
+        return np.zeros((count, 0), dtype=np.int64)
+
+    bits = np.unpackbits(hashes, axis=1).astype(np.float32)
+    inverse = 1.0 - bits
+    neighbours = np.empty((count, k), dtype=np.int64)
+    # Compute the distance matrix a band of rows at a time to bound memory
+    for start in range(0, count, CHUNK_ROWS):
+        stop = min(start + CHUNK_ROWS, count)
+        hamming = (bits[start:stop] @ inverse.T + inverse[start:stop] @ bits.T) / bits.shape[1]
+        overlap = np.minimum(histograms[start:stop, None, :], histograms[None, :, :]).sum(axis=2)
+        distance = HASH_WEIGHT * hamming + (1.0 - HASH_WEIGHT) * (1.0 - overlap)
+        distance[np.arange(stop - start), np.arange(start, stop)] = np.inf  # Not its own neighbour
+
+        nearest = np.argpartition(distance, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(distance, nearest, axis=1), axis=1, kind="stable")
+        neighbours[start:stop] = np.take_along_axis(nearest, order, axis=1)
+    return neighbours
+
+
+def load_index(index_path=SIMILARITY_INDEX):
+    """Load a previously built index, or an empty one"""
+    try:
+        with open(index_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"features": {}, "neighbours": {}}
+
+
+def build_index(images_dir="images", index_path=SIMILARITY_INDEX, force=False):
+    """Update the index for the icons under images_dir; return the number decoded"""
+    np = load_numpy()
+    if np is None:
+        print("numpy is required to build the similarity index (pip install numpy)")
+        return None
+
+    index = {"features": {}, "neighbours": {}} if force else load_index(index_path)
+    old_features = index["features"]
+    names = sorted(name for name in os.listdir(images_dir)
+                   if name.lower().endswith(IMAGE_EXTENSIONS) and not name.startswith("."))
+
+    features = {}
+    changed = []
+    touched = 0
+    for name in names:
+        path = os.path.join(images_dir, name)
+        stat = os.stat(path)
+        entry = old_features.get(name)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            features[name] = entry
+            continue
+        digest = file_digest(path)
+        if entry and entry["sha256"] == digest:
+            # Touched but not changed: keep the features, remember the new stat
+            features[name] = dict(entry, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            touched += 1
+            continue
+        features[name] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+        changed.append(name)
+
+    decoded = []
+    for name in changed:
+        try:
+            decoded.append((name, decode_icon(os.path.join(images_dir, name))))
+        except Exception as e:
+            print(f"Skipping {name}: {e}")
+            del features[name]
+    if decoded:
+        hashes, histograms = compute_features(np.stack([pixels for _, pixels in decoded]))
+        for (name, _), hash_bytes, histogram in zip(decoded, hashes, histograms):
+            features[name]["hash"] = hash_bytes.tobytes().hex()
+            features[name]["histogram"] = [round(float(v), 5) for v in histogram]
+
+    names = sorted(features)
+    if not decoded and features.keys() == old_features.keys() and index["neighbours"]:
+        if not touched:
+            print(f"Similarity index is up to date ({len(features)} icons)")
+            return 0
+        neighbours = index["neighbours"]  # Only file times changed
+    else:
+        # Recompute the neighbour table from every icon's stored features
+        hashes = np.array([list(bytes.fromhex(features[n]["hash"])) for n in names], dtype=np.uint8)
+        histograms = np.array([features[n]["histogram"] for n in names], dtype=np.float32)
+        neighbour_ids = nearest_neighbours(hashes, histograms) if names else []
+        neighbours = {name: [names[j] for j in row] for name, row in zip(names, neighbour_ids)}
+
+    os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"features": features, "neighbours": neighbours}, f)
+    os.replace(tmp_path, index_path)
+    print(f"Indexed {len(names)} icons ({len(decoded)} decoded, "
+          f"{len(names) - len(decoded)} unchanged) into {index_path}")
+    return len(decoded)
+
+
+def load_similar_services(services, index_path=SIMILARITY_INDEX, candidates=HARD_CANDIDATES):
+    """Map each service id to the ids of services with the most similar icons
+
+    Returns None if the index has not been built.
+    """
+    if not os.path.exists(index_path):
+        return None
+    table = load_index(index_path)["neighbours"]
+    ids_by_icon = {service["icon"]: i for i, service in enumerate(services)}
+    similar = []
+    for service in services:
+        ids = [ids_by_icon[icon] for icon in table.get(service["icon"], []) if icon in ids_by_icon]
+        similar.append(ids[:candidates])
+    return similar
+
+
+def main():
+    """Build or update the similarity index"""
+    parser = argparse.ArgumentParser(description="Build the icon similarity index for hard mode")
+    parser.add_argument("--images-dir", default="images")
+    parser.add_argument("--output", default=SIMILARITY_INDEX)
+    parser.add_argument("--force", action="store_true", help="recompute every icon")
+    args = parser.parse_args()
+    build_index(args.images_dir, args.output, args.force)
+
+
+if __name__ == "__main__":
+    main()
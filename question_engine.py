@@ -0,0 +1,128 @@
+"""
+Question generation for the AWS Icon Game
+
+Questions are built from integer service ids rather than service dicts.
+Distractors are drawn by rejection sampling, which takes O(1) expected time
+however large the catalog is. Large batches of questions (for simulations and
+benchmarks) are generated with vectorized numpy operations when numpy is
+installed, and with a plain loop otherwise. numpy is only imported the
+first time a batch is requested, so it never slows down game startup.
+
+In hard mode (see icon_similarity.py) distractors come from a precomputed
+list of services whose icons look like the correct one.
+"""
+import random
+from collections import namedtuple
+
+NUM_OPTIONS = 3
+
+_numpy = None
+_numpy_checked = False
+
+Question = namedtuple("Question", ["service_id", "option_ids", "correct_index"])
+QuestionBatch = namedtuple("QuestionBatch", ["service_ids", "option_ids", "correct_indices"])
+
+
+def load_numpy():
+    """Import numpy on first use, returning None if it is not installed"""
+    global _numpy, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:  # numpy is optional; only batch generation uses it
+            _numpy = None
+    return _numpy
+
+
+class QuestionEngine:
+    """Draws questions (correct service plus distractors) by service id"""
+
+    def __init__(self, services, num_options=NUM_OPTIONS, seed=None, similar=None):
+        if len(services) < num_options:
+            raise ValueError(f"Need at least {num_options} services, got {len(services)}")
+        self.services = services
+        self.num_options = num_options
+        # Hard mode: service id -> ids of look-alike services, or None for uniform distractors
+        self.similar = similar
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.np_rng = None  # Created with the first numpy batch
+
+    def reseed(self, seed):
+        """Restart the random stream, e.g. to give each game its own reproducible stream"""
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.np_rng = None
+
+    def service(self, service_id):
+        """Return the service dict for an id"""
+        return self.services[service_id]
+
+    def option_names(self, question):
+        """Return the answer labels for a question, in button order"""
+        return [self.services[i]["name"] for i in question.option_ids]
+
+    def next_question(self):
+        """Draw one question in O(1) expected time"""
+        return self.question_for(self.rng.randrange(len(self.services)))
+
+    def question_for(self, correct):
+        """Build a question about the given service id with random distractors"""
+        n = len(self.services)
+        randrange = self.rng.randrange
+
+        option_ids = [correct]
+        if self.similar is not None:
+            # A handful of look-alikes, so this is O(1) like the uniform draw
+            look_alikes = self.similar[correct]
+            wanted = min(self.num_options - 1, len(look_alikes))
+            option_ids.extend(self.rng.sample(look_alikes, wanted))
+
+        # Rejection sampling: with a catalog much larger than the number of
+        # options almost every draw is accepted first time
+        while len(option_ids) < self.num_options:
+            candidate = randrange(n)
+            if candidate not in option_ids:
+                option_ids.append(candidate)
+
+        # Distractors are already in random order, so swapping the correct
+        # answer into a random slot gives a uniformly shuffled option list
+        correct_index = randrange(self.num_options)
+        option_ids[0], option_ids[correct_index] = option_ids[correct_index], option_ids[0]
+        return Question(correct, option_ids, correct_index)
+
+    def generate_batch(self, count):
+        """Draw many questions at once as parallel arrays"""
+        np = load_numpy()
+        if np is None or self.num_options != NUM_OPTIONS or self.similar is not None:
+            questions = [self.next_question() for _ in range(count)]
+            return QuestionBatch(
+                [q.service_id for q in questions],
+                [q.option_ids for q in questions],
+                [q.correct_index for q in questions]
+            )
+
+        if self.np_rng is None:
+            self.np_rng = np.random.default_rng(self.seed)
+        n = len(self.services)
+        rng = self.np_rng
+        correct = rng.integers(0, n, count)
+
+        # Draw from the n - 1 non-correct ids and shift past the correct one,
+        # then the same for the second distractor with both ids excluded
+        first = rng.integers(0, n - 1, count)
+        first += first >= correct
+        low = np.minimum(correct, first)
+        high = np.maximum(correct, first)
+        second = rng.integers(0, n - 2, count)
+        second += second >= low
+        second += second >= high
+
+        options = np.stack([correct, first, second], axis=1)
+        correct_indices = rng.integers(0, NUM_OPTIONS, count)
+        rows = np.arange(count)
+        options[rows, 0] = options[rows, correct_indices]
+        options[rows, correct_indices] = correct
+        return QuestionBatch(correct, options, correct_indices)
@@ -0,0 +1,83 @@
+"""
+Lookahead question pipeline for the AWS Icon Game
+
+Keeps the next few questions generated ahead of time and decodes their icons
+on a worker thread while the player is still answering, so the Tk thread
+only has to wrap ready-made pixels in a PhotoImage.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+LOOKAHEAD = 3
+
+
+class QuestionPipeline:
+    """Generates questions ahead and prefetches their icons in the background"""
+
+    def __init__(self, engine, load_pixels, is_cached=None, depth=LOOKAHEAD):
+        self.engine = engine  # QuestionEngine (or AdaptiveScheduler) that draws the questions
+        self.load_pixels = load_pixels  # Must not touch Tk; runs on the worker
+        self.is_cached = is_cached or (lambda icon_name: False)
+        self.depth = depth
+        self.pending = deque()  # (question, future or None)
+        self.drawn = 0  # Questions drawn since the last reset
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.hits = 0
+        self.misses = 0
+        self.fill()
+
+    def fill(self):
+        """Top the lookahead queue back up to its configured depth"""
+        while len(self.pending) < self.depth:
+            question = self.engine.next_question()
+            icon_name = self.engine.service(question.service_id)["icon"]
+            future = None
+            if not self.is_cached(icon_name):
+                future = self.executor.submit(self.load_pixels, icon_name)
+            self.pending.append((question, future))
+            self.drawn += 1
+
+    def reset(self):
+        """Drop the queued questions and draw new ones, e.g. when a new game starts"""
+        for _, future in self.pending:
+            if future is not None:
+                future.cancel()
+        self.pending.clear()
+        self.drawn = 0
+        self.fill()
+
+    def next_question(self):
+        """Return the next question and its decoded pixels (None if cached or failed)"""
+        question, future = self.pending.popleft()
+        self.fill()
+
+        if future is None:
+            self.hits += 1
+            return question, None
+
+        if future.done():
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        try:
+            return question, future.result()
+        except Exception:
+            # Let the icon cache retry on the Tk thread and record the failure
+            return question, None
+
+    def stats(self):
+        """Return prefetch hit/miss counts"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def shutdown(self):
+        """Stop the worker thread, dropping any prefetches not yet started"""
+        for _, future in self.pending:
+            if future is not None:
+                future.cancel()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,417 @@
+"""
+Tk client for networked AWS Icon Game rooms
+
+Joins a room on a room_server.py by host:port. The server runs the rules
+and sends questions as catalog service ids; this client only draws them,
+sends the local player's answers and shows everyone's score and lives.
+The socket is read on a background thread and messages are handed to Tk
+through a queue that the window polls with after(), so the UI never blocks
+on the network.
+"""
+import json
+import queue
+import socket
+import threading
+import tkinter as tk
+from urllib.parse import urlsplit
+from tkinter import messagebox
+from catalog import load_catalog
+from scoreboard import ScoreboardModel, VirtualScoreboard
+from answer_feedback import FeedbackBanner, CORRECT_COLOR, INCORRECT_COLOR
+from room_server import DEFAULT_PORT, MAX_LINE_BYTES
+
+CONNECT_TIMEOUT = 5
+POLL_MS = 30
+
+
+def parse_address(address, default_port=DEFAULT_PORT):
+    """Split "host:port" (port optional) into a (host, port) tuple
+
+    IPv6 addresses take brackets when a port is given, as in "[::1]:8765".
+    """
+    address = address.strip()
+    if address.count(":") > 1 and not address.startswith("["):
+        return address, default_port  # Bare IPv6 address without a port
+    parts = urlsplit("//" + address)  # Raises ValueError for a bad port
+    return parts.hostname or "127.0.0.1", parts.port or default_port
+
+
+class RoomConnection:
+    """Line-delimited JSON connection to a room server"""
+
+    def __init__(self, host, port, timeout=CONNECT_TIMEOUT):
+        self.sock = socket.create_connection((host, port), timeout)
+        self.sock.settimeout(None)
+        self.messages = queue.Queue()
+        self.reader = threading.Thread(target=self.read_loop, daemon=True)
+        self.reader.start()
+
+    def read_loop(self):
+        """Queue every message from the server; None marks the end of the connection"""
+        try:
+            with self.sock.makefile("rb") as f:
+                for line in f:
+                    self.messages.put(json.loads(line))
+        except (OSError, ValueError):
+            pass
+        self.messages.put(None)
+
+    def send(self, message):
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        if len(data) > MAX_LINE_BYTES:
+            raise ValueError("Message too long")
+        self.sock.sendall(data)
+
+    def poll(self):
+        """Return the messages received so far without blocking"""
+        received = []
+        while True:
+            try:
+                received.append(self.messages.get_nowait())
+            except queue.Empty:
+                return received
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class NetworkGame:
+    """Lobby, game and results screens for one joined room
+
+    game is the AWSIconGameMultiplayer window, used for its icon cache,
+    feedback delay and welcome screen.
+    """
+
+    def __init__(self, game, connection, room_name, player_name):
+        self.game = game
+        self.root = game.root
+        self.connection = connection
+        self.room_name = room_name
+        self.player_name = player_name
+        self.player_index = None
+        self.is_host = False
+        self.services = None
+        self.lobby_players = []
+        self.players = None  # Player dicts while a game is running
+        self.question = None
+        self.my_turn = False
+        self.screen = None
+        self.feedback_banner = None
+        self.active = True
+
+        self.connection.send({"type": "join", "room": room_name, "name": player_name})
+        self.show_lobby()
+        self.root.after(POLL_MS, self.poll)
+
+    def poll(self):
+        """Handle messages from the server, then check again shortly"""
+        if not self.active:
+            return
+        for message in self.connection.poll():
+            if message is None:
+                self.leave("Disconnected from the server.")
+                return
+            handler = getattr(self, "on_" + message.get("type", ""), None)
+            if handler is not None:
+                handler(message)
+            if not self.active:
+                return
+        self.root.after(POLL_MS, self.poll)
+
+    def leave(self, reason=None):
+        """Close the connection and return to the welcome screen"""
+        self.active = False
+        self.connection.close()
+        self.game.show_welcome_screen()
+        if reason:
+            messagebox.showinfo("Network Game", reason, parent=self.root)
+
+    def clear(self, screen):
+        """Empty the window for a new screen, dropping any pending feedback"""
+        if self.feedback_banner is not None:
+            self.feedback_banner.cancel()
+            self.feedback_banner = None
+        for widget in self.root.winfo_children():
+            widget.destroy()
+        self.screen = screen
+
+    # Server messages
+
+    def on_welcome(self, message):
+        self.player_index = message["player"]
+        self.is_host = message["host"]
+        pool = load_catalog().question_pool(message.get("categories"))
+        if len(pool) != message["catalog_size"]:
+            self.leave("The server's service catalog does not match this one.")
+            return
+        self.services = pool
+        if self.screen == "lobby":
+            self.start_button.config(state=tk.NORMAL if self.is_host else tk.DISABLED)
+
+    def on_lobby(self, message):
+        self.lobby_players = message["players"]
+        if self.screen == "lobby":
+            self.lobby_var.set(self.lobby_text())
+
+    def on_started(self, message):
+        self.players = message["players"]
+        self.setup_game_ui()
+
+    def on_question(self, message):
+        self.question = message
+        service = self.services[message["service_id"]]
+        icon_image = self.game.icon_cache.get(service["icon"])
+        self.icon_label.configure(image=icon_image)
+        self.icon_label.image = icon_image  # Keep a reference
+        for button, service_id in zip(self.option_buttons, message["option_ids"]):
+            button.config(text=self.services[service_id]["name"])
+
+        self.my_turn = message["player"] == self.player_index
+        self.scoreboard.set_highlight(message["player"])
+        self.update_status()
+        if not self.feedback_banner.active:
+            self.set_options_state()
+
+    def on_result(self, message):
+        player = self.players[message["player"]]
+        player["score"] = message["score"]
+        player["lives"] = message["lives"]
+        self.scoreboard.update_player(message["player"])
+
+        answer = self.services[message["service_id"]]["name"]
+        who = "You" if message["player"] == self.player_index else player["name"]
+        if message["correct"]:
+            text = f"{who}: Correct! That's {answer}."
+        else:
+            text = f"{who}: Sorry, that was {answer}."
+        if message["player_out"]:
+            text += f" {player['name']} is out of the game!"
+        color = CORRECT_COLOR if message["correct"] else INCORRECT_COLOR
+
+        self.my_turn = False
+        self.update_status()
+        self.set_options_state()
+        self.feedback_banner.show(text, color, on_done=self.set_options_state)
+
+    def on_left(self, message):
+        if self.screen == "game":
+            player = self.players[message["player"]]
+            player["lives"] = 0
+            self.scoreboard.update_player(message["player"])
+            self.feedback_banner.show(f"{player['name']} left the game.", INCORRECT_COLOR,
+                                      on_done=self.set_options_state)
+
+    def on_game_over(self, message):
+        self.players = message["players"]
+        winner = message["winner"]
+        # Let the last answer's feedback finish before switching screens
+        if self.feedback_banner is not None and self.feedback_banner.active:
+            self.feedback_banner.on_done = lambda: self.show_game_over(winner)
+        else:
+            self.show_game_over(winner)
+
+    def on_error(self, message):
+        if self.player_index is None:
+            self.leave(message["message"])  # The join was refused
+        else:
+            messagebox.showinfo("Network Game", message["message"], parent=self.root)
+
+    # Screens
+
+    def lobby_text(self):
+        shown = self.lobby_players[:20]
+        text = "\n".join(shown)
+        if len(self.lobby_players) > len(shown):
+            text += f"\n...and {len(self.lobby_players) - len(shown)} more"
+        return text
+
+    def show_lobby(self):
+        """Show the room's players until the host starts the game"""
+        self.clear("lobby")
+        self.players = None
+        lobby_frame = tk.Frame(self.root, bg="#232F3E")
+        lobby_frame.pack(expand=True)
+
+        title_label = tk.Label(
+            lobby_frame,
+            text=f"Room: {self.room_name}",
+            font=("Arial", 24, "bold"),
+            fg="#FF9900",
+            bg="#232F3E"
+        )
+        title_label.pack(pady=20)
+
+        self.lobby_var = tk.StringVar(self.root, self.lobby_text())
+        players_label = tk.Label(
+            lobby_frame,
+            textvariable=self.lobby_var,
+            font=("Arial", 14),
+            fg="white",
+            bg="#232F3E"
+        )
+        players_label.pack(pady=10)
+
+        self.start_button = tk.Button(
+            lobby_frame,
+            text="Start Game",
+            font=("Arial", 14),
+            bg="#FF9900",
+            activebackground="#EC7211",
+            state=tk.NORMAL if self.is_host else tk.DISABLED,
+            command=lambda: self.connection.send({"type": "start"})
+        )
+        self.start_button.pack(pady=20)
+
+        hint_label = tk.Label(
+            lobby_frame,
+            text="The first player to join starts the game.",
+            font=("Arial", 12),
+            fg="white",
+            bg="#232F3E"
+        )
+        hint_label.pack()
+
+        leave_button = tk.Button(
+            lobby_frame,
+            text="Leave Room",
+            font=("Arial", 12),
+            bg="#FF9900",
+            activebackground="#EC7211",
+            command=self.leave
+        )
+        leave_button.pack(pady=10)
+
+    def setup_game_ui(self):
+        """Set up the game screen for a game that has just started"""
+        self.game.load_icons()
+        self.clear("game")
+
+        title_label = tk.Label(
+            self.root,
+            text="AWS Service Icon Game",
+            font=("Arial", 24, "bold"),
+            fg="#FF9900",
+            bg="#232F3E"
+        )
+        title_label.pack(pady=10)
+
+        self.status_var = tk.StringVar(self.root)
+        status_label = tk.Label(
+            self.root,
+            textvariable=self.status_var,
+            font=("Arial", 14, "bold"),
+            fg="#FF9900",
+            bg="#232F3E"
+        )
+        status_label.pack(pady=5)
+
+        self.scoreboard = VirtualScoreboard(self.root, ScoreboardModel(self.players))
+        self.scoreboard.pack(pady=5)
+
+        self.icon_label = tk.Label(self.root, bg="#232F3E")
+        self.icon_label.pack(pady=10)
+
+        self.feedback_banner = FeedbackBanner(self.root, self.game.feedback_delay_ms)
+
+        options_frame = tk.Frame(self.root, bg="#232F3E")
+        options_frame.pack(pady=10)
+        self.option_buttons = []
+        for i in range(3):
+            btn = tk.Button(
+                options_frame,
+                text="",
+                font=("Arial", 12),
+                width=25,
+                bg="#FF9900",
+                activebackground="#EC7211",
+                fg="black",
+                state=tk.DISABLED,
+                command=lambda idx=i: self.answer(idx)
+            )
+            btn.pack(pady=5)
+            self.option_buttons.append(btn)
+
+    def update_status(self):
+        me = self.players[self.player_index]
+        if self.my_turn:
+            turn = "Your turn!"
+        else:
+            turn = f"Waiting for {self.players[self.question['player']]['name']}"
+        self.status_var.set(f"{turn}   Score: {me['score']}   Lives: {'❤️' * me['lives']}")
+
+    def set_options_state(self):
+        """Enable the answer buttons only while it is this player's turn"""
+        state = tk.NORMAL if self.my_turn else tk.DISABLED
+        for btn in self.option_buttons:
+            btn.config(state=state)
+
+    def answer(self, selected_index):
+        if not self.my_turn or self.feedback_banner.active:
+            return
+        self.my_turn = False
+        self.set_options_state()
+        self.connection.send({"type": "answer", "seq": self.question["seq"], "option": selected_index})
+
+    def show_game_over(self, winner):
+        """Show the final rankings; the room is back in its lobby afterwards"""
+        self.clear("game_over")
+        game_over_frame = tk.Frame(self.root, bg="#232F3E")
+        game_over_frame.pack(expand=True)
+
+        game_over_label = tk.Label(
+            game_over_frame,
+            text="Game Over!",
+            font=("Arial", 28, "bold"),
+            fg="#FF9900",
+            bg="#232F3E"
+        )
+        game_over_label.pack(pady=20)
+
+        if winner is None:
+            result_text = "It's a tie! All players are out."
+        else:
+            result_text = f"Winner: {self.players[winner]['name']}!"
+        result_label = tk.Label(
+            game_over_frame,
+            text=result_text,
+            font=("Arial", 20),
+            fg="white",
+            bg="#232F3E"
+        )
+        result_label.pack(pady=10)
+
+        rankings = VirtualScoreboard(
+            game_over_frame,
+            ScoreboardModel(self.players),
+            visible_rows=10,
+            font=("Arial", 14),
+            show_lives=False
+        )
+        rankings.pack(pady=20)
+
+        buttons_frame = tk.Frame(game_over_frame, bg="#232F3E")
+        buttons_frame.pack(pady=30)
+
+        lobby_button = tk.Button(
+            buttons_frame,
+            text="Back to Room",
+            font=("Arial", 14),
+            bg="#FF9900",
+            activebackground="#EC7211",
+            command=self.show_lobby
+        )
+        lobby_button.pack(side=tk.LEFT, padx=10)
+
+        leave_button = tk.Button(
+            buttons_frame,
+            text="Leave Room",
+            font=("Arial", 14),
+            bg="#FF9900",
+            activebackground="#EC7211",
+            command=self.leave
+        )
+        leave_button.pack(side=tk.LEFT, padx=10)
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Networked multiplayer room server for the AWS Icon Game
+
+Runs the game rules centrally with GameState and QuestionEngine, so any
+number of rooms can be played over the network from one process. Clients
+talk to the server in JSON, one message per line:
+
+  client -> server
+    {"type": "join", "room": "team-a", "name": "Alice"}
+    {"type": "start"}                                  (room host only)
+    {"type": "answer", "seq": 7, "option": 1}          (current player only)
+
+  server -> client
+    welcome    your player index, room, host flag and the question pool
+    lobby      player names while waiting for the host to start
+    started    every player's name, score and lives
+    question   seq, player to answer, service id and shuffled option ids
+    result     the answer's outcome and that player's new score and lives
+    left       a player disconnected (and is out of a running game)
+    game_over  winner index (or null for a tie) and final scores
+    error      a message for the client to show
+
+Questions carry catalog service ids rather than names, so clients map them
+through their own copy of aws_services.json. Memory per connection is
+bounded: incoming lines are capped at MAX_LINE_BYTES and each client has an
+outbox of at most OUTBOX_LIMIT messages; a client that falls further behind
+than that is disconnected instead of buffering without limit.
+
+    python room_server.py --host 0.0.0.0 --port 8765
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from catalog import load_catalog
+from game_state import GameState
+from question_engine import QuestionEngine
+from adaptive_scheduler import AdaptiveScheduler, PlayerStatsStore, PLAYER_STATS_DB
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_LINE_BYTES = 1024
+OUTBOX_LIMIT = 256
+MAX_ROOM_PLAYERS = 500
+MAX_ROOMS = 1000
+MAX_NAME_LENGTH = 32
+
+logger = logging.getLogger(__name__)
+
+
+def encode(message):
+    """Serialize a message as one JSON line"""
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class Connection:
+    """One client socket with a bounded queue of outgoing lines"""
+
+    def __init__(self, writer, outbox_limit=OUTBOX_LIMIT):
+        self.writer = writer
+        self.outbox = asyncio.Queue(outbox_limit)
+        self.room = None
+        self.index = None  # Seat in the room
+        self.name = None
+        self.closed = False
+
+    def send(self, data):
+        """Queue an encoded message; drop the client if its outbox is full"""
+        if self.closed:
+            return
+        try:
+            self.outbox.put_nowait(data)
+        except asyncio.QueueFull:
+            logger.info("Dropping slow client %s", self.name)
+            self.close()
+
+    async def pump(self):
+        """Write queued messages to the socket until the connection closes"""
+        while True:
+            data = await self.outbox.get()
+            if data is None:
+                break
+            self.writer.write(data)
+            try:
+                await self.writer.drain()
+            except ConnectionError:
+                break  # Reset by the client, or aborted by close()
+
+    def close(self):
+        """Stop sending and close the socket; the read loop then sees EOF"""
+        if not self.closed:
+            self.closed = True
+            self.writer.transport.abort()
+
+
+class StatsWriter:
+    """Loads and saves player stats on a thread of its own
+
+    SQLite reads and commits are kept off the event loop, so starting or
+    finishing a game in one room does not stall every other room. Loads
+    and saves run in order on the one thread, so a player who plays again
+    straight away gets the stats of the game just finished.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.store = None  # Opened on the writer thread, the only one that uses it
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stats-writer")
+
+    def save(self, scheduler):
+        """Queue a finished game's changed stats; the scheduler must not be used afterwards"""
+        self.executor.submit(self.write, scheduler.profiles)
+
+    async def load(self, player_names, services):
+        """Load players' stats without blocking the loop, as rows for AdaptiveScheduler.start_game"""
+        future = self.executor.submit(self.read, player_names, services)
+        return await asyncio.wrap_future(future)
+
+    def read(self, player_names, services):
+        if self.store is None:
+            self.store = PlayerStatsStore(self.path)
+        return [self.store.load(name, services).snapshot() for name in player_names]
+
+    def write(self, profiles):
+        try:
+            if self.store is None:
+                self.store = PlayerStatsStore(self.path)
+            for profile in profiles:
+                if profile.dirty:
+                    self.store.save(profile)
+        except Exception:
+            logger.exception("Could not save player stats")
+
+    def close(self):
+        """Finish the queued saves and close the connection"""
+        self.executor.submit(self.close_store)
+        self.executor.shutdown(wait=True)
+
+    def close_store(self):
+        if self.store is not None:
+            self.store.close()
+
+
+class Room:
+    """Players sharing one game; player indexes follow join order"""
+
+    def __init__(self, name, services, categories=None, stats_store=None, similar=None,
+                 stats_writer=None):
+        self.name = name
+        self.services = services
+        self.similar = similar
+        self.categories = categories
+        self.stats_store = stats_store
+        self.stats_writer = stats_writer  # StatsWriter that loads and saves stats, if any
+        self.connections = []
+        self.state = None  # GameState while a game is running
+        self.starting = False  # True while the players' stats load for a new game
+        self.scheduler = None
+        self.question = None
+        self.asked_at = None
+        self.seq = 0
+
+    @property
+    def host(self):
+        return self.connections[0] if self.connections else None
+
+    def broadcast(self, message):
+        """Send one message to every player, encoding it only once"""
+        data = encode(message)
+        for connection in self.connections:
+            connection.send(data)
+
+    def add(self, connection):
+        """Seat a connection in the lobby and tell everyone"""
+        self.connections.append(connection)
+        connection.room = self
+        self.welcome(len(self.connections) - 1)
+        self.broadcast_lobby()
+
+    def welcome(self, index):
+        """Tell the player in a seat which seat it is"""
+        connection = self.connections[index]
+        connection.index = index
+        connection.send(encode({
+            "type": "welcome",
+            "room": self.name,
+            "player": index,
+            "host": index == 0,
+            "categories": self.categories,
+            "catalog_size": len(self.services),
+        }))
+
+    def broadcast_lobby(self):
+        self.broadcast({"type": "lobby", "players": [c.name for c in self.connections]})
+
+    def remove(self, connection):
+        """Take a connection out of the room, forfeiting its place in a running game"""
+        index = connection.index
+        if self.state is None:
+            # In the lobby later players move up one seat
+            del self.connections[index]
+            for i in range(index, len(self.connections)):
+                self.welcome(i)
+            self.broadcast_lobby()
+            return
+
+        # Mid-game the seat stays so indexes do not shift; the player is out
+        self.connections[index] = _Departed(connection.name)
+        was_current = index == self.state.current_player_index
+        self.broadcast({"type": "left", "player": index})
+        if self.state.forfeit(index):
+            self.finish()
+        elif was_current:
+            self.ask()
+
+    async def start(self):
+        """Start a new game with everyone in the lobby"""
+        profiles = None
+        names = [c.name for c in self.connections]
+        if self.stats_writer is not None:
+            self.starting = True
+            try:
+                while True:
+                    profiles = await self.stats_writer.load(names, self.services)
+                    current = [c.name for c in self.connections]
+                    if current == names:
+                        break
+                    names = current  # Someone joined or left while the stats loaded
+            finally:
+                self.starting = False
+            if not names:
+                return
+
+        self.state = GameState(names)
+        # Each question is weighted towards the weak services of the player it is for
+        engine = QuestionEngine(self.services, similar=self.similar)
+        self.scheduler = AdaptiveScheduler(engine, self.stats_store)
+        self.scheduler.next_player = lambda: self.state.current_player_index
+        self.scheduler.start_game(names, profiles=profiles)
+        self.broadcast({"type": "started", "players": self.state.players})
+        self.ask()
+
+    def ask(self):
+        """Draw the next question and push it to every player"""
+        self.seq += 1
+        self.question = self.scheduler.next_question()
+        self.asked_at = time.perf_counter()
+        self.broadcast({
+            "type": "question",
+            "seq": self.seq,
+            "player": self.state.current_player_index,
+            "service_id": self.question.service_id,
+            "option_ids": self.question.option_ids,
+        })
+
+    def answer(self, connection, seq, option):
+        """Apply an answer from the current player to the current question"""
+        index = connection.index
+        if index != self.state.current_player_index or seq != self.seq:
+            return  # Not their turn, or a late answer to an earlier question
+
+        result = self.state.answer(option == self.question.correct_index)
+        self.scheduler.record(index, self.question.service_id, result.correct,
+                              time.perf_counter() - self.asked_at)
+        self.broadcast({
+            "type": "result",
+            "seq": seq,
+            "player": index,
+            "correct": result.correct,
+            "correct_index": self.question.correct_index,
+            "service_id": self.question.service_id,
+            "player_out": result.player_out,
+            "score": result.player["score"],
+            "lives": result.player["lives"],
+        })
+        if result.game_over:
+            self.finish()
+        else:
+            self.ask()
+
+    def finish(self):
+        """Announce the result and return the room to its lobby"""
+        if self.stats_writer is not None:
+            self.stats_writer.save(self.scheduler)
+        else:
+            self.scheduler.save()
+        players = self.state.players
+        winner = self.state.winner
+        self.broadcast({
+            "type": "game_over",
+            "winner": None if winner is None else players.index(winner),
+            "players": players,
+        })
+        self.state = None
+        self.question = None
+        self.connections = [c for c in self.connections if not isinstance(c, _Departed)]
+        if self.connections:
+            for i in range(len(self.connections)):
+                self.welcome(i)
+            self.broadcast_lobby()
+
+
+class _Departed:
+    """Placeholder seat for a player who left a running game"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def send(self, data):
+        pass
+
+
+class RoomServer:
+    """Accepts connections and routes their messages to rooms by name"""
+
+    def __init__(self, categories=None, max_rooms=MAX_ROOMS, outbox_limit=OUTBOX_LIMIT,
+                 stats_path=PLAYER_STATS_DB, hard_mode=False):
+        self.categories = categories or None
+        self.services = load_catalog().question_pool(self.categories)
+        self.similar = None
+        if hard_mode:
+            from icon_similarity import load_similar_services  # Pulls in Pillow
+            self.similar = load_similar_services(self.services)
+            if self.similar is None:
+                logger.info("No similarity index found (run icon_similarity.py); using random answers")
+        # Per-player answer stats, loaded and saved on the writer thread. An in-memory
+        # database only exists for one connection, so it is used from the loop instead
+        self.stats_store = None
+        self.stats_writer = None
+        if stats_path == ":memory:":
+            self.stats_store = PlayerStatsStore(stats_path)
+        elif stats_path:
+            self.stats_writer = StatsWriter(stats_path)
+        self.max_rooms = max_rooms
+        self.outbox_limit = outbox_limit
+        self.rooms = {}
+        self.connection_count = 0
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start listening; returns the asyncio server (port 0 picks a free port)"""
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE_BYTES)
+
+    async def handle_connection(self, reader, writer):
+        """Serve one client until it disconnects"""
+        connection = Connection(writer, self.outbox_limit)
+        pump = asyncio.ensure_future(connection.pump())
+        self.connection_count += 1
+        try:
+            while not connection.closed:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break  # Line over MAX_LINE_BYTES, or the socket was reset
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    connection.send(encode({"type": "error", "message": "Invalid JSON"}))
+                    continue
+                if isinstance(message, dict):
+                    await self.dispatch(connection, message)
+        finally:
+            self.connection_count -= 1
+            self.leave(connection)
+            connection.closed = True
+            pump.cancel()
+            # Collect the pump's outcome, so asyncio has no exception left to report
+            await asyncio.gather(pump, return_exceptions=True)
+            writer.close()
+
+    async def dispatch(self, connection, message):
+        """Handle one message from a client"""
+        kind = message.get("type")
+        room = connection.room
+        if kind == "join" and room is None:
+            self.join(connection, message.get("room"), message.get("name"))
+        elif kind == "start" and room is not None and room.state is None:
+            if room.starting:
+                return  # Already starting
+            if connection is room.host:
+                await room.start()
+            else:
+                connection.send(encode({"type": "error", "message": "Only the host can start the game"}))
+        elif kind == "answer" and room is not None and room.state is not None:
+            room.answer(connection, message.get("seq"), message.get("option"))
+        else:
+            connection.send(encode({"type": "error", "message": f"Unexpected message: {kind}"}))
+
+    def join(self, connection, room_name, player_name):
+        """Seat a connection in a room, creating the room if needed"""
+        if not isinstance(room_name, str) or not room_name.strip():
+            connection.send(encode({"type": "error", "message": "A room name is required"}))
+            return
+        room_name = room_name.strip()[:MAX_NAME_LENGTH]
+        if not isinstance(player_name, str) or not player_name.strip():
+            player_name = "Player"
+        connection.name = player_name.strip()[:MAX_NAME_LENGTH]
+
+        room = self.rooms.get(room_name)
+        if room is None:
+            if len(self.rooms) >= self.max_rooms:
+                connection.send(encode({"type": "error", "message": "The server is full"}))
+                return
+            room = self.rooms[room_name] = Room(room_name, self.services, self.categories,
+                                                self.stats_store, self.similar, self.stats_writer)
+        elif room.state is not None:
+            connection.send(encode({"type": "error", "message": "That game has already started"}))
+            return
+        elif len(room.connections) >= MAX_ROOM_PLAYERS:
+            connection.send(encode({"type": "error", "message": "That room is full"}))
+            return
+        room.add(connection)
+
+    def leave(self, connection):
+        """Remove a disconnected client from its room, closing the room once empty"""
+        room = connection.room
+        if room is None:
+            return
+        connection.room = None
+        room.remove(connection)
+        if not any(isinstance(c, Connection) for c in room.connections):
+            del self.rooms[room.name]
+
+    def stats(self):
+        return {"rooms": len(self.rooms), "connections": self.connection_count}
+
+    def close(self):
+        """Flush pending stats saves and close the stats database"""
+        if self.stats_writer is not None:
+            self.stats_writer.close()
+        if self.stats_store is not None:
+            self.stats_store.close()
+
+
+async def serve(host, port, categories=None, stats_path=PLAYER_STATS_DB, hard_mode=False):
+    """Run a room server until cancelled"""
+    room_server = RoomServer(categories, stats_path=stats_path, hard_mode=hard_mode)
+    server = await room_server.start(host, port)
+    for sock in server.sockets:
+        logger.info("Room server listening on %s:%s", *sock.getsockname()[:2])
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        room_server.close()
+
+
+def main():
+    """Run the room server from the command line"""
+    parser = argparse.ArgumentParser(description="AWS Icon Game room server")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--category", action="append", dest="categories",
+                        help="only ask about this category (repeatable)")
+    parser.add_argument("--stats-db", default=PLAYER_STATS_DB,
+                        help="per-player stats database (empty to keep no stats)")
+    parser.add_argument("--hard", action="store_true", help="wrong answers use look-alike icons")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        asyncio.run(serve(args.host, args.port, args.categories, args.stats_db, args.hard))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
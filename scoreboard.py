@@ -0,0 +1,149 @@
+"""
+Virtualized scoreboard for the AWS Icon Game
+
+Classroom games can have hundreds of players, so instead of one Label per
+player the scoreboard keeps players sorted in memory and only draws the
+handful of rows that are currently scrolled into view. When a score changes
+only the rows whose positions moved are redrawn, so the cost of an update
+does not depend on the size of the roster.
+"""
+import tkinter as tk
+from bisect import bisect_left, insort
+
+VISIBLE_ROWS = 6
+
+
+class ScoreboardModel:
+    """Player indexes kept sorted by score, highest first"""
+
+    def __init__(self, players):
+        self.players = players  # The player dicts owned by GameState
+        self.keys = [self.sort_key(i) for i in range(len(players))]
+        self.order = sorted(self.keys)
+
+    def __len__(self):
+        return len(self.order)
+
+    def sort_key(self, index):
+        # Ties keep the original player order
+        return (-self.players[index]["score"], index)
+
+    def player_at(self, position):
+        """Return the index of the player ranked at the given position"""
+        return self.order[position][1]
+
+    def position_of(self, index):
+        """Return the ranking position of a player"""
+        return bisect_left(self.order, self.keys[index])
+
+    def update(self, index):
+        """Re-rank a player after their score changed
+
+        Returns the first and last positions whose rows need redrawing.
+        """
+        old_key = self.keys[index]
+        new_key = self.sort_key(index)
+        old_position = bisect_left(self.order, old_key)
+        if new_key == old_key:
+            return old_position, old_position
+
+        del self.order[old_position]
+        insort(self.order, new_key)
+        self.keys[index] = new_key
+        new_position = bisect_left(self.order, new_key)
+        return min(old_position, new_position), max(old_position, new_position)
+
+
+class VirtualScoreboard(tk.Frame):
+    """Scrollable ranking list that only renders the visible rows"""
+
+    def __init__(self, parent, model, visible_rows=VISIBLE_ROWS, font=("Arial", 10),
+                 show_lives=True, highlight_index=None):
+        super().__init__(parent, bg=parent["bg"])
+        self.model = model
+        self.show_lives = show_lives
+        self.highlight_index = highlight_index
+        self.top = 0
+        self.visible_rows = min(visible_rows, len(model))
+
+        rows_frame = tk.Frame(self, bg=self["bg"])
+        rows_frame.pack(side=tk.LEFT)
+
+        self.labels = []
+        self.rendered = []  # What each visible slot last showed
+        for _ in range(self.visible_rows):
+            label = tk.Label(rows_frame, text="", font=font, fg="white", bg=self["bg"])
+            label.pack()
+            self.labels.append(label)
+            self.rendered.append(None)
+
+        self.scrollbar = None
+        if len(model) > self.visible_rows:
+            self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+            self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            for widget in [self, rows_frame] + self.labels:
+                widget.bind("<MouseWheel>", self.on_mousewheel)
+                widget.bind("<Button-4>", lambda event: self.scroll_to(self.top - 1))
+                widget.bind("<Button-5>", lambda event: self.scroll_to(self.top + 1))
+
+        self.refresh(0, len(model) - 1)
+        self.update_scrollbar()
+
+    def row_text(self, position):
+        """Text and colour for the player ranked at a position"""
+        index = self.model.player_at(position)
+        player = self.model.players[index]
+        if self.show_lives:
+            text = f"{position + 1}. {player['name']}: {player['score']} pts, {'❤️' * player['lives']}"
+        else:
+            text = f"{position + 1}. {player['name']}: {player['score']} points"
+        color = "#FF9900" if index == self.highlight_index else "white"
+        return text, color
+
+    def refresh(self, first, last):
+        """Redraw the rows for positions first..last that are in view"""
+        start = max(first, self.top)
+        stop = min(last, self.top + self.visible_rows - 1)
+        for position in range(start, stop + 1):
+            slot = position - self.top
+            row = self.row_text(position)
+            if self.rendered[slot] != row:
+                self.labels[slot].config(text=row[0], fg=row[1])
+                self.rendered[slot] = row
+
+    def update_player(self, index):
+        """Re-rank a player whose score or lives changed and redraw moved rows"""
+        first, last = self.model.update(index)
+        self.refresh(first, last)
+
+    def set_highlight(self, index):
+        """Highlight a different player (e.g. whose turn it is)"""
+        previous, self.highlight_index = self.highlight_index, index
+        for player_index in (previous, index):
+            if player_index is not None:
+                position = self.model.position_of(player_index)
+                self.refresh(position, position)
+
+    def scroll_to(self, top):
+        """Scroll so the given position is the first visible row"""
+        top = max(0, min(top, len(self.model) - self.visible_rows))
+        if top != self.top:
+            self.top = top
+            self.refresh(top, top + self.visible_rows - 1)
+            self.update_scrollbar()
+
+    def yview(self, *args):
+        """Scrollbar callback"""
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * len(self.model)))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def on_mousewheel(self, event):
+        self.scroll_to(self.top - (1 if event.delta > 0 else -1))
+
+    def update_scrollbar(self):
+        if self.scrollbar is not None:
+            total = len(self.model)
+            self.scrollbar.set(self.top / total, (self.top + self.visible_rows) / total)
@@ -0,0 +1,124 @@
+"""
+Session recording for the AWS Icon Game
+
+A SessionRecorder appends one compact JSON line per event to a log:
+
+    {"t": "session", ...}  catalog size and digest, categories, front end
+    {"t": "game", ...}     players, the game's seed, hard mode and each
+                           player's stats when the game started
+    {"t": "q", ...}        a question drawn: player, service id, option ids,
+                           correct index
+    {"t": "a", ...}        an answer: player, question, option chosen,
+                           response time and the score, lives and outcome
+                           that followed
+
+Every event also has "at", milliseconds since the session started. The log
+is only ever appended to and is written a line at a time, so a crash loses
+at most the event in flight. session_replay.py re-runs a log headless and
+checks that the same questions and results come out.
+"""
+import hashlib
+import json
+import time
+from datetime import datetime
+
+LOG_VERSION = 1
+DEFAULT_LOG = "sessions.jsonl"
+
+
+def add_recording_arguments(parser):
+    """Add the --seed and --record options to a game's argument parser"""
+    parser.add_argument("--seed", type=int, help="seed for a reproducible sequence of questions")
+    parser.add_argument("--record", nargs="?", const=DEFAULT_LOG, metavar="PATH",
+                        help=f"append the session to a log for session_replay.py (default {DEFAULT_LOG})")
+
+
+def catalog_digest(services):
+    """Short digest of the service names in question order"""
+    names = "\n".join(service["name"] for service in services)
+    return hashlib.sha256(names.encode("utf-8")).hexdigest()[:16]
+
+
+def similar_digest(similar):
+    """Short digest of a hard mode look-alike table, or None outside hard mode"""
+    if similar is None:
+        return None
+    return hashlib.sha256(json.dumps(similar).encode("utf-8")).hexdigest()[:16]
+
+
+def read_events(path):
+    """Yield (line number, event) for every event in a log"""
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                yield number, json.loads(line)
+
+
+class SessionRecorder:
+    """Appends the events of a session to a JSONL log"""
+
+    def __init__(self, path, services, categories=None, front_end="tk"):
+        self.path = path
+        # Line buffered, so every event reaches the file as soon as it happens
+        self.file = open(path, "a", encoding="utf-8", buffering=1)
+        self.started = time.perf_counter()
+        self.in_game = False
+        self.write({
+            "t": "session",
+            "v": LOG_VERSION,
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "front_end": front_end,
+            "categories": categories,
+            "catalog": len(services),
+            "catalog_digest": catalog_digest(services),
+        })
+
+    @classmethod
+    def from_args(cls, args, services, categories=None, front_end="tk"):
+        """Open the log if --record was given, otherwise return None"""
+        if not args.record:
+            return None
+        return cls(args.record, services, categories, front_end)
+
+    def write(self, event):
+        event["at"] = round((time.perf_counter() - self.started) * 1000, 3)
+        self.file.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+    def start_game(self, scheduler, player_names, seed):
+        """Record a new game; called by AdaptiveScheduler.start_game"""
+        self.in_game = True
+        self.write({
+            "t": "game",
+            "players": list(player_names),
+            "seed": seed,
+            "similar": similar_digest(scheduler.engine.similar),
+            "profiles": [profile.snapshot() for profile in scheduler.profiles],
+        })
+
+    def question(self, player, question):
+        """Record a question drawn for a player; called by AdaptiveScheduler.next_question"""
+        if self.in_game:
+            self.write({"t": "q", "p": player, "s": question.service_id,
+                        "o": list(question.option_ids), "c": question.correct_index})
+
+    def answer(self, player, service_id, correct_index, selected_index, response_seconds,
+               game_state, result):
+        """Record an answer and the state of the game after it"""
+        winner = None
+        if result.winner is not None:
+            winner = next(i for i, p in enumerate(game_state.players) if p is result.winner)
+        self.write({
+            "t": "a",
+            "p": player,
+            "s": service_id,
+            "c": correct_index,
+            "o": selected_index,
+            "rt": response_seconds,
+            "r": [result.player["score"], result.player["lives"], result.player_out,
+                  result.game_over, winner],
+        })
+        if result.game_over:
+            self.in_game = False
+
+    def close(self):
+        self.file.close()
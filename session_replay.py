@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Script to replay recorded AWS Icon Game sessions headless
+
+Reads a log written with --record (see session_recorder.py) and plays it
+back at full speed, without Tk or Pillow:
+  - each game is restarted from its recorded seed and starting stats, and
+    every question is drawn again and compared with the recorded one
+  - every recorded answer is fed to GameState and the resulting score,
+    lives and outcome are compared with the recorded ones
+
+    python session_replay.py session.jsonl [--repeat 100]
+
+Exits with status 1 and lists the first differences if anything does not
+match, so recorded production sessions can serve as regression tests;
+--repeat turns a log into a throughput benchmark of the question and rules
+code.
+"""
+import argparse
+import time
+from catalog import load_catalog
+from game_state import GameState
+from question_engine import QuestionEngine
+from adaptive_scheduler import AdaptiveScheduler
+from session_recorder import LOG_VERSION, catalog_digest, read_events, similar_digest
+
+MAX_MISMATCHES = 20
+
+
+class ReplayError(Exception):
+    """The log cannot be replayed in this tree, e.g. its catalog differs"""
+
+
+class SessionReplay:
+    """Plays a list of recorded events back and collects any differences"""
+
+    def __init__(self, events):
+        self.events = events
+        self.mismatches = []
+        self.games = 0
+        self.questions = 0
+        self.answers = 0
+
+    def mismatch(self, line, message):
+        if len(self.mismatches) < MAX_MISMATCHES:
+            self.mismatches.append(f"line {line}: {message}")
+
+    def run(self):
+        """Replay every event once"""
+        scheduler = None
+        state = None
+        player = 0
+        similar_tables = {}
+        for line, event in self.events:
+            kind = event["t"]
+            if kind == "session":
+                if event["v"] != LOG_VERSION:
+                    raise ReplayError(f"log version {event['v']} is not supported")
+                services = load_catalog().question_pool(event["categories"])
+                if len(services) != event["catalog"] or catalog_digest(services) != event["catalog_digest"]:
+                    raise ReplayError("the log was recorded with a different service catalog")
+                scheduler = AdaptiveScheduler(QuestionEngine(services))
+                scheduler.next_player = lambda: player
+                state = None
+
+            elif kind == "game":
+                if event["similar"] is None:
+                    scheduler.engine.similar = None
+                else:
+                    if "table" not in similar_tables:
+                        # Pillow is only needed to replay hard mode games
+                        from icon_similarity import load_similar_services
+                        similar_tables["table"] = load_similar_services(scheduler.services)
+                    scheduler.engine.similar = similar_tables["table"]
+                    if similar_digest(scheduler.engine.similar) != event["similar"]:
+                        raise ReplayError("the log was recorded with a different similarity index")
+                scheduler.start_game(event["players"], event["seed"], event["profiles"])
+                state = GameState(event["players"])
+                self.games += 1
+
+            elif kind == "q":
+                player = event["p"]
+                question = scheduler.next_question()
+                self.questions += 1
+                recorded = (event["s"], event["o"], event["c"])
+                drawn = (question.service_id, list(question.option_ids), question.correct_index)
+                if drawn != recorded:
+                    self.mismatch(line, f"question {drawn} was recorded as {recorded}")
+
+            elif kind == "a":
+                if state is None or state.game_over:
+                    self.mismatch(line, "answer outside a game")
+                    continue
+                if state.current_player_index != event["p"]:
+                    self.mismatch(line, f"player {state.current_player_index} is on turn, "
+                                        f"the log has player {event['p']}")
+                correct = event["o"] == event["c"]
+                result = state.answer(correct)
+                scheduler.record(event["p"], event["s"], correct, event["rt"])
+                self.answers += 1
+
+                winner = None
+                if result.winner is not None:
+                    winner = next(i for i, p in enumerate(state.players) if p is result.winner)
+                outcome = [result.player["score"], result.player["lives"], result.player_out,
+                           result.game_over, winner]
+                if outcome != event["r"]:
+                    self.mismatch(line, f"answer gave {outcome}, the log has {event['r']}")
+        return not self.mismatches
+
+
+def main():
+    """Replay a session log and report whether it matched"""
+    parser = argparse.ArgumentParser(description="Replay a recorded AWS Icon Game session")
+    parser.add_argument("log", help="session log written with --record")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the log this many times")
+    args = parser.parse_args()
+
+    events = list(read_events(args.log))
+    recorded_ms = events[-1][1]["at"] if events else 0.0
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        replay = SessionReplay(events)
+        try:
+            matched = replay.run()
+        except ReplayError as e:
+            print(f"Cannot replay {args.log}: {e}")
+            raise SystemExit(1)
+        if not matched:
+            break
+    elapsed = time.perf_counter() - started
+
+    print(f"Replayed {replay.games} games, {replay.questions} questions and {replay.answers} answers "
+          f"from {args.log}")
+    if not matched:
+        for message in replay.mismatches:
+            print(f"  mismatch at {message}")
+        raise SystemExit(1)
+    runs = args.repeat
+    print(f"  all matched; {runs} run(s) in {elapsed * 1000:.1f} ms "
+          f"({runs * replay.answers / elapsed:,.0f} answers/s, session took {recorded_ms / 1000:.1f} s live)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import os
+from PIL import Image
+
+from icon_atlas import IconAtlas, build_atlas
+from icon_cache import IconCache
+
+RED = (255, 0, 0, 255)
+BLUE = (0, 0, 255, 255)
+
+
+def make_atlas(tmp_path, color=RED):
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+    Image.new("RGBA", (64, 64), color).save(images_dir / "icon.png")
+    image_path = str(tmp_path / "atlas.png")
+    index_path = str(tmp_path / "atlas.json")
+    assert build_atlas(["icon.png"], str(images_dir), image_path, index_path)
+    atlas = IconAtlas.load(image_path, index_path)
+    return atlas, IconCache(atlas, images_dir=str(images_dir)), images_dir / "icon.png"
+
+
+def test_fresh_icon_comes_from_the_atlas(tmp_path):
+    atlas, cache, path = make_atlas(tmp_path)
+    assert atlas.is_current("icon.png", str(path))
+    assert cache.load_pixels("icon.png").convert("RGBA").getpixel((5, 5)) == RED
+
+
+def test_rewritten_icon_is_not_cut_from_the_atlas(tmp_path):
+    atlas, cache, path = make_atlas(tmp_path)
+    Image.new("RGBA", (64, 64), BLUE).save(path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))  # Coarse clocks may not move
+    assert not atlas.is_current("icon.png", str(path))
+    assert cache.load_pixels("icon.png").convert("RGBA").getpixel((5, 5)) == BLUE
+
+
+def test_touched_icon_is_stale(tmp_path):
+    atlas, _, path = make_atlas(tmp_path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert not atlas.is_current("icon.png", str(path))
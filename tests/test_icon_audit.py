@@ -0,0 +1,55 @@
+import hashlib
+import time
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from icon_audit import MAX_NEIGHBOURS, near_duplicates
+from icon_similarity import SAMPLE_SIZE
+
+
+def placeholder_results(count, seed=0):
+    """Audit results for orange placeholder-like icons, each with its own small dark label"""
+    rng = np.random.default_rng(seed)
+    results = []
+    for i in range(count):
+        img = np.empty((SAMPLE_SIZE, SAMPLE_SIZE, 4), dtype=np.uint8)
+        img[:] = (255, 153, 0, 255)
+        y, x = SAMPLE_SIZE // 2 - 2, SAMPLE_SIZE // 2 - 6
+        img[y:y + 4, x:x + 12, :3] = np.where(rng.random((4, 12, 1)) < 0.5, 0, 255)
+        data = img.tobytes()
+        results.append({"file": f"icon{i}.png", "pixel_sha256": hashlib.sha256(data).hexdigest(),
+                        "thumbnail": data})
+    return results
+
+
+def timed_groups(count):
+    results = placeholder_results(count)
+    started = time.perf_counter()
+    groups = near_duplicates(results)
+    return groups, time.perf_counter() - started
+
+
+def test_groups_are_bounded():
+    groups, _ = timed_groups(750)
+    assert groups
+    assert all(2 <= len(group["files"]) <= MAX_NEIGHBOURS + 1 for group in groups)
+    files = [name for group in groups for name in group["files"]]
+    assert len(files) == len(set(files))
+
+
+def test_scales_to_thousands_of_icons():
+    _, small = timed_groups(750)
+    groups, large = timed_groups(3000)
+    assert large < 5.0
+    # Four times the icons; a pure Python pairwise merge took over 15 times as long
+    assert large < 10 * small + 0.5
+    assert max(len(group["files"]) for group in groups) <= MAX_NEIGHBOURS + 1
+
+
+def test_pixel_duplicates_are_listed_with_their_original():
+    results = placeholder_results(20)
+    copy = dict(results[0], file="copy.png")
+    groups = near_duplicates(results + [copy])
+    group = next(group for group in groups if "icon0.png" in group["files"])
+    assert "copy.png" in group["files"]